@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Adaptive Rate Limit Benchmark
+
+Runs Spotify searches against fake_nts_server.py, which throttles Spotify to
+--server-limit req/s with 429 + Retry-After, and compares:
+
+- fixed: a plain token bucket at the starting rate
+- fixed-high: a plain token bucket at the maximum rate (too aggressive)
+- adaptive: AdaptiveTokenBucket from the starting rate up to the maximum
+
+For each it reports lookups/sec, 429s and the limiter's final rate, and for
+the adaptive run a timeline of its rate, which should climb to the server's
+limit and then saw-tooth just under it.
+
+Usage:
+    python benchmarks/bench_adaptive.py [--lookups 300] [--server-limit 25]
+                                        [--start-rate 10] [--max-rate 50]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fake_nts_server import FakeNTSServer  # noqa: E402
+
+
+def run(enrich_tracks, limiter, lookups: int, workers: int, timeline=None):
+    """Search `lookups` tracks through `limiter`; returns (seconds, failures)."""
+    enrich_tracks.spotify_limiter = limiter
+    done = threading.Event()
+
+    def sample():
+        start = time.monotonic()
+        while not done.wait(1.0):
+            timeline.append((time.monotonic() - start, limiter.rate))
+
+    if timeline is not None:
+        threading.Thread(target=sample, daemon=True).start()
+
+    def search(i):
+        try:
+            enrich_tracks.search_spotify(f"Song {i}", f"Artist {i}")
+            return True
+        except enrich_tracks.SourceUnavailable:
+            return False
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        failures = sum(1 for ok in pool.map(search, range(lookups)) if not ok)
+    done.set()
+    return time.monotonic() - start, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fixed vs adaptive rate limiting.")
+    parser.add_argument('--lookups', type=int, default=300)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--server-limit', type=float, default=25.0, help="Spotify req/s the server allows")
+    parser.add_argument('--start-rate', type=float, default=10.0)
+    parser.add_argument('--max-rate', type=float, default=50.0)
+    parser.add_argument('--latency', type=float, default=0.01)
+    args = parser.parse_args()
+
+    server = FakeNTSServer(latency=args.latency, rate_limits={'spotify': args.server_limit})
+    server.start_background()
+    os.environ.update(server.service_env())
+    os.environ.update({'SPOTIFY_CLIENT_ID': 'fake', 'SPOTIFY_CLIENT_SECRET': 'fake'})
+
+    import enrich_tracks
+    from rate_limit import AdaptiveTokenBucket, TokenBucket
+    logging.getLogger().setLevel(logging.ERROR)
+
+    print(f"{args.lookups} Spotify searches, {args.workers} workers, "
+          f"server allows {args.server_limit} req/s\n")
+    print(f"{'limiter':>10} {'seconds':>8} {'lookups/s':>10} {'429s':>6} {'failed':>7} {'final rate':>11}")
+
+    timeline = []
+    limiters = [
+        ('fixed', TokenBucket(args.start_rate)),
+        ('fixed-high', TokenBucket(args.max_rate)),
+        ('adaptive', AdaptiveTokenBucket(args.start_rate, max_rate=args.max_rate)),
+    ]
+    for name, limiter in limiters:
+        throttled_before = server.counts['spotify']['throttled']
+        elapsed, failures = run(enrich_tracks, limiter, args.lookups, args.workers,
+                                timeline if name == 'adaptive' else None)
+        throttled = server.counts['spotify']['throttled'] - throttled_before
+        print(f"{name:>10} {elapsed:>8.2f} {args.lookups / elapsed:>10.1f} {throttled:>6} "
+              f"{failures:>7} {limiter.rate:>11.1f}")
+
+    print(f"\nAdaptive rate over time:")
+    for t, rate in timeline:
+        print(f"  {t:5.0f}s  {rate:5.1f} req/s  {'#' * int(rate)}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
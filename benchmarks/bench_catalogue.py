@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Catalogue Benchmark
+
+Fills a catalogue with synthetic shows, episodes and plays, then times the
+cross-show queries catalogue.py answers. Track popularity is skewed like
+real radio (a few tracks played everywhere, a long tail played once), and
+episodes spread over several years.
+
+Usage:
+    python benchmarks/bench_catalogue.py [--plays 1000000] [--shows 300]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from catalogue import Catalogue  # noqa: E402
+
+MONTHS = ('january', 'february', 'march', 'april', 'may', 'june', 'july',
+          'august', 'september', 'october', 'november', 'december')
+WORDS = ('love night blue dream city fire sun dance heart rain gold river moon '
+         'shadow light echo ocean star wild time').split()
+
+
+def artist_name(n: int, artist_pool: int) -> str:
+    """Artist of the n-th track."""
+    a = n % artist_pool
+    return f"{WORDS[a % len(WORDS)]} artist {a}"
+
+
+def track_title(n: int) -> str:
+    return f"{WORDS[(n // 7) % len(WORDS)]} song {n}"
+
+
+def synthetic_show(rng: random.Random, show: str, episodes: int, tracks_per_episode: int,
+                   track_pool: int, artist_pool: int):
+    """(episode URL, tracks) pairs for one show."""
+    result = []
+    for i in range(episodes):
+        year = rng.randint(2015, 2024)
+        alias = f"{show}-{rng.randint(1, 28)}th-{rng.choice(MONTHS)}-{year}-{i}"
+        tracks = []
+        for _ in range(tracks_per_episode):
+            # Some tracks get played far more than others (P(n) ~ 1/n),
+            # most of the rest turn up once or twice
+            n = int(track_pool ** rng.random()) - 1 if rng.random() < 0.3 else rng.randrange(track_pool)
+            tracks.append({'artist': artist_name(n, artist_pool), 'title': track_title(n)})
+        result.append((f"https://www.nts.live/shows/{show}/episodes/{alias}", tracks))
+    return result
+
+
+def timed(label: str, fn, repeat: int = 20):
+    fn()  # Warm up the page cache
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<56} {elapsed * 1000:>8.2f} ms  ({len(result)} rows)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark catalogue writes and cross-show queries.")
+    parser.add_argument('--plays', type=int, default=1000000)
+    parser.add_argument('--shows', type=int, default=300)
+    parser.add_argument('--tracks-per-episode', type=int, default=25)
+    parser.add_argument('--track-pool', type=int, default=300000, help="Distinct tracks")
+    parser.add_argument('--artist-pool', type=int, default=60000, help="Distinct artists")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    workdir = tempfile.mkdtemp(prefix='bench_catalogue_')
+    catalogue = Catalogue(workdir)
+    episodes_per_show = max(1, args.plays // args.shows // args.tracks_per_episode)
+
+    print(f"Writing {args.shows} shows x {episodes_per_show} episodes x {args.tracks_per_episode} tracks...")
+    start = time.perf_counter()
+    for s in range(args.shows):
+        show = f"show-{s}"
+        episodes = synthetic_show(rng, show, episodes_per_show, args.tracks_per_episode,
+                                  args.track_pool, args.artist_pool)
+        catalogue.record_episodes(show, episodes)
+    elapsed = time.perf_counter() - start
+    print(f"  {catalogue.plays_written} plays in {elapsed:.1f}s ({catalogue.plays_written / elapsed:,.0f} plays/s)")
+    print(f"  {', '.join(f'{n} {table}' for table, n in catalogue.counts().items())}")
+    print(f"  {os.path.getsize(catalogue.path) / 1e6:.0f} MB\n")
+
+    print("Queries:")
+    # Track 0 is the most played; most others are in the long tail
+    for label, n in (('popular', 0), ('long tail', args.artist_pool - 1)):
+        name = artist_name(n, args.artist_pool)
+        timed(f"shows that played '{name}' ({label})", lambda: catalogue.shows_for_artist(name))
+    timed("most played tracks in 2022", lambda: catalogue.top_tracks(2022))
+    timed("most played tracks overall", lambda: catalogue.top_tracks())
+    played = episodes[-1][1][-1]
+    for query in (played['title'], f"{played['artist']} {played['title']}", WORDS[0], f"{WORDS[0]} song",
+                  f"{WORDS[0]} {WORDS[-1]}"):
+        timed(f"search '{query}'", lambda: catalogue.search(query))
+
+    # Re-scraping a show replaces its plays rather than adding to them
+    before = catalogue.top_tracks(2022, 1)
+    catalogue.record_episodes('show-0', synthetic_show(random.Random(0), 'show-0', episodes_per_show,
+                                                       args.tracks_per_episode, args.track_pool, args.artist_pool))
+    assert catalogue.top_tracks(2022, 1) == before, "re-scraping changed the play counts"
+
+    catalogue.close()
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Episode Discovery Benchmark
+
+Discovers a fake show served by fake_nts_server.py, comparing the old
+one-page-at-a-time walk (12 per page) with count-driven parallel paging.
+
+Usage:
+    python benchmarks/bench_discovery.py [--episodes 500] [--latency 0.2]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import nts_show_to_csv  # noqa: E402
+from fake_nts_server import FakeNTSServer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark paginated episode discovery.")
+    parser.add_argument('--episodes', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--max-page-size', type=int, default=50, help="Page size cap of the fake API")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    server = FakeNTSServer(episodes=args.episodes, latency=args.latency,
+                           max_page_size=args.max_page_size)
+    server.start_background()
+    nts_show_to_csv.NTS_BASE_URL = server.base_url
+
+    configs = [
+        ("sequential, 12/page", dict(known=set(), workers=1, page_size=12)),
+        ("parallel x4, 50/page", dict(workers=4, page_size=50)),
+        ("parallel x8, 50/page", dict(workers=8, page_size=50)),
+    ]
+
+    print(f"{'mode':<24} {'seconds':>9} {'episodes':>9}")
+    baseline = None
+    for name, kwargs in configs:
+        start = time.monotonic()
+        urls = nts_show_to_csv.discover_episodes('fake-show', rate=None, **kwargs)
+        elapsed = time.monotonic() - start
+
+        note = ''
+        if baseline is None:
+            baseline = urls
+        elif urls != baseline:
+            note = '  !! order or contents differ'
+        if len(urls) != args.episodes:
+            note += '  !! incomplete'
+        print(f"{name:<24} {elapsed:>9.2f} {len(urls):>9}{note}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
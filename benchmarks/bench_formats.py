@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Output Format Benchmark
+
+Writes a synthetic enriched dataset as CSV, Parquet and Arrow and reports
+file size and how long each takes to load back into typed columns.
+
+CSV is loaded two ways: with the stdlib csv module plus float/int
+conversion (what a script does) and with pyarrow's multithreaded CSV
+reader with type inference (roughly what pandas.read_csv does).
+
+Usage:
+    python benchmarks/bench_formats.py [--rows 50000] [--rounds 3]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pyarrow.csv  # noqa: E402
+
+import enrich_tracks  # noqa: E402
+import table_output  # noqa: E402
+
+
+def synthetic_rows(count: int):
+    """Enriched rows with realistic repetition in artists and episodes."""
+    rng = random.Random(0)
+    columns = ['TITLE', 'ARTIST', 'EPISODE_URL'] + enrich_tracks.get_enrichment_columns()
+    rows = []
+    for i in range(count):
+        row = {name: None for name in columns}
+        row.update({
+            'TITLE': f"song title {i}",
+            'ARTIST': f"artist {int(rng.paretovariate(1.2)) % 5000}",
+            'EPISODE_URL': f"https://www.nts.live/shows/show-{i // 5000}/episodes/episode-{i // 20}",
+        })
+        if rng.random() < 0.7:  # Matched on Spotify
+            row.update({
+                'spotify_id': f"{i:022d}",
+                'spotify_popularity': rng.randrange(100),
+                'spotify_duration_ms': rng.randrange(60000, 600000),
+                'spotify_explicit': rng.random() < 0.1,
+                'spotify_album': f"album {i // 12}",
+                'spotify_release_date': f"{rng.randrange(1960, 2025)}-01-01",
+                'spotify_key': rng.randrange(12),
+                'spotify_mode': rng.randrange(2),
+                'spotify_time_signature': 4,
+            })
+            for name in table_output.FLOAT_COLUMNS:
+                if name.startswith('spotify_'):
+                    row[name] = rng.random()
+        if rng.random() < 0.5:  # Matched on Last.fm
+            row.update({
+                'lastfm_playcount': rng.randrange(10 ** 6),
+                'lastfm_listeners': rng.randrange(10 ** 5),
+                'lastfm_tags': rng.choice(['electronic; house', 'jazz', 'ambient; drone', 'hip-hop']),
+            })
+        rows.append(row)
+    return columns, rows
+
+
+def load_stdlib_csv(path):
+    """Parse a CSV with the csv module and convert numeric columns."""
+    columns = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for name in reader.fieldnames:
+            columns[name] = []
+        for row in reader:
+            for name, value in row.items():
+                kind = table_output._column_kind(name)
+                columns[name].append(table_output._coerce(value, kind))
+    return columns
+
+
+def time_it(fn, rounds: int) -> float:
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark track table formats.")
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    columns, rows = synthetic_rows(args.rows)
+    print(f"{args.rows} enriched rows, {len(columns)} columns\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for fmt in table_output.FORMATS:
+            paths[fmt] = os.path.join(tmp, f"tracks{table_output.FORMAT_EXTENSIONS[fmt]}")
+            table_output.write_rows(paths[fmt], rows, columns, fmt)
+
+        loaders = [
+            ('csv (stdlib)', 'csv', lambda: load_stdlib_csv(paths['csv'])),
+            ('csv (pyarrow)', 'csv', lambda: pyarrow.csv.read_csv(paths['csv'])),
+            ('parquet', 'parquet', lambda: table_output.read_table(paths['parquet'])),
+            ('arrow', 'arrow', lambda: table_output.read_table(paths['arrow'])),
+        ]
+
+        print(f"{'format':>14} {'size KB':>9} {'load ms':>9}")
+        for name, fmt, load in loaders:
+            elapsed = time_it(load, args.rounds)
+            size = os.path.getsize(paths[fmt]) / 1024
+            print(f"{name:>14} {size:>9.0f} {elapsed * 1000:>9.1f}")
+
+        # Round trip must preserve the values
+        table = table_output.read_table(paths['parquet'])
+        if table.column('spotify_popularity').to_pylist() != [r['spotify_popularity'] for r in rows]:
+            print("!! parquet round trip changed spotify_popularity")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Normalization Benchmark
+
+Cleans the TITLE and ARTIST columns of track CSVs with the original
+per-call clean_string and with normalize.py's memoized and batch APIs,
+reporting strings/sec for each and checking they all agree.
+
+CSVs can be passed on the command line; otherwise any *.csv under
+datasets/ is used, falling back to a synthetic corpus with realistic
+repetition (the datasets/ spreadsheets are .numbers files, so export them
+to CSV to benchmark against real data).
+
+Usage:
+    python benchmarks/bench_normalize.py [tracks.csv ...] [--rounds 3]
+"""
+
+import argparse
+import csv
+import glob
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from unidecode import unidecode  # noqa: E402
+
+import normalize  # noqa: E402
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'datasets')
+
+
+def legacy_clean_string(s: str) -> str:
+    """clean_string as it was before normalize.py: patterns compiled per call."""
+    s = unidecode(s)
+    s = s.lower()
+    s = re.sub(r'\s+', ' ', s).strip()
+    s = re.sub(r'\sft.*', '', s, flags=re.IGNORECASE)
+    index = s.find("feat")
+    if index != -1:
+        s = s[:index]
+    return s.strip()
+
+
+def load_columns(paths):
+    """Return every TITLE/ARTIST value from the given CSVs."""
+    values = []
+    for path in paths:
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                for column, value in row.items():
+                    if column and column.upper() in ('TITLE', 'ARTIST') and value:
+                        values.append(value)
+    return values
+
+
+def synthetic_columns(count: int):
+    """Artist/title strings where a minority of artists make up most rows."""
+    rng = random.Random(0)
+    # Roughly one name in ten needs transliterating
+    artists = [f"Artíst Nämé {i}" if i % 10 == 0 else f"Artist Name {i}" for i in range(count // 20)]
+    values = []
+    for i in range(count // 2):
+        artist = artists[min(int(rng.paretovariate(1.2)) - 1, len(artists) - 1)]
+        if i % 7 == 0:
+            artist += " feat. Someone Else"
+        values.append(artist)
+        title_id = rng.randrange(count)
+        title = f"Chanson Très {title_id}" if title_id % 10 == 0 else f"Song Title {title_id}"
+        values.append(f"  {title}   (Original Mix) ")
+    return values
+
+
+def time_it(fn, rounds: int) -> float:
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark string normalization.")
+    parser.add_argument('csvs', nargs='*', help="Track CSVs with TITLE/ARTIST columns")
+    parser.add_argument('--synthetic', type=int, default=200000, help="Strings to generate if no CSVs")
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    paths = args.csvs or sorted(glob.glob(os.path.join(DATASETS_DIR, '**', '*.csv'), recursive=True))
+    if paths:
+        values = load_columns(paths)
+        source = f"{len(paths)} CSV file(s)"
+    else:
+        values = synthetic_columns(args.synthetic)
+        source = "synthetic corpus"
+
+    print(f"Normalizing {len(values)} strings ({len(set(values))} distinct) from {source}\n")
+
+    expected = [legacy_clean_string(v) for v in values]
+
+    def memoized():
+        # Start cold each round so the memo has to earn its hits
+        normalize._clean_cached.cache_clear()
+        return [normalize.clean_string(v) for v in values]
+
+    variants = [
+        ('legacy', lambda: [legacy_clean_string(v) for v in values]),
+        ('uncached', lambda: [normalize._clean_v1(v) for v in values]),
+        ('memoized', memoized),
+        ('batch', lambda: normalize.clean_strings(values)),
+    ]
+
+    print(f"{'variant':>12} {'seconds':>9} {'strings/s':>12} {'speedup':>8}")
+    baseline = None
+    for name, fn in variants:
+        if fn() != expected:
+            print(f"!! {name} output differs from legacy")
+        elapsed = time_it(fn, args.rounds)
+        baseline = baseline or elapsed
+        print(f"{name:>12} {elapsed:>9.3f} {len(values) / elapsed:>12.0f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tracklist Parser Benchmark
+
+Parses a set of episode pages with each tracklist_parser backend and reports
+pages/sec and peak Python memory, checking that every backend returns the
+same tracks.
+
+Pages come from benchmarks/fixtures/*.html if any are present (save real
+NTS episode pages there), otherwise synthetic pages from fake_nts_server.
+
+Note: tracemalloc only sees Python allocations, so lxml's C-level tree is
+not included in its peak memory figure.
+
+Usage:
+    python benchmarks/bench_parsers.py [--pages 200] [--tracks 20] [--rounds 3]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import tracklist_parser  # noqa: E402
+from fake_nts_server import episode_alias, render_episode_html  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_pages(count: int, tracks: int):
+    """Return (source description, list of page bytes)."""
+    paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html')))
+    if paths:
+        pages = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+        return f"{len(pages)} fixture pages", pages
+
+    pages = [render_episode_html(episode_alias(i), tracks).encode('utf-8') for i in range(count)]
+    return f"{count} synthetic pages ({tracks} tracks each)", pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tracklist parser backends.")
+    parser.add_argument('--pages', type=int, default=200, help="Synthetic pages if no fixtures")
+    parser.add_argument('--tracks', type=int, default=20, help="Tracks per synthetic page")
+    parser.add_argument('--rounds', type=int, default=3, help="Timed passes per backend (best is kept)")
+    args = parser.parse_args()
+
+    source, pages = load_pages(args.pages, args.tracks)
+    total_bytes = sum(len(page) for page in pages)
+    print(f"Parsing {source}, {total_bytes / 1024:.0f} KB total\n")
+
+    # bs4 first: it's the original parser and the speedup baseline
+    backends = ['bs4', 'stream', 'lxml']
+    if tracklist_parser.lxml is None:
+        print("lxml not installed, skipping it\n")
+        backends.remove('lxml')
+
+    print(f"{'backend':>8} {'seconds':>9} {'pages/s':>9} {'speedup':>8} {'peak KB':>9}")
+    baseline_output = None
+    baseline_time = None
+    for backend in backends:
+        best = None
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            output = [tracklist_parser.parse_tracklist(page, backend) for page in pages]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        # Peak memory for a single page, measured separately from timing
+        tracemalloc.start()
+        tracklist_parser.parse_tracklist(pages[0], backend)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if baseline_output is None:
+            baseline_output, baseline_time = output, best
+        elif output != baseline_output:
+            print(f"!! {backend} output differs from {backends[0]}")
+
+        print(f"{backend:>8} {best:>9.3f} {len(pages) / best:>9.1f} "
+              f"{baseline_time / best:>7.1f}x {peak / 1024:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
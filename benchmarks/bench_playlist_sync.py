@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Playlist Sync Benchmark
+
+Syncs a synthetic tracklist into a playlist on fake_nts_server.py and counts
+Spotify calls, comparing:
+
+- per-track: one search and one add per track, the way
+  spotify_nts_playlist.py used to work
+- sync: spotify_scripts/playlist_sync.py, with concurrent lookups and
+  100-URI adds
+- re-sync: the same sync run again after --new-tracks more tracks are
+  added to the tracklist, which should only search for and add those
+
+Usage:
+    python benchmarks/bench_playlist_sync.py [--tracks 2000] [--new-tracks 150]
+                                             [--error-rate 0.02]
+"""
+
+import argparse
+import csv
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'spotify_scripts'))
+
+from fake_nts_server import FakeNTSServer  # noqa: E402
+
+
+def write_tracklist(path: str, count: int):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['TITLE', 'ARTIST'])
+        for i in range(count):
+            writer.writerow([f"Song {i}", f"Artist {i % 400}"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-track vs batched playlist sync.")
+    parser.add_argument('--tracks', type=int, default=2000)
+    parser.add_argument('--new-tracks', type=int, default=150)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Fraction of requests failing with 503, to exercise retries")
+    args = parser.parse_args()
+
+    server = FakeNTSServer(latency=args.latency, error_rate=args.error_rate)
+    server.start_background()
+    os.environ.update(server.service_env())
+    os.environ.update({'SPOTIFY_CLIENT_ID': 'fake', 'SPOTIFY_CLIENT_SECRET': 'fake',
+                       'SPOTIFY_REFRESH_TOKEN': 'fake'})
+
+    import enrich_tracks
+    import playlist_sync
+    from rate_limit import TokenBucket
+    from spotify_index import SpotifyIndex
+    logging.getLogger().setLevel(logging.ERROR)
+    # Measure calls, not the rate limit
+    enrich_tracks.spotify_limiter = TokenBucket(1000.0)
+    playlist_sync.SYNC_RETRY_DELAY = 0.1
+
+    workdir = tempfile.mkdtemp(prefix='bench_playlist_')
+    tracklist = os.path.join(workdir, 'tracks.csv')
+    client = playlist_sync.PlaylistClient(playlist_sync.get_user_token())
+
+    print(f"{args.tracks} tracks, {args.workers} workers, error rate {args.error_rate:.0%}\n")
+    print(f"{'run':>10} {'seconds':>8} {'searches':>9} {'reads':>6} {'writes':>7} {'added':>6} {'failed':>7}")
+
+    def report(name, start, searches_before, reads, writes, added, failed):
+        searches = server.counts['spotify']['requests'] - searches_before - reads - writes
+        print(f"{name:>10} {time.monotonic() - start:>8.2f} {searches:>9} {reads:>6} {writes:>7} "
+              f"{added:>6} {failed:>7}")
+
+    # Per-track: search and add one at a time
+    write_tracklist(tracklist, args.tracks)
+    tracks = playlist_sync.read_tracklist(tracklist)
+    playlist_id = client.create_playlist('per-track', '', True)
+    start, before = time.monotonic(), server.counts['spotify']['requests']
+    reads, writes = client.reads, client.writes
+    added = failed = 0
+    for title, artist, _ in tracks:
+        spotify_id = enrich_tracks.resolve_spotify_id(title, artist)
+        if spotify_id:
+            if client.add_tracks(playlist_id, [f'spotify:track:{spotify_id}']):
+                added += 1
+            else:
+                failed += 1
+    report('per-track', start, before, client.reads - reads, client.writes - writes, added, failed)
+
+    # Batched sync into a fresh playlist, then a re-sync with new tracks,
+    # using the resolution index like the real command
+    enrich_tracks.spotify_index = SpotifyIndex(workdir)
+    for name, count in (('sync', args.tracks), ('re-sync', args.tracks + args.new_tracks)):
+        write_tracklist(tracklist, count)
+        start, before = time.monotonic(), server.counts['spotify']['requests']
+        reads, writes = client.reads, client.writes
+        if name == 'sync':
+            playlist_id = client.create_playlist('sync', '', True)
+        tracks = playlist_sync.read_tracklist(tracklist)
+        uris = [uri for uri in playlist_sync.resolve_tracks(tracks, args.workers) if uri]
+        result = playlist_sync.sync_playlist(client, playlist_id, uris)
+        report(name, start, before, client.reads - reads, client.writes - writes,
+               result['added'], result['failed'])
+
+    final = server.playlists[playlist_id]['uris']
+    print(f"\nPlaylist has {len(final)} tracks, {len(final) - len(set(final))} duplicates")
+    enrich_tracks.spotify_index.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
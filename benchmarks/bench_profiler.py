@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Profiler Overhead Benchmark
+
+Scrapes a fake show (HTML tracklists, so parsing keeps the workers busy)
+with the sampling profiler off and at several rates, and reports what the
+profiler adds to the run's wall and CPU time. Each setting runs --repeat
+times, interleaved, and the fastest run counts.
+
+The fake server runs in this process too, so its threads are sampled as
+well; real runs have fewer threads to sample.
+
+Usage:
+    python benchmarks/bench_profiler.py [--episodes 200] [--workers 8] [--rates 0 10 50 100]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import nts_show_to_csv  # noqa: E402
+import profiler  # noqa: E402
+from fake_nts_server import FakeNTSServer, episode_alias  # noqa: E402
+
+
+def run(urls, workers: int, rate: float):
+    """Scrape once; returns (wall seconds, CPU seconds, profiler's own CPU seconds, samples)."""
+    p = profiler.SamplingProfiler(rate) if rate else None
+    start, cpu_start = time.perf_counter(), time.process_time()
+    if p:
+        p.start()
+    nts_show_to_csv.extract_all_tracks(urls, workers=workers, rate=None, show_progress=False, source='html')
+    if p:
+        p.stop()
+    return (time.perf_counter() - start, time.process_time() - cpu_start,
+            p.own_cpu_seconds if p else 0.0, p.samples if p else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the sampling profiler's overhead.")
+    parser.add_argument('--episodes', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--rates', type=float, nargs='+', default=[0, 10, 50, 100],
+                        help="Samples per second, 0 for no profiler")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    server = FakeNTSServer(episodes=args.episodes, latency=args.latency)
+    server.start_background()
+    urls = [f"{server.base_url}/shows/fake-show/episodes/{episode_alias(i)}" for i in range(args.episodes)]
+
+    run(urls, args.workers, 0)  # Warm up connections and the string memo
+    best = {}
+    for _ in range(args.repeat):
+        for rate in args.rates:
+            result = run(urls, args.workers, rate)
+            if rate not in best or result[0] < best[rate][0]:
+                best[rate] = result
+
+    print(f"{args.episodes} episodes, {args.workers} workers, best of {args.repeat}\n")
+    print(f"{'rate Hz':>8} {'wall s':>8} {'cpu s':>8} {'samples':>8} {'sampler cpu s':>14} {'wall vs off':>12}")
+    base = best.get(0, (None,))[0]
+    for rate in args.rates:
+        wall, cpu, own, samples = best[rate]
+        change = f"{(wall - base) / base:+.1%}" if base and rate else '-'
+        print(f"{rate:>8g} {wall:>8.2f} {cpu:>8.2f} {samples:>8} {own:>14.3f} {change:>12}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Episode Scraping Benchmark
+
+Scrapes a fake show served by fake_nts_server.py with several worker counts
+and tracklist sources, and reports episodes/sec and KB transferred for each.
+
+Usage:
+    python benchmarks/bench_scrape.py [--episodes 100] [--latency 0.2] [--workers 1 4 8 16]
+                                      [--sources api html]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import nts_show_to_csv  # noqa: E402
+from fake_nts_server import FakeNTSServer, episode_alias  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent episode scraping.")
+    parser.add_argument('--episodes', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--rate', type=float, default=0, help="Per-host rate ceiling, 0 for none")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--sources', nargs='+', default=['api', 'html'],
+                        choices=nts_show_to_csv.TRACKLIST_SOURCES)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    server = FakeNTSServer(episodes=args.episodes, latency=args.latency)
+    server.start_background()
+
+    urls = [
+        f"{server.base_url}/shows/fake-show/episodes/{episode_alias(i)}"
+        for i in range(args.episodes)
+    ]
+
+    print(f"{'source':>6} {'workers':>8} {'seconds':>9} {'episodes/s':>11} {'KB/episode':>11} {'tracks':>8}")
+    baseline = None
+    for source in args.sources:
+        for workers in args.workers:
+            bytes_before = server.bytes_sent
+            start = time.monotonic()
+            tracks = nts_show_to_csv.extract_all_tracks(
+                urls, workers=workers, rate=args.rate or None, show_progress=False, source=source
+            )
+            elapsed = time.monotonic() - start
+            kb_per_episode = (server.bytes_sent - bytes_before) / 1024 / args.episodes
+
+            # Output must not depend on the worker count or the source
+            if baseline is None:
+                baseline = tracks
+            elif tracks != baseline:
+                print(f"!! output differs with source={source}, {workers} workers")
+
+            print(f"{source:>6} {workers:>8} {elapsed:>9.2f} {args.episodes / elapsed:>11.2f} "
+                  f"{kb_per_episode:>11.1f} {len(tracks):>8}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Streaming Pipeline Benchmark
+
+Runs discovery, scraping and enrichment of a fake show (served by
+fake_nts_server.py) two ways and reports time to the first enriched row and
+total time:
+
+- staged: discover every episode, then scrape them all, then enrich them
+  all (what nts_show_to_csv.py followed by enrich_tracks.py does)
+- streaming: nts_stream.py, with every stage running at once
+
+The metadata lookups are simulated (no network access or API keys needed):
+each Last.fm and MusicBrainz search or AcousticBrainz bulk call sleeps for
+--lookup-latency, and each source is rate limited to --lookup-rate.
+
+Usage:
+    python benchmarks/bench_stream.py [--episodes 30] [--tracks 10] [--latency 0.1]
+                                      [--lookup-latency 0.05] [--lookup-rate 40]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import enrich_tracks  # noqa: E402
+import nts_show_to_csv  # noqa: E402
+import nts_stream  # noqa: E402
+import table_output  # noqa: E402
+from fake_nts_server import FakeNTSServer  # noqa: E402
+from rate_limit import TokenBucket  # noqa: E402
+
+
+def simulate_lookups(latency: float, rate: float):
+    """Replace the metadata APIs with rate-limited sleeps."""
+    enrich_tracks.SPOTIFY_CLIENT_ID = None  # No Spotify stages
+    enrich_tracks.LASTFM_API_KEY = 'simulated'
+    enrich_tracks.enrichment_cache = None
+    lastfm_limiter = TokenBucket(rate)
+    musicbrainz_limiter = TokenBucket(rate)
+    acousticbrainz_limiter = TokenBucket(rate)
+
+    def search_lastfm(title, artist):
+        lastfm_limiter.acquire()
+        time.sleep(latency)
+        return {'lastfm_playcount': len(title) * 100, 'lastfm_listeners': len(artist)}
+
+    def search_musicbrainz(title, artist):
+        musicbrainz_limiter.acquire()
+        time.sleep(latency)
+        return {'musicbrainz_id': f"mbid:{artist}:{title}", 'musicbrainz_title': title}
+
+    def get_acousticbrainz_features_batch(mbids):
+        acousticbrainz_limiter.acquire()
+        time.sleep(latency)
+        return {mbid: {'ab_bpm': float(len(mbid))} for mbid in mbids}
+
+    enrich_tracks.search_lastfm = search_lastfm
+    enrich_tracks.search_musicbrainz = search_musicbrainz
+    enrich_tracks.get_acousticbrainz_features_batch = get_acousticbrainz_features_batch
+
+
+def run_staged(output_file: str, workers: int):
+    """Discover, scrape and enrich one after another; returns (first row, total) seconds."""
+    start = time.monotonic()
+    urls = nts_show_to_csv.discover_episodes('fake-show', rate=None)
+    tracks = nts_show_to_csv.extract_all_tracks(urls, workers=workers, rate=None, show_progress=False)
+    rows = [{'TITLE': t['title'], 'ARTIST': t['artist'], 'EPISODE_URL': t['episode_url']} for t in tracks]
+    unique_tracks, row_keys = enrich_tracks.dedupe_tracks(rows)
+    enrichments = enrich_tracks.enrich_all(unique_tracks, show_progress=False)
+    enriched = [{**row, **enrichments[key]} for row, key in zip(rows, row_keys)]
+    # Nothing can be written until the whole run is done
+    first_row = time.monotonic() - start
+    columns = nts_show_to_csv.TRACK_COLUMNS + enrich_tracks.get_enrichment_columns()
+    table_output.write_rows(output_file, enriched, columns)
+    return first_row, time.monotonic() - start
+
+
+def run_streaming(output_file: str, workers: int):
+    """Run nts_stream's pipeline; returns (first row, total) seconds."""
+    start = time.monotonic()
+    run = nts_stream.StreamRun('fake-show', output_file, workers=workers, rate=None,
+                               show_progress=False)
+    run.run()
+    return run.first_row_at, time.monotonic() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark staged vs streaming runs.")
+    parser.add_argument('--episodes', type=int, default=30)
+    parser.add_argument('--tracks', type=int, default=10, help="Tracks per episode")
+    parser.add_argument('--latency', type=float, default=0.1, help="Fake NTS response latency")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--lookup-latency', type=float, default=0.05)
+    parser.add_argument('--lookup-rate', type=float, default=40.0, help="Requests/sec per source")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    simulate_lookups(args.lookup_latency, args.lookup_rate)
+
+    server = FakeNTSServer(episodes=args.episodes, tracks_per_episode=args.tracks,
+                           latency=args.latency)
+    server.start_background()
+    nts_show_to_csv.NTS_BASE_URL = server.base_url
+
+    print(f"{args.episodes} episodes x {args.tracks} tracks, {args.workers} scrape workers\n")
+    print(f"{'mode':>10} {'first row s':>12} {'total s':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = {}
+        for name, run in (('staged', run_staged), ('streaming', run_streaming)):
+            outputs[name] = os.path.join(tmp, f"{name}.csv")
+            first_row, total = run(outputs[name], args.workers)
+            print(f"{name:>10} {first_row:>12.2f} {total:>9.2f}")
+
+        # Both modes must write the same rows in the same order
+        with open(outputs['staged'], 'rb') as staged, open(outputs['streaming'], 'rb') as streaming:
+            if staged.read() != streaming.read():
+                print("!! streaming output differs from staged")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
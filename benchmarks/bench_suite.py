@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+End-to-End Benchmark Suite
+
+Runs scraping and enrichment against fake_nts_server.py at several show
+sizes (10, 100 and 1,000 episodes by default) and reports, for each run:
+
+- episodes/sec and tracks/sec
+- p50/p99 request latency as seen by the client (every attempt, retried or
+  not, is one sample)
+- peak RSS of the process doing the work
+- seconds spent in each timed stage (see metrics.py), in the --json output
+
+Each run happens in a fresh child process, so peak RSS belongs to that run
+alone, and the child finds the fake services through the same *_URL
+environment variables a real deployment would use. Client-side rate limits
+are lifted; use --rate-limit to have the server throttle instead, and
+--error-rate/--jitter to add failures and noise.
+
+Results can be saved with --json and compared against a saved run with
+--compare, so regressions show up as numbers.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 10 100 1000] [--tracks 10] [--latency 0.01]
+                                     [--jitter 0.005] [--error-rate 0] [--rate-limit 0]
+                                     [--cases scrape enrich] [--json out.json]
+                                     [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_nts_server import SERVICES, FakeNTSServer, episode_alias, episode_tracks  # noqa: E402
+
+CASES = ('scrape', 'enrich')
+DEFAULT_SIZES = [10, 100, 1000]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_scrape(episodes: int, tracks: int, workers: int):
+    """Discover and scrape the fake show. Returns (episodes, tracks)."""
+    import nts_show_to_csv
+
+    urls = nts_show_to_csv.discover_episodes('fake-show', rate=None)
+    scraped = nts_show_to_csv.extract_all_tracks(urls, workers=workers, rate=None, show_progress=False)
+    return len(urls), len(scraped)
+
+
+def run_enrich(episodes: int, tracks: int, workers: int):
+    """Enrich the fake show's tracks chunk by chunk, as enrich_tracks.py does."""
+    import enrich_tracks
+    from rate_limit import TokenBucket
+
+    enrich_tracks.enrichment_cache = None
+    for name in ('spotify_limiter', 'lastfm_limiter', 'musicbrainz_limiter', 'acousticbrainz_limiter'):
+        setattr(enrich_tracks, name, TokenBucket(None))
+
+    rows = []
+    for i in range(episodes):
+        alias = episode_alias(i)
+        for artist, title in episode_tracks(alias, tracks):
+            rows.append({'TITLE': title, 'ARTIST': artist, 'EPISODE_URL': alias})
+
+    success_count = {'spotify': 0, 'lastfm': 0, 'musicbrainz': 0, 'acousticbrainz': 0}
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')  # Silence per-chunk progress
+    memo = enrich_tracks.EnrichmentMemo()
+    try:
+        for start in range(0, len(rows), enrich_tracks.DEFAULT_CHUNK_SIZE):
+            enrich_tracks.enrich_rows(rows[start:start + enrich_tracks.DEFAULT_CHUNK_SIZE], success_count, memo)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return episodes, len(rows)
+
+
+def child(args):
+    """Run one case in this process and write its measurements to --result."""
+    import logging
+    import http_client
+    import metrics
+
+    runner = {'scrape': run_scrape, 'enrich': run_enrich}[args.child]
+    logging.getLogger().setLevel(logging.WARNING)
+
+    start = time.monotonic()
+    episodes, tracks = runner(args.episodes, args.tracks, args.workers)
+    elapsed = time.monotonic() - start
+
+    hosts = http_client.stats()
+    requests = sum(s['requests'] for s in hosts.values())
+    retries = sum(s['retries'] for s in hosts.values())
+    # Every fake service shares one host, so this covers all requests
+    host = hosts.get('127.0.0.1', {})
+    result = {
+        'case': args.child,
+        'episodes': episodes,
+        'tracks': tracks,
+        'seconds': round(elapsed, 3),
+        'episodes_per_sec': round(episodes / elapsed, 2),
+        'tracks_per_sec': round(tracks / elapsed, 2),
+        'requests': requests,
+        'retries': retries,
+        'p50_ms': host.get('p50_ms'),
+        'p99_ms': host.get('p99_ms'),
+        'peak_rss_mb': peak_rss_mb(),
+        'stage_seconds': {name: s['seconds'] for name, s in metrics.get_metrics().stages().items()},
+    }
+    with open(args.result, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+
+def run_case(case: str, size: int, args, server: FakeNTSServer, workdir: str):
+    """Run one case in a child process; returns its result dict, or None if it failed."""
+    result_path = os.path.join(workdir, f"{case}-{size}.json")
+    env = dict(os.environ)
+    env.update(server.service_env())
+    env.update({
+        'SPOTIFY_CLIENT_ID': 'fake', 'SPOTIFY_CLIENT_SECRET': 'fake', 'LASTFM_API_KEY': 'fake',
+        'NTS_CACHE_DIR': os.path.join(workdir, 'cache'),
+    })
+    command = [sys.executable, os.path.abspath(__file__), '--child', case,
+               '--episodes', str(size), '--tracks', str(args.tracks),
+               '--workers', str(args.workers), '--result', result_path]
+
+    counts_before = {name: dict(server.counts[name]) for name in SERVICES}
+    # The scripts log to files in the working directory, so run in the temp dir
+    proc = subprocess.run(command, env=env, cwd=workdir, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(f"!! {case} x {size} failed:\n{proc.stderr[-2000:]}")
+        return None
+
+    with open(result_path, encoding='utf-8') as f:
+        result = json.load(f)
+    result['size'] = size
+    result['throttled'] = sum(server.counts[n]['throttled'] - counts_before[n]['throttled'] for n in SERVICES)
+    result['errors_injected'] = sum(server.counts[n]['errors'] - counts_before[n]['errors'] for n in SERVICES)
+    return result
+
+
+def _change(new, old) -> str:
+    if not new or not old:
+        return '-'
+    return f"{(new - old) / old:+.0%}"
+
+
+def print_results(results, baseline=None):
+    print(f"{'case':<7} {'episodes':>8} {'tracks':>7} {'seconds':>8} {'eps/s':>8} {'tracks/s':>9} "
+          f"{'p50ms':>7} {'p99ms':>7} {'RSS MB':>7} {'429s':>5} {'5xx':>5}"
+          + (f" {'tracks/s vs base':>17} {'RSS vs base':>12}" if baseline else ''))
+    for r in results:
+        line = (f"{r['case']:<7} {r['episodes']:>8} {r['tracks']:>7} {r['seconds']:>8.2f} "
+                f"{r['episodes_per_sec']:>8.1f} {r['tracks_per_sec']:>9.1f} "
+                f"{r['p50_ms'] if r['p50_ms'] is not None else '-':>7} "
+                f"{r['p99_ms'] if r['p99_ms'] is not None else '-':>7} "
+                f"{r['peak_rss_mb'] if r['peak_rss_mb'] is not None else '-':>7} "
+                f"{r['throttled']:>5} {r['errors_injected']:>5}")
+        if baseline:
+            old = baseline.get((r['case'], r['size']))
+            if old:
+                line += (f" {_change(r['tracks_per_sec'], old['tracks_per_sec']):>17}"
+                         f" {_change(r['peak_rss_mb'], old['peak_rss_mb']):>12}")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end scrape/enrich benchmarks on fake services.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Episodes per run")
+    parser.add_argument('--tracks', type=int, default=10, help="Tracks per episode")
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+    parser.add_argument('--workers', type=int, default=8, help="Scrape workers")
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--jitter', type=float, default=0.005)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help="Server-side requests/sec per service, 0 for none")
+    parser.add_argument('--json', help="Save results to this file")
+    parser.add_argument('--compare', help="Results file from an earlier run to compare against")
+    # Internal: run a single case in this process
+    parser.add_argument('--child', choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument('--episodes', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = {(r['case'], r['size']): r for r in json.load(f)['results']}
+
+    server = FakeNTSServer(episodes=max(args.sizes), tracks_per_episode=args.tracks,
+                           latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           rate_limits={name: args.rate_limit for name in SERVICES})
+    server.start_background()
+
+    print(f"Fake services at {server.base_url}: latency {args.latency * 1000:.0f}ms "
+          f"+ up to {args.jitter * 1000:.0f}ms jitter, error rate {args.error_rate:.1%}, "
+          f"rate limit {args.rate_limit or 'none'}\n")
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            # Only the first `size` episodes are listed for this run
+            server.aliases = [episode_alias(i) for i in range(size)]
+            server.alias_index = {alias: i for i, alias in enumerate(server.aliases)}
+            for case in args.cases:
+                result = run_case(case, size, args, server, workdir)
+                if result:
+                    results.append(result)
+                    print(f"  {case} x {size} episodes: {result['seconds']:.1f}s")
+    server.shutdown()
+
+    print()
+    print_results(results, baseline)
+
+    if args.json:
+        config = {k: getattr(args, k) for k in ('tracks', 'workers', 'latency', 'jitter',
+                                                'error_rate', 'rate_limit')}
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': config, 'results': results}, f, indent=2)
+        print(f"\nSaved results to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
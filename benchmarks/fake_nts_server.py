@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+Fake NTS Server
+
+A local stand-in for every service the scripts talk to, so benchmarks never
+touch the real ones. One server answers for all of them, each under its own
+path prefix:
+
+    /                          NTS: episode pages, paginated episodes API,
+                               per-episode tracklist API
+    /spotify-accounts/         Spotify token endpoint
+    /spotify/v1/               Spotify search, tracks, audio-features, and
+                               the current user's playlists (kept in memory)
+    /lastfm/2.0/               Last.fm track.getInfo
+    /musicbrainz/ws/2/         MusicBrainz recording search
+    /acousticbrainz/api/v1/    AcousticBrainz bulk low-level/high-level
+
+Responses are generated deterministically from the request, shaped like
+the real APIs. Episode pages and tracklists can instead be replayed from
+recordings: `<alias>.html` and `<alias>.json` files in a directory (e.g.
+benchmarks/fixtures/).
+
+Every response waits `latency` seconds plus up to `jitter` more. A fraction
+`error_rate` of requests fail with a 503, and each service can be rate
+limited, answering 429 with Retry-After when over its budget. NTS pages carry
+an ETag and answer If-None-Match with 304 when unchanged.
+
+Usage:
+    python benchmarks/fake_nts_server.py [--port 8765] [--episodes 300] [--latency 0.2]
+                                         [--jitter 0.05] [--error-rate 0.01]
+                                         [--rate-limit 20] [--recordings benchmarks/fixtures]
+
+Then point the scripts at it (the server prints these on startup):
+    NTS_BASE_URL=http://127.0.0.1:8765 python nts_show_to_csv.py fake-show
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+# Spotify's limit on URIs per playlist add
+PLAYLIST_ADD_LIMIT = 100
+FAKE_USER_ID = 'fake-user'
+
+SERVICES = ('nts', 'spotify', 'lastfm', 'musicbrainz', 'acousticbrainz')
+
+# Path prefix of each non-NTS service, and the environment variable that
+# points the scripts at it
+SERVICE_PREFIXES = {
+    'spotify-accounts': 'spotify',
+    'spotify': 'spotify',
+    'lastfm': 'lastfm',
+    'musicbrainz': 'musicbrainz',
+    'acousticbrainz': 'acousticbrainz',
+}
+SERVICE_ENV = {
+    'NTS_BASE_URL': '',
+    'SPOTIFY_ACCOUNTS_URL': '/spotify-accounts',
+    'SPOTIFY_API_URL': '/spotify/v1',
+    'LASTFM_API_URL': '/lastfm/2.0',
+    'MUSICBRAINZ_API_URL': '/musicbrainz/ws/2',
+    'ACOUSTICBRAINZ_API_URL': '/acousticbrainz/api/v1',
+}
+
+# Fraction of lookups each metadata service has no match for
+MISS_RATE = 0.1
+
+# Padding per AcousticBrainz low-level document, standing in for the
+# frame-level descriptors the client prunes while decoding
+LOW_LEVEL_PADDING = 200
+
+
+def episode_alias(index: int) -> str:
+    """Alias for the index-th episode (0 is the newest)."""
+    return f"fake-episode-{index:04d}"
+
+
+def episode_tracks(alias: str, tracks_per_episode: int):
+    """The (artist, title) pairs on an episode's tracklist."""
+    return [
+        (f"Artist {alias[-4:]}-{i} feat. Guest", f"Très Bien Song {i}")
+        for i in range(tracks_per_episode)
+    ]
+
+
+def render_tracklist_json(alias: str, tracks_per_episode: int) -> str:
+    """Build a tracklist API response shaped like the real NTS one."""
+    results = [
+        {'artist': artist, 'title': title, 'uid': f"{alias}-{i}", 'offset': i * 240, 'duration': 240}
+        for i, (artist, title) in enumerate(episode_tracks(alias, tracks_per_episode))
+    ]
+    return json.dumps({
+        'metadata': {'resultset': {'count': len(results), 'offset': 0, 'limit': len(results)}},
+        'results': results,
+    })
+
+
+def render_episode_html(alias: str, tracks_per_episode: int) -> str:
+    """Build an episode page shaped like the real NTS markup."""
+    items = []
+    for artist, title in episode_tracks(alias, tracks_per_episode):
+        # Real pages wrap the main artist in its own span
+        name, _, featured = artist.partition(' feat. ')
+        items.append(f'''        <li class="track">
+          <span class="track__artist"><span class="track__artist-name">{name}</span> feat. {featured}</span>
+          <span class="track__title">{title}</span>
+        </li>''')
+    tracks = "\n".join(items)
+    # Pad the page with unrelated markup so parsing cost is realistic
+    links = [
+        f'<div class="nts-grid-v2-item"><a href="/shows/other/episodes/x-{i}">Other {i}</a></div>'
+        for i in range(200)
+    ]
+    return f"""<!DOCTYPE html>
+<html>
+<head><title>{alias}</title></head>
+<body>
+  <header><nav>{"".join(links[:20])}</nav></header>
+  <div id="episode-container">
+    <h1>{alias}</h1>
+    <ul class="tracklist">
+{tracks}
+    </ul>
+  </div>
+  <footer>{"".join(links)}</footer>
+  <script>window.__NTS_STATE__ = {json.dumps({'links': links})};</script>
+</body>
+</html>
+"""
+
+
+# --- Metadata service responses -------------------------------------------
+
+def _digest(*parts: str) -> bytes:
+    return hashlib.md5('\x1f'.join(parts).encode('utf-8')).digest()
+
+
+def _found(digest: bytes) -> bool:
+    """Deterministically decide whether a lookup has a match."""
+    return digest[0] >= 256 * MISS_RATE
+
+
+def _unit(digest: bytes, i: int) -> float:
+    """A deterministic value in [0, 1) from one byte of a digest."""
+    return digest[i % len(digest)] / 256
+
+
+def fake_spotify_id(digest: bytes) -> str:
+    return digest.hex()[:22]
+
+
+def fake_mbid(digest: bytes) -> str:
+    return str(uuid.UUID(bytes=digest))
+
+
+def spotify_track(spotify_id: str, name: Optional[str] = None, artists: Optional[List[str]] = None) -> Dict:
+    d = _digest('spotify', spotify_id)
+    return {
+        'id': spotify_id,
+        'name': name or f"Track {spotify_id[:6]}",
+        'artists': [{'name': a} for a in artists or [f"Artist {spotify_id[6:10]}"]],
+        'popularity': d[1] % 100,
+        'duration_ms': 120000 + d[2] * 1000,
+        'explicit': d[3] < 25,
+        'preview_url': None,
+        'album': {'name': f"Album {spotify_id[:4]}", 'release_date': f"{1970 + d[4] % 55}-01-01"},
+    }
+
+
+def spotify_features(spotify_id: str) -> Dict:
+    d = _digest('features', spotify_id)
+    return {
+        'id': spotify_id,
+        'danceability': _unit(d, 0), 'energy': _unit(d, 1), 'key': d[2] % 12,
+        'loudness': -30 + _unit(d, 3) * 30, 'mode': d[4] % 2, 'speechiness': _unit(d, 5),
+        'acousticness': _unit(d, 6), 'instrumentalness': _unit(d, 7), 'liveness': _unit(d, 8),
+        'valence': _unit(d, 9), 'tempo': 60 + _unit(d, 10) * 120, 'time_signature': 4,
+    }
+
+
+def spotify_search(query: str) -> Dict:
+    """Echo the queried track back, sometimes behind a cover version, like real search does."""
+    d = _digest('search', query)
+    if not _found(d):
+        return {'tracks': {'items': [], 'total': 0}}
+    title, _, artist = query.partition(' artist:')
+    title = title.replace('track:', '', 1).strip()
+    items = [spotify_track(fake_spotify_id(d), title, [artist.strip()])]
+    if d[5] % 4 == 0:
+        cover_id = fake_spotify_id(_digest('cover', query))
+        items.insert(0, spotify_track(cover_id, f"{title} (Cover)", ["Tribute Band"]))
+    return {'tracks': {'items': items, 'total': len(items)}}
+
+
+def lastfm_track_info(artist: str, title: str) -> Dict:
+    d = _digest('lastfm', artist, title)
+    if not _found(d):
+        return {'error': 6, 'message': 'Track not found'}
+    tags = ['electronic', 'house', 'jazz', 'ambient', 'dub', 'techno']
+    return {'track': {
+        'name': title,
+        'url': f"https://www.last.fm/music/{d.hex()[:8]}",
+        'playcount': str(d[1] * 1000),
+        'listeners': str(d[2] * 100),
+        'toptags': {'tag': [{'name': tags[b % len(tags)]} for b in d[3:5]]},
+    }}
+
+
+def musicbrainz_search(query: str) -> Dict:
+    """Echo the queried recording back, sometimes behind a same-titled one by someone else."""
+    d = _digest('musicbrainz', query)
+    if not _found(d):
+        return {'count': 0, 'recordings': []}
+    match = re.match(r'recording:"(.*)" AND artist:"(.*)"$', query)
+    title, artist = match.groups() if match else (query, '')
+    recordings = [{
+        'id': fake_mbid(d),
+        'title': title,
+        'artist-credit': [{'name': artist}],
+        'length': 120000 + d[1] * 1000,
+        'tags': [{'name': 'electronic', 'count': 1}],
+        'releases': [{'country': ['GB', 'US', 'DE', 'JP'][d[2] % 4], 'date': f"{1970 + d[3] % 55}"}],
+    }]
+    if d[5] % 4 == 0:
+        recordings.insert(0, {'id': fake_mbid(_digest('other', query)), 'title': title,
+                              'artist-credit': [{'name': "Session Players"}], 'length': 90000})
+    return {'count': len(recordings), 'recordings': recordings}
+
+
+def acousticbrainz_bulk(level: str, mbids: List[str]) -> Dict:
+    docs = {}
+    for mbid in mbids:
+        d = _digest('acousticbrainz', mbid)
+        if not _found(d):
+            continue  # Unknown recordings are simply absent
+        if level == 'low-level':
+            doc = {
+                'rhythm': {'bpm': 60 + _unit(d, 1) * 120, 'beats_count': d[2] * 4},
+                'tonal': {'key_key': 'CDEFGAB'[d[3] % 7], 'key_scale': ['major', 'minor'][d[4] % 2],
+                          'key_strength': _unit(d, 5)},
+                'lowlevel': {'average_loudness': _unit(d, 6),
+                             'mfcc': {'mean': [_unit(d, i) for i in range(LOW_LEVEL_PADDING)]}},
+            }
+        else:
+            doc = {'highlevel': {
+                name: {'all': {value: _unit(d, i), f"not_{value}": 1 - _unit(d, i)}}
+                for i, (name, value) in enumerate([
+                    ('danceability', 'danceable'), ('mood_aggressive', 'aggressive'),
+                    ('mood_happy', 'happy'), ('mood_relaxed', 'relaxed'),
+                    ('voice_instrumental', 'instrumental'),
+                ])
+            }}
+        docs[mbid] = {'0': doc}
+    return docs
+
+
+class _Budget:
+    """Non-blocking token bucket: says how long until the next request is allowed."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; return 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(1.0, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class FakeNTSHandler(BaseHTTPRequestHandler):
+    """Request handler; configuration lives on the server object."""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without TCP_NODELAY the
+    # body waits on the client's delayed ACK (~40ms per response)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send(self, status: int, body: bytes, content_type: str,
+              headers: Optional[Dict[str, str]] = None):
+        with self.server.lock:
+            self.server.bytes_sent += len(body)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, data):
+        self._send(200, json.dumps(data).encode('utf-8'), 'application/json')
+
+    def _send_page(self, body: bytes, content_type: str):
+        """Send an NTS page with an ETag, or a 304 if the client's copy is current."""
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            with self.server.lock:
+                self.server.counts['nts']['not_modified'] += 1
+            self._send(304, b'', content_type, {'ETag': etag})
+            return
+        self._send(200, body, content_type, {'ETag': etag})
+
+    def _not_found(self):
+        self._send(404, b'not found', 'text/plain')
+
+    def do_POST(self):
+        # Always read the body, so the connection can be reused
+        self.body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        self.do_GET()
+
+    def do_GET(self):
+        server = self.server
+        if self.command == 'GET':
+            self.body = b''
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split('/') if p]
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        service = SERVICE_PREFIXES.get(parts[0], 'nts') if parts else 'nts'
+
+        status, delay = server.admit(service)
+        if delay:
+            time.sleep(delay)
+        if status == 429:
+            retry_after = str(max(1, math.ceil(server.retry_after(service))))
+            self._send(429, b'rate limited', 'text/plain', {'Retry-After': retry_after})
+            return
+        if status == 503:
+            self._send(503, b'injected error', 'text/plain')
+            return
+
+        if service == 'nts':
+            self._handle_nts(parts, query)
+        else:
+            self._handle_metadata(parts, query)
+
+    def _handle_nts(self, parts: List[str], query: Dict[str, str]):
+        server = self.server
+
+        # /api/v2/shows/<show>/episodes?limit=&offset=
+        if parts[:3] == ['api', 'v2', 'shows'] and len(parts) == 5 and parts[4] == 'episodes':
+            limit = min(int(query.get('limit', '12')), server.max_page_size)
+            offset = int(query.get('offset', '0'))
+            results = [{'episode_alias': alias} for alias in server.aliases[offset:offset + limit]]
+            self._send_page(json.dumps({
+                'metadata': {'resultset': {
+                    'count': len(server.aliases), 'offset': offset, 'limit': limit,
+                }},
+                'results': results,
+            }).encode('utf-8'), 'application/json')
+            return
+
+        # /api/v2/shows/<show>/episodes/<alias>/tracklist
+        if parts[:3] == ['api', 'v2', 'shows'] and len(parts) == 7 and parts[6] == 'tracklist':
+            alias = parts[5]
+            index = server.alias_index.get(alias)
+            if index is None:
+                self._not_found()
+                return
+            recorded = server.recording(alias, '.json')
+            if recorded is not None:
+                self._send_page(recorded, 'application/json')
+                return
+            if server.missing_tracklist_every and index % server.missing_tracklist_every == 0:
+                body = json.dumps({'metadata': {'resultset': {'count': 0}}, 'results': []})
+            else:
+                body = render_tracklist_json(alias, server.tracks_per_episode)
+            self._send_page(body.encode('utf-8'), 'application/json')
+            return
+
+        # /shows/<show>/episodes/<alias>
+        if parts[:1] == ['shows'] and len(parts) == 4 and parts[2] == 'episodes':
+            html = server.recording(parts[3], '.html')
+            if html is None:
+                html = render_episode_html(parts[3], server.tracks_per_episode).encode('utf-8')
+            self._send_page(html, 'text/html; charset=utf-8')
+            return
+
+        self._not_found()
+
+    def _handle_metadata(self, parts: List[str], query: Dict[str, str]):
+        path = '/'.join(parts)
+        if path == 'spotify-accounts/api/token':
+            self._send_json({'access_token': 'fake-token', 'token_type': 'Bearer', 'expires_in': 3600})
+        elif path == 'spotify/v1/search':
+            self._send_json(spotify_search(query.get('q', '')))
+        elif path == 'spotify/v1/tracks':
+            ids = query.get('ids', '').split(',')
+            self._send_json({'tracks': [spotify_track(i) for i in ids]})
+        elif path == 'spotify/v1/audio-features':
+            ids = query.get('ids', '').split(',')
+            self._send_json({'audio_features': [spotify_features(i) for i in ids]})
+        elif parts[:2] == ['spotify', 'v1'] and parts[2:3] in (['me'], ['users'], ['playlists']):
+            self._handle_playlists(parts[2:], query)
+        elif path == 'lastfm/2.0':
+            self._send_json(lastfm_track_info(query.get('artist', ''), query.get('track', '')))
+        elif path == 'musicbrainz/ws/2/recording':
+            self._send_json(musicbrainz_search(query.get('query', '')))
+        elif path in ('acousticbrainz/api/v1/low-level', 'acousticbrainz/api/v1/high-level'):
+            mbids = [m for m in query.get('recording_ids', '').split(';') if m]
+            self._send_json(acousticbrainz_bulk(parts[-1], mbids))
+        else:
+            self._not_found()
+
+    def _handle_playlists(self, parts: List[str], query: Dict[str, str]):
+        """The user's playlists, with Spotify's paging and 100-URI add limit."""
+        server = self.server
+        offset = int(query.get('offset', '0'))
+        limit = int(query.get('limit', '20'))
+
+        def page(items: List[Dict], max_limit: int) -> Tuple[int, Dict]:
+            if limit > max_limit:
+                return 400, {'error': 'limit too large'}
+            end = offset + limit
+            next_url = None
+            if end < len(items):
+                next_url = f"{server.base_url}{urlparse(self.path).path}?offset={end}&limit={limit}"
+            return 200, {'items': items[offset:end], 'total': len(items), 'next': next_url}
+
+        status, body = 404, {'error': 'not found'}
+        with server.lock:
+            if parts == ['me']:
+                status, body = 200, {'id': FAKE_USER_ID}
+            elif parts == ['me', 'playlists']:
+                status, body = page([{'id': pid, 'name': p['name']} for pid, p in server.playlists.items()], 50)
+            elif parts[0] == 'users' and parts[2:] == ['playlists'] and self.command == 'POST':
+                playlist_id = uuid.uuid4().hex[:22]
+                name = json.loads(self.body or b'{}').get('name', '')
+                server.playlists[playlist_id] = {'name': name, 'uris': []}
+                status, body = 201, {'id': playlist_id, 'name': name}
+            elif parts[0] == 'playlists' and len(parts) == 3 and parts[1] in server.playlists:
+                playlist = server.playlists[parts[1]]
+                if self.command == 'GET':
+                    status, body = page([{'track': {'uri': uri}} for uri in playlist['uris']], 100)
+                else:
+                    uris = json.loads(self.body or b'{}').get('uris', [])
+                    if not uris or len(uris) > PLAYLIST_ADD_LIMIT:
+                        status, body = 400, {'error': 'between 1 and 100 uris per request'}
+                    else:
+                        playlist['uris'].extend(uris)
+                        server.playlist_writes += 1
+                        status, body = 201, {'snapshot_id': uuid.uuid4().hex}
+        self._send(status, json.dumps(body).encode('utf-8'), 'application/json')
+
+
+class FakeNTSServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the fake services' configuration."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, episodes: int = 300,
+                 tracks_per_episode: int = 20, latency: float = 0.0,
+                 max_page_size: int = 50, missing_tracklist_every: int = 0,
+                 jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 recordings_dir: Optional[str] = None, seed: int = 0):
+        super().__init__(('127.0.0.1', port), FakeNTSHandler)
+        self.tracks_per_episode = tracks_per_episode
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_page_size = max_page_size
+        # Every Nth episode has an empty API tracklist (0 for none), to
+        # exercise the HTML fallback
+        self.missing_tracklist_every = missing_tracklist_every
+        self.recordings_dir = recordings_dir
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        # {playlist id: {'name', 'uris'}} for the fake Spotify user
+        self.playlists: Dict[str, Dict] = {}
+        self.playlist_writes = 0
+        self._random = random.Random(seed)
+
+        # Requests/sec allowed per service (missing or 0 for no limit)
+        self.budgets = {name: _Budget(rate) for name, rate in (rate_limits or {}).items() if rate}
+        self.counts = {name: {'requests': 0, 'throttled': 0, 'errors': 0, 'not_modified': 0} for name in SERVICES}
+
+        # Recorded episodes replace the synthetic ones
+        recorded = self._recorded_aliases()
+        self.aliases = recorded or [episode_alias(i) for i in range(episodes)]
+        self.alias_index = {alias: i for i, alias in enumerate(self.aliases)}
+
+    @property
+    def episodes(self) -> int:
+        return len(self.aliases)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def service_env(self) -> Dict[str, str]:
+        """Environment variables that point every script at this server."""
+        return {name: f"{self.base_url}{prefix}" for name, prefix in SERVICE_ENV.items()}
+
+    def _recorded_aliases(self) -> List[str]:
+        if not self.recordings_dir:
+            return []
+        paths = glob.glob(os.path.join(self.recordings_dir, '*.html'))
+        paths += glob.glob(os.path.join(self.recordings_dir, '*.json'))
+        return sorted({os.path.splitext(os.path.basename(p))[0] for p in paths})
+
+    def recording(self, alias: str, ext: str) -> Optional[bytes]:
+        """A recorded response for `alias`, or None to generate one."""
+        if not self.recordings_dir or os.path.basename(alias) != alias:
+            return None
+        try:
+            with open(os.path.join(self.recordings_dir, alias + ext), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def admit(self, service: str) -> Tuple[int, float]:
+        """
+        Decide how to answer a request: (200, 429 or 503, seconds to wait
+        before answering).
+        """
+        with self.lock:
+            counts = self.counts[service]
+            counts['requests'] += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            budget = self.budgets.get(service)
+            if budget and budget.take():
+                counts['throttled'] += 1
+                return 429, delay
+            if self.error_rate and self._random.random() < self.error_rate:
+                counts['errors'] += 1
+                return 503, delay
+            return 200, delay
+
+    def retry_after(self, service: str) -> float:
+        """Seconds a throttled client should wait."""
+        budget = self.budgets.get(service)
+        return 1 / budget.rate if budget else 0.0
+
+    def start_background(self) -> threading.Thread:
+        """Serve from a daemon thread and return it."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake NTS and metadata services locally.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--episodes', type=int, default=300)
+    parser.add_argument('--tracks', type=int, default=20, help="Tracks per episode")
+    parser.add_argument('--latency', type=float, default=0.2, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Up to this many extra seconds, at random")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests failing with 503")
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help="Requests/sec allowed per service before 429s, 0 for none")
+    parser.add_argument('--recordings', help="Directory of recorded <alias>.html/.json episodes")
+    args = parser.parse_args()
+
+    rate_limits = {name: args.rate_limit for name in SERVICES}
+    server = FakeNTSServer(args.port, args.episodes, args.tracks, args.latency,
+                           jitter=args.jitter, error_rate=args.error_rate,
+                           rate_limits=rate_limits, recordings_dir=args.recordings)
+    print(f"Fake services serving {server.episodes} episodes at {server.base_url}")
+    print("Point the scripts at it with:")
+    for name, url in server.service_env().items():
+        print(f"  export {name}={url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+"""
+NTS Track Catalogue
+
+One persistent SQLite catalogue of every show, episode, artist and track
+scraped, with each play (a track's slot on an episode's tracklist) as an
+edge between an episode and a track. Per-show outputs stay as they are;
+the catalogue is what answers questions across shows.
+
+- Artists and tracks are keyed like the lookup caches (track_key()), so
+  the same track is one row whichever show played it
+- An inverted index maps each normalized word of an artist name or title
+  to the artists/tracks containing it, so "every show that played X" also
+  finds "X & Y" collaborations
+- Play counts are kept up to date per track and per track per year as
+  episodes are written, so "most played" queries read an index instead of
+  counting plays
+- nts_show_to_csv.py (and nts_batch.py) write each scraped episode into it;
+  enrich_tracks.py adds each track's Spotify/MusicBrainz IDs and the rest of
+  its enrichment. Re-scraping an episode replaces its plays
+
+Episode dates come from the episode alias ("...-23rd-march-2022").
+
+Usage:
+    python catalogue.py import *_complete.csv *_enriched.parquet
+    python catalogue.py artist "Tazar Yoot"
+    python catalogue.py top --year 2022
+    python catalogue.py search "genesis"
+    python catalogue.py stats
+
+    catalogue = Catalogue()
+    catalogue.record_episodes(show_name, [(episode_url, tracks), ...])
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from enrich_cache import DEFAULT_CACHE_DIR, KEY_RULES_VERSION, track_key
+from normalize import clean_string
+from table_output import RowReader
+
+CATALOGUE_FILENAME = 'catalogue.sqlite3'
+
+# Columns of scraped outputs; anything else in an imported file is enrichment
+TRACK_COLUMNS = ('TITLE', 'ARTIST', 'EPISODE_URL')
+
+# SQLite page cache per connection
+CACHE_SIZE_KB = 64 * 1024
+
+# A search expected to match more tracks than this walks tracks from the
+# most played instead of collecting every match and sorting
+DENSE_MATCHES = 2000
+
+# Imports log their progress every this many rows
+IMPORT_PROGRESS_ROWS = 50000
+
+_WORD = re.compile(r'\w+')
+# "rachel-grace-almeida-23rd-march-2022", optionally with a "-2" repeat suffix
+_ALIAS_DATE = re.compile(r'-(\d{1,2})(?:st|nd|rd|th)-([a-z]+)-(\d{4})(?:-\d+)?$')
+_MONTHS = {name: i for i, name in enumerate(
+    ('january', 'february', 'march', 'april', 'may', 'june', 'july',
+     'august', 'september', 'october', 'november', 'december'), 1)}
+# NTS episode URLs: .../shows/<show>/episodes/<alias>
+_EPISODE_URL = re.compile(r'/shows/([^/]+)/episodes/([^/?#]+)')
+
+
+def tokens(cleaned: str) -> Set[str]:
+    """Words of an already-normalized string, as stored in the inverted index."""
+    return set(_WORD.findall(cleaned))
+
+
+def query_words(query: str) -> List[str]:
+    """Index words of a free-text query, normalized like the catalogue's keys."""
+    return sorted(tokens(clean_string(query, KEY_RULES_VERSION)))
+
+
+def episode_date(alias: str) -> Optional[str]:
+    """ISO date of an episode from its alias, or None if it doesn't carry one."""
+    match = _ALIAS_DATE.search(alias)
+    if not match or match.group(2) not in _MONTHS:
+        return None
+    day, month, year = int(match.group(1)), _MONTHS[match.group(2)], int(match.group(3))
+    if not 1 <= day <= 31:
+        return None
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def parse_episode_url(url: str) -> Tuple[Optional[str], str]:
+    """(show slug or None, episode alias) from an episode URL."""
+    match = _EPISODE_URL.search(url)
+    if match:
+        return match.group(1), match.group(2)
+    return None, url.rstrip('/').rsplit('/', 1)[-1]
+
+
+class Catalogue:
+    """Thread-safe SQLite catalogue of shows, episodes, tracks and plays."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, CATALOGUE_FILENAME)
+
+        self.episodes_written = 0
+        self.plays_written = 0
+        self.tracks_enriched = 0
+        self._lock = threading.Lock()
+
+        # IDs never change once assigned, so they're remembered after the first lookup
+        self._artist_ids: Dict[str, int] = {}
+        self._track_ids: Dict[str, int] = {}
+        # Index rows for artists/tracks added in the current transaction
+        self._new_artist_words: List[Tuple[str, int]] = []
+        self._new_title_words: List[Tuple[str, int]] = []
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        # The indexes are updated all over on every write, so keep more of them in memory
+        self._conn.execute(f'PRAGMA cache_size = -{CACHE_SIZE_KB}')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS shows (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS episodes (
+                id INTEGER PRIMARY KEY,
+                show_id INTEGER NOT NULL,
+                alias TEXT UNIQUE NOT NULL,
+                url TEXT NOT NULL,
+                date TEXT,
+                year INTEGER,
+                scraped_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS episodes_show ON episodes (show_id, date);
+            CREATE TABLE IF NOT EXISTS artists (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS tracks (
+                id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL,
+                artist_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                plays INTEGER NOT NULL DEFAULT 0,
+                spotify_id TEXT,
+                musicbrainz_id TEXT,
+                enrichment TEXT,
+                enriched_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS tracks_artist ON tracks (artist_id);
+            CREATE INDEX IF NOT EXISTS tracks_plays ON tracks (plays);
+            CREATE TABLE IF NOT EXISTS plays (
+                episode_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                track_id INTEGER NOT NULL,
+                PRIMARY KEY (episode_id, position)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS plays_track ON plays (track_id, episode_id);
+            CREATE TABLE IF NOT EXISTS yearly_plays (
+                year INTEGER NOT NULL,
+                track_id INTEGER NOT NULL,
+                plays INTEGER NOT NULL,
+                PRIMARY KEY (year, track_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS yearly_plays_rank ON yearly_plays (year, plays);
+            CREATE TABLE IF NOT EXISTS artist_words (
+                word TEXT NOT NULL,
+                artist_id INTEGER NOT NULL,
+                PRIMARY KEY (word, artist_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS title_words (
+                word TEXT NOT NULL,
+                track_id INTEGER NOT NULL,
+                PRIMARY KEY (word, track_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS word_counts (
+                word TEXT PRIMARY KEY,
+                artists INTEGER NOT NULL,
+                tracks INTEGER NOT NULL
+            ) WITHOUT ROWID;
+        ''')
+        self._conn.commit()
+
+    def _show_id(self, name: str) -> int:
+        self._conn.execute('INSERT OR IGNORE INTO shows (name) VALUES (?)', (name,))
+        return self._conn.execute('SELECT id FROM shows WHERE name = ?', (name,)).fetchone()[0]
+
+    def _artist_id(self, name: str) -> int:
+        """Find or add an artist. Caller holds the lock."""
+        artist_id = self._artist_ids.get(name)
+        if artist_id is None:
+            row = self._conn.execute('SELECT id FROM artists WHERE name = ?', (name,)).fetchone()
+            if row:
+                artist_id = row[0]
+            else:
+                artist_id = self._conn.execute('INSERT INTO artists (name) VALUES (?)', (name,)).lastrowid
+                self._new_artist_words.extend((word, artist_id) for word in tokens(name))
+            self._artist_ids[name] = artist_id
+        return artist_id
+
+    def _track_id(self, artist: str, title: str) -> int:
+        """Find or add a track (and its artist). Caller holds the lock."""
+        key = track_key(artist, title)
+        track_id = self._track_ids.get(key)
+        if track_id is None:
+            row = self._conn.execute('SELECT id FROM tracks WHERE key = ?', (key,)).fetchone()
+            if row:
+                track_id = row[0]
+            else:
+                clean_artist, clean_title = key.split('\x1f')
+                track_id = self._conn.execute(
+                    'INSERT INTO tracks (key, artist_id, title) VALUES (?, ?, ?)',
+                    (key, self._artist_id(clean_artist), clean_title)
+                ).lastrowid
+                self._new_title_words.extend((word, track_id) for word in tokens(clean_title))
+            self._track_ids[key] = track_id
+        return track_id
+
+    def _commit(self, totals: Optional[Counter] = None, yearly: Optional[Counter] = None):
+        """Write the new index words and play count changes, then commit. Caller holds the lock."""
+        if self._new_artist_words or self._new_title_words:
+            self._conn.executemany('INSERT OR IGNORE INTO artist_words (word, artist_id) VALUES (?, ?)',
+                                   self._new_artist_words)
+            self._conn.executemany('INSERT OR IGNORE INTO title_words (word, track_id) VALUES (?, ?)',
+                                   self._new_title_words)
+            self._conn.executemany(
+                'INSERT INTO word_counts (word, artists, tracks) VALUES (?, ?, ?) '
+                'ON CONFLICT (word) DO UPDATE SET artists = artists + excluded.artists, '
+                'tracks = tracks + excluded.tracks',
+                [(word, artists, tracks) for word, (artists, tracks) in self._word_deltas().items()]
+            )
+            self._new_artist_words, self._new_title_words = [], []
+        if totals:
+            self._conn.executemany('UPDATE tracks SET plays = plays + ? WHERE id = ?',
+                                   [(n, track_id) for track_id, n in totals.items() if n])
+        if yearly:
+            self._conn.executemany(
+                'INSERT INTO yearly_plays (year, track_id, plays) VALUES (?, ?, ?) '
+                'ON CONFLICT (year, track_id) DO UPDATE SET plays = plays + excluded.plays',
+                [(year, track_id, n) for (year, track_id), n in yearly.items() if n]
+            )
+            if any(n < 0 for n in yearly.values()):
+                self._conn.execute('DELETE FROM yearly_plays WHERE plays <= 0')
+        self._conn.commit()
+
+    def _rollback(self):
+        """Undo the current transaction, forgetting IDs it may have assigned. Caller holds the lock."""
+        self._conn.rollback()
+        self._artist_ids.clear()
+        self._track_ids.clear()
+        self._new_artist_words, self._new_title_words = [], []
+
+    def _word_deltas(self) -> Dict[str, List[int]]:
+        deltas: Dict[str, List[int]] = {}
+        for word, _ in self._new_artist_words:
+            deltas.setdefault(word, [0, 0])[0] += 1
+        for word, _ in self._new_title_words:
+            deltas.setdefault(word, [0, 0])[1] += 1
+        return deltas
+
+    def _write_episode(self, show_id: int, url: str, tracks: List[Dict[str, str]],
+                       totals: Counter, yearly: Counter):
+        """Replace one episode's plays, noting play count changes. Caller holds the lock."""
+        _, alias = parse_episode_url(url)
+        date = episode_date(alias)
+        year = int(date[:4]) if date else None
+
+        row = self._conn.execute('SELECT id, year FROM episodes WHERE alias = ?', (alias,)).fetchone()
+        if row:
+            episode_id, old_year = row
+            for (track_id,) in self._conn.execute('SELECT track_id FROM plays WHERE episode_id = ?',
+                                                  (episode_id,)):
+                totals[track_id] -= 1
+                if old_year is not None:
+                    yearly[old_year, track_id] -= 1
+            self._conn.execute('DELETE FROM plays WHERE episode_id = ?', (episode_id,))
+            self._conn.execute(
+                'UPDATE episodes SET show_id = ?, url = ?, date = ?, year = ?, scraped_at = ? WHERE id = ?',
+                (show_id, url, date, year, time.time(), episode_id)
+            )
+        else:
+            episode_id = self._conn.execute(
+                'INSERT INTO episodes (show_id, alias, url, date, year, scraped_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (show_id, alias, url, date, year, time.time())
+            ).lastrowid
+
+        track_ids = [self._track_id(track['artist'], track['title']) for track in tracks]
+        self._conn.executemany('INSERT INTO plays (episode_id, position, track_id) VALUES (?, ?, ?)',
+                               [(episode_id, i, track_id) for i, track_id in enumerate(track_ids)])
+        for track_id in track_ids:
+            totals[track_id] += 1
+            if year is not None:
+                yearly[year, track_id] += 1
+        self.episodes_written += 1
+        self.plays_written += len(track_ids)
+
+    def record_episodes(self, show_name: str, episodes: Iterable[Tuple[str, List[Dict[str, str]]]]):
+        """
+        Write scraped episodes in one transaction.
+
+        Args:
+            show_name: Show slug
+            episodes: (episode URL, track dicts with 'artist' and 'title')
+                pairs. An episode already in the catalogue has its plays
+                replaced.
+        """
+        with self._lock:
+            try:
+                show_id = self._show_id(show_name)
+                totals: Counter = Counter()
+                yearly: Counter = Counter()
+                for url, tracks in episodes:
+                    self._write_episode(show_id, url, tracks, totals, yearly)
+                self._commit(totals, yearly)
+            except Exception:
+                self._rollback()
+                raise
+
+    def record_enrichments(self, items: Iterable[Tuple[str, str, Dict]]):
+        """
+        Store enrichment results in one transaction.
+
+        Only non-empty fields are written, merged into what earlier runs
+        stored, so a lookup that found nothing (or a source that was down)
+        doesn't erase IDs found before.
+
+        Args:
+            items: (title, artist, enrichment fields) triples. Tracks not
+                seen on any episode yet are added without plays.
+        """
+        with self._lock:
+            try:
+                now = time.time()
+                for title, artist, fields in items:
+                    fields = {k: v for k, v in fields.items() if v is not None and v != ''}
+                    track_id = self._track_id(artist, title)
+                    if not fields:
+                        continue
+                    row = self._conn.execute('SELECT enrichment FROM tracks WHERE id = ?', (track_id,)).fetchone()
+                    merged = json.loads(row[0]) if row and row[0] else {}
+                    merged.update(fields)
+                    self._conn.execute(
+                        'UPDATE tracks SET spotify_id = COALESCE(?, spotify_id), '
+                        'musicbrainz_id = COALESCE(?, musicbrainz_id), enrichment = ?, enriched_at = ? '
+                        'WHERE id = ?',
+                        (fields.get('spotify_id'), fields.get('musicbrainz_id'),
+                         json.dumps(merged, default=str), now, track_id)
+                    )
+                    self.tracks_enriched += 1
+                self._commit()
+            except Exception:
+                self._rollback()
+                raise
+
+    def _rarest_first(self, words: List[str], column: str) -> List[Tuple[str, int]]:
+        """
+        (word, artists/tracks containing it) for query words, rarest first. Caller holds the lock.
+
+        Returns [] if some word is in none, as nothing can match then.
+        """
+        marks = ','.join('?' * len(words))
+        counts = self._conn.execute(
+            f'SELECT word, {column} FROM word_counts WHERE word IN ({marks}) AND {column} > 0', words
+        ).fetchall()
+        if len(counts) < len(words):
+            return []
+        return sorted(counts, key=lambda pair: pair[1])
+
+    def find_artists(self, query: str) -> List[int]:
+        """IDs of artists whose names contain every word of `query`."""
+        words = query_words(query)
+        if not words:
+            return []
+        with self._lock:
+            words = [word for word, _ in self._rarest_first(words, 'artists')]
+            if not words:
+                return []
+            # Walk the shortest posting list, checking the other words by key
+            others = ''.join(' AND EXISTS (SELECT 1 FROM artist_words x WHERE x.word = ? AND x.artist_id = w.artist_id)'
+                             for _ in words[1:])
+            return [row[0] for row in self._conn.execute(
+                f'SELECT w.artist_id FROM artist_words w WHERE w.word = ?{others}', words)]
+
+    def shows_for_artist(self, query: str) -> List[Dict]:
+        """
+        Every show that played an artist matching `query`, most plays first.
+
+        Returns dicts with show, plays, episodes, first and last (episode
+        dates, None if unknown).
+        """
+        artist_ids = self.find_artists(query)
+        if not artist_ids:
+            return []
+        marks = ','.join('?' * len(artist_ids))
+        with self._lock:
+            rows = self._conn.execute(f'''
+                SELECT s.name, COUNT(*), COUNT(DISTINCT e.id), MIN(e.date), MAX(e.date)
+                FROM tracks t
+                JOIN plays p ON p.track_id = t.id
+                JOIN episodes e ON e.id = p.episode_id
+                JOIN shows s ON s.id = e.show_id
+                WHERE t.artist_id IN ({marks})
+                GROUP BY s.id
+                ORDER BY 2 DESC, 1
+            ''', artist_ids).fetchall()
+        return [{'show': name, 'plays': plays, 'episodes': episodes, 'first': first, 'last': last}
+                for name, plays, episodes, first, last in rows]
+
+    def top_tracks(self, year: Optional[int] = None, limit: int = 20) -> List[Dict]:
+        """Most-played tracks, in one year or overall. Dicts with artist, title, plays, spotify_id."""
+        with self._lock:
+            if year is None:
+                rows = self._conn.execute('''
+                    SELECT a.name, t.title, t.plays, t.spotify_id
+                    FROM tracks t JOIN artists a ON a.id = t.artist_id
+                    WHERE t.plays > 0
+                    ORDER BY t.plays DESC LIMIT ?
+                ''', (limit,)).fetchall()
+            else:
+                rows = self._conn.execute('''
+                    SELECT a.name, t.title, y.plays, t.spotify_id
+                    FROM yearly_plays y
+                    JOIN tracks t ON t.id = y.track_id
+                    JOIN artists a ON a.id = t.artist_id
+                    WHERE y.year = ?
+                    ORDER BY y.plays DESC LIMIT ?
+                ''', (year, limit)).fetchall()
+        return [{'artist': artist, 'title': title, 'plays': plays, 'spotify_id': spotify_id}
+                for artist, title, plays, spotify_id in rows]
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """Tracks with every word of `query` in their title or artist, most played first."""
+        words = query_words(query)
+        if not words:
+            return []
+        with self._lock:
+            counts = self._rarest_first(words, 'artists + tracks')
+            if not counts:
+                return []
+            words = [word for word, _ in counts]
+            has_word = ('(EXISTS (SELECT 1 FROM title_words x WHERE x.word = ? AND x.track_id = t.id)'
+                        ' OR EXISTS (SELECT 1 FROM artist_words x WHERE x.word = ? AND x.artist_id = t.artist_id))')
+            # Rough share of tracks that match, taking the words as independent
+            total = self._conn.execute('SELECT MAX(id) FROM tracks').fetchone()[0] or 1
+            expected = total
+            for _, n in counts:
+                expected *= min(1.0, n / total)
+
+            if expected > DENSE_MATCHES:
+                # Matches are common, so walking tracks from the most played
+                # finds `limit` of them long before gathering them all would
+                where = ' AND '.join([has_word] * len(words))
+                params = [word for word in words for _ in range(2)]
+                sql = f'''
+                    SELECT a.name, t.title, t.plays, t.spotify_id
+                    FROM tracks t INDEXED BY tracks_plays JOIN artists a ON a.id = t.artist_id
+                    WHERE {where}
+                    ORDER BY t.plays DESC LIMIT ?
+                '''
+            else:
+                # Tracks with the rarest word, then each other word checked by key
+                others = ''.join(f' AND {has_word}' for _ in words[1:])
+                params = [words[0], words[0]] + [word for word in words[1:] for _ in range(2)]
+                sql = f'''
+                    SELECT a.name, t.title, t.plays, t.spotify_id
+                    FROM tracks t JOIN artists a ON a.id = t.artist_id
+                    WHERE t.id IN (SELECT track_id FROM title_words WHERE word = ?
+                                   UNION SELECT c.id FROM artist_words w JOIN tracks c ON c.artist_id = w.artist_id
+                                         WHERE w.word = ?){others}
+                    ORDER BY t.plays DESC LIMIT ?
+                '''
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        return [{'artist': artist, 'title': title, 'plays': plays, 'spotify_id': spotify_id}
+                for artist, title, plays, spotify_id in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {table: self._conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                    for table in ('shows', 'episodes', 'artists', 'tracks', 'plays')}
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def summary(self) -> str:
+        parts = []
+        if self.episodes_written:
+            parts.append(f"{self.episodes_written} episodes ({self.plays_written} plays) written")
+        if self.tracks_enriched:
+            parts.append(f"{self.tracks_enriched} tracks enriched")
+        return ', '.join(parts) or "nothing written"
+
+
+def import_file(catalogue: Catalogue, path: str, show_name: Optional[str] = None) -> int:
+    """
+    Add a scraped or enriched output (TITLE, ARTIST, EPISODE_URL) to the catalogue.
+
+    Rows are grouped into episodes in file order. Enrichment columns, if
+    present, are stored too. Returns the number of rows read.
+    """
+    with RowReader(path) as reader:
+        columns = list(reader.columns or [])
+        if not {'TITLE', 'ARTIST', 'EPISODE_URL'} <= set(columns):
+            raise ValueError(f"{path} has no TITLE, ARTIST and EPISODE_URL columns")
+        extra = [c for c in columns if c not in TRACK_COLUMNS]
+
+        count = 0
+        episodes: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        enrichments = {}
+        for row in reader:
+            url = row.get('EPISODE_URL') or ''
+            show = parse_episode_url(url)[0] or show_name
+            if not url or not show:
+                continue
+            track = {'artist': row.get('ARTIST') or '', 'title': row.get('TITLE') or ''}
+            episodes.setdefault((show, url), []).append(track)
+            if extra:
+                enrichments[track_key(track['artist'], track['title'])] = (
+                    track['title'], track['artist'], {c: row.get(c) for c in extra})
+            count += 1
+            if count % IMPORT_PROGRESS_ROWS == 0:
+                logging.info(f"{path}: read {count} rows")
+
+    by_show: Dict[str, List[Tuple[str, List[Dict[str, str]]]]] = {}
+    for (show, url), tracks in episodes.items():
+        by_show.setdefault(show, []).append((url, tracks))
+    for show, show_episodes in by_show.items():
+        catalogue.record_episodes(show, show_episodes)
+    if enrichments:
+        catalogue.record_enrichments(enrichments.values())
+    return count
+
+
+def main():
+    """Main execution function."""
+
+    parser = argparse.ArgumentParser(description="Query the cross-show track catalogue.")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"Directory holding the catalogue (default: {DEFAULT_CACHE_DIR})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_ = commands.add_parser('import', help="Add scraped or enriched outputs")
+    import_.add_argument('files', nargs='+')
+    import_.add_argument('--show', help="Show slug, if the episode URLs don't say")
+    artist = commands.add_parser('artist', help="Shows that played an artist")
+    artist.add_argument('name')
+    top = commands.add_parser('top', help="Most-played tracks")
+    top.add_argument('--year', type=int, help="Only episodes from this year")
+    top.add_argument('--limit', type=int, default=20)
+    search = commands.add_parser('search', help="Tracks by words in their title or artist")
+    search.add_argument('words')
+    search.add_argument('--limit', type=int, default=20)
+    commands.add_parser('stats', help="Show how much is catalogued")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    catalogue = Catalogue(args.cache_dir)
+    start = time.perf_counter()
+    try:
+        if args.command == 'import':
+            for path in args.files:
+                try:
+                    count = import_file(catalogue, path, args.show)
+                except (OSError, ValueError) as e:
+                    print(f"❌ {path}: {e}")
+                    continue
+                print(f"✓ {path}: {count} plays")
+
+        elif args.command == 'artist':
+            shows = catalogue.shows_for_artist(args.name)
+            if not shows:
+                print(f"No shows played '{args.name}'")
+            for show in shows:
+                dates = f" ({show['first']} to {show['last']})" if show['first'] else ""
+                print(f"{show['show']}: {show['plays']} plays in {show['episodes']} episodes{dates}")
+
+        elif args.command in ('top', 'search'):
+            if args.command == 'top':
+                tracks = catalogue.top_tracks(args.year, args.limit)
+            else:
+                tracks = catalogue.search(args.words, args.limit)
+            if not tracks:
+                print("No tracks found")
+            for i, track in enumerate(tracks, 1):
+                print(f"{i:>3}. {track['artist']} - {track['title']} ({track['plays']} plays)")
+
+        if args.command in ('import', 'stats'):
+            counts = catalogue.counts()
+            print(f"\nCatalogue: {catalogue.path}")
+            print("  " + ", ".join(f"{n} {table}" for table, n in counts.items()))
+        else:
+            print(f"\n({(time.perf_counter() - start) * 1000:.1f} ms)")
+    finally:
+        catalogue.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Enrichment Response Cache
+
+Persistent SQLite cache for enrichment lookups, so a track that appears in
+many episodes (or many shows) is only looked up once per source.
+
+- Keys are the `clean_string`-normalized (artist, title) pair, under a
+  pinned rules version (AcousticBrainz is keyed by MusicBrainz ID instead)
+- Each source has its own TTL; misses are cached separately with a
+  shorter negative TTL
+- The cache is size-bounded and evicts least-recently-used entries
+
+Usage:
+    cache = EnrichmentCache('.nts_cache')
+    found, value = cache.get('spotify', track_key(artist, title))
+    if not found:
+        value = search_spotify(title, artist)
+        cache.set('spotify', track_key(artist, title), value)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from metrics import cache_stats
+from normalize import clean_string
+
+DEFAULT_CACHE_DIR = os.getenv('NTS_CACHE_DIR', '.nts_cache')
+CACHE_FILENAME = 'enrichment.sqlite3'
+
+# Normalization rules used for keys. Pinned so a change to the default
+# rules doesn't silently orphan every cached entry; bump deliberately.
+KEY_RULES_VERSION = 1
+
+DAY = 24 * 60 * 60
+
+# How long a successful lookup stays fresh, per source
+DEFAULT_TTLS = {
+    'spotify': 30 * DAY,
+    'spotify_features': 365 * DAY,  # Audio analysis doesn't change
+    'spotify_tracks': 30 * DAY,
+    'lastfm': 7 * DAY,  # Play counts drift
+    'musicbrainz': 30 * DAY,
+    'acousticbrainz': 365 * DAY,  # Dataset is frozen
+}
+DEFAULT_NEGATIVE_TTL = 3 * DAY
+
+# Maximum number of cached entries before LRU eviction kicks in
+DEFAULT_MAX_ENTRIES = 500000
+# Check the size bound every N writes rather than on every write
+EVICTION_INTERVAL = 1000
+
+
+def track_key(artist: str, title: str) -> str:
+    """Normalized cache key for an (artist, title) pair."""
+    return (f"{clean_string(artist, KEY_RULES_VERSION)}\x1f"
+            f"{clean_string(title, KEY_RULES_VERSION)}")
+
+
+class EnrichmentCache:
+    """Thread-safe SQLite-backed cache with per-source TTLs and LRU eviction."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 ttls: Optional[Dict[str, float]] = None,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, CACHE_FILENAME)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                source TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (source, key)
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)')
+        self._conn.commit()
+
+    def get(self, source: str, key: str) -> Tuple[bool, Optional[Dict]]:
+        """
+        Look up a cached result.
+
+        Returns (found, value). `found` is True for fresh hits, including
+        cached misses, in which case `value` is None.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, stored_at FROM entries WHERE source = ? AND key = ?',
+                (source, key)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return False, None
+
+            value, stored_at = row
+            ttl = self.ttls.get(source, self.negative_ttl) if value is not None else self.negative_ttl
+            if now - stored_at > ttl:
+                self.misses += 1
+                return False, None
+
+            self._conn.execute(
+                'UPDATE entries SET accessed_at = ? WHERE source = ? AND key = ?',
+                (now, source, key)
+            )
+            if value is None:
+                self.negative_hits += 1
+                return True, None
+            self.hits += 1
+            return True, json.loads(value)
+
+    def set(self, source: str, key: str, value: Optional[Dict]):
+        """Store a result; pass None to record a confirmed miss."""
+        now = time.time()
+        encoded = json.dumps(value) if value is not None else None
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (source, key, value, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (source, key, encoded, now, now)
+            )
+            self._writes += 1
+            if self._writes % EVICTION_INTERVAL == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries beyond max_entries. Caller holds the lock."""
+        count = self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                'DELETE FROM entries WHERE rowid IN '
+                '(SELECT rowid FROM entries ORDER BY accessed_at LIMIT ?)',
+                (excess,)
+            )
+            logging.info(f"Evicted {excess} least-recently-used cache entries")
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self._conn.commit()
+            self._conn.close()
+
+    def stats(self) -> Dict:
+        """Hit/miss counts, for the run report. Cached misses count as hits."""
+        return cache_stats(self.hits + self.negative_hits, self.misses, negative_hits=self.negative_hits)
+
+    def summary(self) -> str:
+        lookups = self.hits + self.negative_hits + self.misses
+        ratio = (self.hits + self.negative_hits) / lookups * 100 if lookups else 0.0
+        return (f"{self.hits} hits, {self.negative_hits} cached misses, "
+                f"{self.misses} lookups ({ratio:.1f}% served from cache)")
@@ -0,0 +1,266 @@
+"""
+Enrichment Pipeline
+
+Runs each enrichment source as its own stage: a queue plus a small pool of
+worker threads. Sources proceed independently (each under its own rate
+limiter), so total wall-clock time is bounded by the slowest source rather
+than the sum of all of them. A stage can feed a downstream stage as results
+arrive, e.g. AcousticBrainz chaining off MusicBrainz IDs. Stages backed by
+multi-ID endpoints can take their work in batches.
+
+Work can also be streamed in: start(), then submit() items as they turn
+up, then finish(). Bounded stage queues push back on the producer, and
+`on_complete` fires as soon as every stage is done with a key.
+
+Each handler call is timed as the metrics stage `enrich.<name>`.
+
+Usage:
+    ab = Stage('acousticbrainz', lookup_ab)
+    mb = Stage('musicbrainz', lookup_mb, feeds=ab, follow=lambda r: r.get('musicbrainz_id'))
+    pipeline = Pipeline([Stage('spotify', lookup_spotify, workers=4), mb, ab])
+    results = pipeline.run({key: (title, artist), ...})
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import metrics
+
+# Queue sentinel telling a worker to stop
+_DONE = object()
+
+
+class Stage:
+    """
+    One source in the pipeline.
+
+    Args:
+        name: Source name, used in progress reports
+        handler: Called as handler(key, payload); returns a dict of fields to
+            merge into that key's result, or None
+        workers: Number of worker threads for this stage
+        feeds: Optional downstream stage that receives follow-up work
+        follow: Given this stage's result, return the payload to send
+            downstream (or None to send nothing)
+        batch_size: If set, the handler is instead called as
+            handler([(key, payload), ...]) with up to batch_size items and
+            returns {key: result}
+        batch_wait: Seconds to wait for a batch to fill before sending a
+            partial one
+        maxsize: Bound on queued items (None for unbounded); submit()
+            blocks while the queue is full
+    """
+
+    def __init__(self, name: str, handler: Callable[..., Any],
+                 workers: int = 1, feeds: Optional['Stage'] = None,
+                 follow: Optional[Callable[[Dict], Any]] = None,
+                 batch_size: Optional[int] = None, batch_wait: float = 0.5,
+                 maxsize: Optional[int] = None):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.feeds = feeds
+        self.follow = follow
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+
+        self.queue: 'queue.Queue[Any]' = queue.Queue(maxsize=maxsize or 0)
+        self.submitted = 0
+        self.completed = 0
+        self._upstreams = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, payload: Any):
+        with self._lock:
+            self.submitted += 1
+        self.queue.put((key, payload))
+
+    def close(self):
+        """Signal that no more work will arrive from one producer."""
+        with self._lock:
+            self._upstreams -= 1
+            last = self._upstreams <= 0
+        if last:
+            for _ in range(self.workers):
+                self.queue.put(_DONE)
+
+
+class Pipeline:
+    """
+    Wires stages together and merges their results per key.
+
+    Args:
+        stages: Every stage, including chained ones
+        progress: Called with the stage list after each handled batch
+        on_complete: Called as on_complete(key, result) once no stage has
+            work left for that key. The key's result is then dropped, so
+            long streams don't accumulate memory.
+    """
+
+    def __init__(self, stages: List[Stage],
+                 progress: Optional[Callable[[List[Stage]], None]] = None,
+                 on_complete: Optional[Callable[[str, Dict], None]] = None):
+        self.stages = stages
+        self.progress = progress
+        self.on_complete = on_complete
+        self.roots = [s for s in stages if not any(o.feeds is s for o in stages)]
+        self._results: Dict[str, Dict] = {}
+        self._pending: Dict[str, int] = {}  # Outstanding stage items per key
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _next_batch(self, stage: Stage) -> Tuple[List[Tuple[str, Any]], bool]:
+        """
+        Take up to batch_size items from the stage's queue.
+
+        Blocks for the first item, then waits at most batch_wait for more.
+        Returns (items, done) where done means this worker got its stop signal.
+        """
+        first = stage.queue.get()
+        if first is _DONE:
+            return [], True
+
+        items = [first]
+        size = stage.batch_size or 1
+        while len(items) < size:
+            try:
+                item = stage.queue.get(timeout=stage.batch_wait)
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _handle(self, stage: Stage, items: List[Tuple[str, Any]]) -> Dict[str, Optional[Dict]]:
+        try:
+            with metrics.timer(f"enrich.{stage.name}"):
+                if stage.batch_size:
+                    return stage.handler(items) or {}
+                key, payload = items[0]
+                return {key: stage.handler(key, payload)}
+        except Exception as e:
+            keys = [key for key, _ in items]
+            logging.warning(f"{stage.name} stage failed for {keys!r}: {e}")
+            return {}
+
+    def _follow(self, stage: Stage, key: str, result: Dict) -> Any:
+        """The downstream payload for a result; a failing follow() counts as none."""
+        try:
+            return stage.follow(result)
+        except Exception as e:
+            logging.warning(f"{stage.name} follow-up failed for {key!r}: {e}")
+            return None
+
+    def _worker(self, stage: Stage):
+        done = False
+        try:
+            while not done:
+                items, done = self._next_batch(stage)
+                if not items:
+                    continue
+
+                results = self._handle(stage, items)
+                for key, _ in items:
+                    result = results.get(key)
+                    if result:
+                        with self._lock:
+                            self._results[key].update(result)
+                        if stage.feeds and stage.follow:
+                            follow_payload = self._follow(stage, key, result)
+                            if follow_payload:
+                                with self._lock:
+                                    self._pending[key] += 1
+                                stage.feeds.submit(key, follow_payload)
+                    self._item_done(key)
+
+                with stage._lock:
+                    stage.completed += len(items)
+                if self.progress:
+                    self.progress(self.stages)
+        finally:
+            # Last worker out closes the downstream stage, even if this one failed
+            with stage._lock:
+                stage._running -= 1
+                finished = stage._running == 0
+            if finished and stage.feeds:
+                stage.feeds.close()
+
+    def _item_done(self, key: str):
+        """Count one finished stage item for `key`, completing it on the last."""
+        with self._lock:
+            self._pending[key] -= 1
+            if self._pending[key] or not self.on_complete:
+                return
+            del self._pending[key]
+            result = self._results.pop(key)
+        try:
+            self.on_complete(key, result)
+        except Exception as e:
+            logging.warning(f"on_complete failed for {key!r}: {e}")
+
+    def start(self):
+        """Start every stage's workers, ready for submit()."""
+        self._results = {}
+        self._pending = {}
+        for stage in self.stages:
+            stage._upstreams = 1
+            stage._running = stage.workers
+
+        self._threads = []
+        for stage in self.stages:
+            for i in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker, args=(stage,),
+                    name=f"{stage.name}-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, key: str, payload: Any):
+        """
+        Send one item to every root stage. Blocks while a bounded root
+        stage is full. Keys must be unique.
+        """
+        with self._lock:
+            self._results[key] = {}
+            # One extra count held until every root has the item, so a fast
+            # stage can't complete the key while it's still being submitted
+            self._pending[key] = len(self.roots) + 1
+        for stage in self.roots:
+            stage.submit(key, payload)
+        self._item_done(key)
+
+    def finish(self) -> Dict[str, Dict]:
+        """
+        Signal that no more items are coming and wait for every stage
+        (including chained ones) to drain.
+
+        Returns:
+            Mapping of key -> merged result dict, for keys not already
+            handed to on_complete
+        """
+        for stage in self.roots:
+            stage.close()
+        for thread in self._threads:
+            thread.join()
+        return self._results
+
+    def run(self, items: Dict[str, Tuple[Any, ...]]) -> Dict[str, Dict]:
+        """
+        Push every item through all root stages and wait for every stage
+        (including chained ones) to drain.
+
+        Args:
+            items: Mapping of key -> payload handed to each root stage
+
+        Returns:
+            Mapping of key -> merged result dict from all stages
+        """
+        self.start()
+        for key, payload in items.items():
+            self.submit(key, payload)
+        return self.finish()
@@ -2,29 +2,66 @@
 """
 Track Data Enrichment Script
 
-Enriches track CSV data with information from multiple sources:
+Enriches track data (CSV, Parquet or Arrow) with information from multiple sources:
 - Spotify: Audio features, popularity, metadata
 - Last.fm: Play counts, tags, listener stats
 - MusicBrainz: Recording metadata, genres, release info
 
+Lookups are cached on disk (see enrich_cache.py), so re-enriching tracks
+that were seen before doesn't touch the network. Each source runs as its own
+pipeline stage under its own rate limit (see enrich_pipeline.py), so a run
+takes as long as the slowest source rather than the sum of all four.
+
+Input is read and written in chunks, with a checkpoint after each one, so
+memory stays flat and an interrupted run can pick up with --resume.
+
+Each track's results are also stored in the cross-show catalogue (see
+catalogue.py) unless --no-catalogue is given.
+
+Reading, each source's lookups and writing are timed (see metrics.py); the
+summary shows where the time went, and --report/--prometheus write it out
+with the per-host HTTP stats, cache hit ratios and rate limits. --profile
+samples every thread's stack through the run for a finer breakdown (see
+profiler.py).
+
 Usage:
-    python enrich_tracks.py <input_csv> [output_csv]
+    python enrich_tracks.py <input_csv> [output_csv] [--cache-dir DIR] [--no-cache] [--no-catalogue]
+                            [--chunk-size N] [--resume] [--format csv|parquet|arrow]
+                            [--report FILE] [--prometheus FILE] [--profile [PREFIX]] [--profile-rate HZ]
 
 Example:
     python enrich_tracks.py rachel-grace-almeida_complete.csv
     python enrich_tracks.py tracks.csv enriched_tracks.csv
+    python enrich_tracks.py tracks.csv --format parquet
 """
 
 import requests
-import csv
+import argparse
 import sys
 import time
 import logging
 import os
 import base64
-from typing import Dict, Optional, List
+import json
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, Dict, Optional, List, Tuple
 from dotenv import load_dotenv
 
+import http_client
+import metrics
+import normalize
+import profiler
+from catalogue import Catalogue
+from enrich_cache import EnrichmentCache, DEFAULT_CACHE_DIR, track_key
+from enrich_pipeline import Pipeline, Stage
+from rate_limit import AdaptiveTokenBucket
+from spotify_index import SpotifyIndex, rank_candidates
+from table_output import (FORMATS, DEFAULT_FORMAT, FORMAT_EXTENSIONS, ChunkWriter, RowReader,
+                          detect_format, require_pyarrow)
+from track_match import MIN_CONFIDENCE, Query, rank
+
 # Load environment variables
 load_dotenv()
 
@@ -43,19 +80,99 @@ SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID')
 SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET')
 LASTFM_API_KEY = os.getenv('LASTFM_API_KEY')
 
-# Rate limiting delays (seconds)
-SPOTIFY_DELAY = 0.1
-LASTFM_DELAY = 0.2
-MUSICBRAINZ_DELAY = 1.0  # MusicBrainz requires 1 req/sec
-ACOUSTICBRAINZ_DELAY = 0.5  # Be respectful to AcousticBrainz
+# Service endpoints; override to point at a local stand-in (see benchmarks/fake_nts_server.py)
+SPOTIFY_ACCOUNTS_URL = os.getenv('SPOTIFY_ACCOUNTS_URL', 'https://accounts.spotify.com').rstrip('/')
+SPOTIFY_API_URL = os.getenv('SPOTIFY_API_URL', 'https://api.spotify.com/v1').rstrip('/')
+LASTFM_API_URL = os.getenv('LASTFM_API_URL', 'http://ws.audioscrobbler.com/2.0').rstrip('/')
+MUSICBRAINZ_API_URL = os.getenv('MUSICBRAINZ_API_URL', 'https://musicbrainz.org/ws/2').rstrip('/')
+ACOUSTICBRAINZ_API_URL = os.getenv('ACOUSTICBRAINZ_API_URL', 'https://acousticbrainz.org/api/v1').rstrip('/')
+
+# Rate limits (requests/sec), enforced before each request. Each source starts
+# at its *_RATE and adapts between that and its *_MAX_RATE: up while responses
+# are healthy, down on 429/503 (see rate_limit.AdaptiveTokenBucket)
+SPOTIFY_RATE = 10.0
+SPOTIFY_MAX_RATE = 50.0  # Spotify doesn't publish a limit; its 429s tell us
+LASTFM_RATE = 5.0
+LASTFM_MAX_RATE = 5.0  # Last.fm's terms allow 5 req/sec
+MUSICBRAINZ_RATE = 1.0
+MUSICBRAINZ_MAX_RATE = 1.0  # MusicBrainz requires 1 req/sec
+ACOUSTICBRAINZ_RATE = 2.0
+ACOUSTICBRAINZ_MAX_RATE = 10.0
+
+# Spotify multi-ID endpoint limits
+SPOTIFY_FEATURES_BATCH = 100
+SPOTIFY_TRACKS_BATCH = 50
+# Search results scored per track; the best match wins and the rest are
+# kept in the resolution index as alternates
+SPOTIFY_SEARCH_CANDIDATES = 5
+# Likewise for MusicBrainz recording searches
+MUSICBRAINZ_SEARCH_CANDIDATES = 5
+
+# AcousticBrainz bulk endpoints accept up to 25 recording IDs per call
+ACOUSTICBRAINZ_BATCH = 25
+# MBIDs trickle in at MusicBrainz's 1 req/sec, so wait longer to fill a batch
+ACOUSTICBRAINZ_BATCH_WAIT = 5.0
+# Keys kept when decoding AcousticBrainz documents; everything else is dropped
+ACOUSTICBRAINZ_FIELDS = {
+    'rhythm', 'bpm', 'beats_count',
+    'tonal', 'key_key', 'key_scale', 'key_strength',
+    'lowlevel', 'average_loudness',
+    'highlevel', 'all',
+    'danceability', 'danceable',
+    'mood_aggressive', 'aggressive',
+    'mood_happy', 'happy',
+    'mood_relaxed', 'relaxed',
+    'voice_instrumental', 'instrumental',
+}
+
+# Rows read, enriched and written per checkpoint
+DEFAULT_CHUNK_SIZE = 500
+
+# Recently enriched tracks kept in memory across chunks (see EnrichmentMemo)
+ENRICHMENT_MEMO_SIZE = 2000
+
+# Worker threads per source in the enrichment pipeline
+SOURCE_WORKERS = {
+    'spotify': 4,
+    'spotify_batch': 1,
+    'lastfm': 2,
+    'musicbrainz': 1,
+    'acousticbrainz': 1,
+}
+
+# One limiter per source, shared by all of that source's workers
+spotify_limiter = AdaptiveTokenBucket(SPOTIFY_RATE, max_rate=SPOTIFY_MAX_RATE)
+lastfm_limiter = AdaptiveTokenBucket(LASTFM_RATE, max_rate=LASTFM_MAX_RATE)
+musicbrainz_limiter = AdaptiveTokenBucket(MUSICBRAINZ_RATE, max_rate=MUSICBRAINZ_MAX_RATE)
+acousticbrainz_limiter = AdaptiveTokenBucket(ACOUSTICBRAINZ_RATE, max_rate=ACOUSTICBRAINZ_MAX_RATE)
 
 # Global token storage
 spotify_token = None
 spotify_token_expiry = 0
+spotify_token_lock = threading.Lock()
+
+# Persistent lookup cache (set up in main)
+enrichment_cache: Optional[EnrichmentCache] = None
+# (artist, title) -> Spotify ID index, shared with the playlist scripts (set up in main)
+spotify_index: Optional[SpotifyIndex] = None
+# Cross-show catalogue that enrichment results are stored in (set up in main)
+catalogue: Optional[Catalogue] = None
+
+
+class SourceUnavailable(Exception):
+    """A lookup could not be completed (network error, missing credentials).
+
+    Distinct from a clean miss, which is returned as None and can be cached.
+    """
 
 
 def get_spotify_token() -> Optional[str]:
     """Get Spotify access token using client credentials flow."""
+    with spotify_token_lock:
+        return _refresh_spotify_token()
+
+
+def _refresh_spotify_token() -> Optional[str]:
     global spotify_token, spotify_token_expiry
 
     # Return cached token if still valid
@@ -71,8 +188,8 @@ def get_spotify_token() -> Optional[str]:
             f'{SPOTIFY_CLIENT_ID}:{SPOTIFY_CLIENT_SECRET}'.encode('ascii')
         ).decode('ascii')
 
-        response = requests.post(
-            'https://accounts.spotify.com/api/token',
+        response = http_client.post(
+            f'{SPOTIFY_ACCOUNTS_URL}/api/token',
             headers={'Authorization': f'Basic {auth_header}'},
             data={'grant_type': 'client_credentials'}
         )
@@ -91,87 +208,163 @@ def get_spotify_token() -> Optional[str]:
         return None
 
 
+def spotify_track_fields(track: Dict) -> Dict:
+    """Pull the columns we keep out of a Spotify track object."""
+    return {
+        'spotify_id': track['id'],
+        'spotify_popularity': track.get('popularity'),
+        'spotify_duration_ms': track.get('duration_ms'),
+        'spotify_explicit': track.get('explicit'),
+        'spotify_preview_url': track.get('preview_url'),
+        'spotify_album': (track.get('album') or {}).get('name'),
+        'spotify_release_date': (track.get('album') or {}).get('release_date'),
+    }
+
+
+def spotify_feature_fields(features: Dict) -> Dict:
+    """Pull the columns we keep out of a Spotify audio-features object."""
+    return {
+        'spotify_danceability': features.get('danceability'),
+        'spotify_energy': features.get('energy'),
+        'spotify_key': features.get('key'),
+        'spotify_loudness': features.get('loudness'),
+        'spotify_mode': features.get('mode'),
+        'spotify_speechiness': features.get('speechiness'),
+        'spotify_acousticness': features.get('acousticness'),
+        'spotify_instrumentalness': features.get('instrumentalness'),
+        'spotify_liveness': features.get('liveness'),
+        'spotify_valence': features.get('valence'),
+        'spotify_tempo': features.get('tempo'),
+        'spotify_time_signature': features.get('time_signature'),
+    }
+
+
 def search_spotify(title: str, artist: str) -> Optional[Dict]:
-    """Search for a track on Spotify and return its data."""
+    """
+    Resolve a track on Spotify and return its basic data.
+
+    Tracks already in the resolution index come back as just their ID and
+    the spotify_batch stage fetches the rest with the other bare IDs.
+    Otherwise the search's top candidates are scored against the query
+    (track_match) and all of them are recorded in the index. The best is
+    returned, with its score as spotify_confidence, unless it scores under
+    MIN_CONFIDENCE.
+
+    Audio features are fetched separately, in batches, by
+    get_spotify_audio_features_batch().
+    """
+    key = track_key(artist, title)
+    if spotify_index:
+        found, entry = spotify_index.get(key)
+        if found:
+            if not entry:
+                return None
+            return {'spotify_id': entry['spotify_id'], 'spotify_confidence': entry['confidence']}
+
     token = get_spotify_token()
     if not token:
-        return None
+        raise SourceUnavailable("No Spotify token")
 
     try:
         # Search for the track
         query = f"track:{title} artist:{artist}"
-        response = requests.get(
-            'https://api.spotify.com/v1/search',
+        response = http_client.get(
+            f'{SPOTIFY_API_URL}/search',
+            limiter=spotify_limiter,
             headers={'Authorization': f'Bearer {token}'},
-            params={'q': query, 'type': 'track', 'limit': 1}
+            params={'q': query, 'type': 'track', 'limit': SPOTIFY_SEARCH_CANDIDATES}
         )
         response.raise_for_status()
 
         data = response.json()
         tracks = data.get('tracks', {}).get('items', [])
 
-        if not tracks:
+        candidates = rank_candidates(title, artist, tracks)
+        if spotify_index:
+            spotify_index.record_search(key, candidates)
+        if not candidates or candidates[0]['score'] < MIN_CONFIDENCE:
             return None
 
-        track = tracks[0]
-        track_id = track['id']
-
-        # Start with basic track info
-        result = {
-            'spotify_id': track_id,
-            'spotify_popularity': track.get('popularity'),
-            'spotify_duration_ms': track.get('duration_ms'),
-            'spotify_explicit': track.get('explicit'),
-            'spotify_preview_url': track.get('preview_url'),
-            'spotify_album': track.get('album', {}).get('name'),
-            'spotify_release_date': track.get('album', {}).get('release_date'),
-        }
+        best = candidates[0]
+        fields = spotify_track_fields(next(t for t in tracks if t and t.get('id') == best['spotify_id']))
+        fields['spotify_confidence'] = best['score']
+        return fields
+
+    except SourceUnavailable:
+        raise
+    except Exception as e:
+        # Network errors, malformed or non-JSON bodies and unexpected shapes
+        # are failed lookups, not misses: they mustn't be cached as None
+        raise SourceUnavailable(f"Spotify search failed for {artist} - {title}: {e}")
+
 
-        time.sleep(SPOTIFY_DELAY)
+def resolve_spotify_id(title: str, artist: str) -> Optional[str]:
+    """Spotify track ID for (artist, title), from the index or a search."""
+    data = cached_lookup('spotify', track_key(artist, title), search_spotify, title, artist)
+    return data['spotify_id'] if data else None
 
-        # Try to get audio features (optional - don't fail if this doesn't work)
+
+def _spotify_batch(path: str, ids: List[str], chunk_size: int, items_key: str,
+                   extract) -> Dict[str, Optional[Dict]]:
+    """
+    Fetch objects from a Spotify multi-ID endpoint in chunks.
+
+    Returns {id: fields or None}. IDs Spotify returns null for are mapped to
+    None; IDs in a chunk whose request failed are left out, so callers can
+    tell "not found" from "not fetched".
+    """
+    token = get_spotify_token()
+    if not token:
+        raise SourceUnavailable("No Spotify token")
+
+    results: Dict[str, Optional[Dict]] = {}
+    failures = 0
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
         try:
-            features_response = requests.get(
-                f'https://api.spotify.com/v1/audio-features/{track_id}',
-                headers={'Authorization': f'Bearer {token}'}
+            response = http_client.get(
+                f'{SPOTIFY_API_URL}/{path}',
+                limiter=spotify_limiter,
+                headers={'Authorization': f'Bearer {token}'},
+                params={'ids': ','.join(chunk)}
             )
-            features_response.raise_for_status()
-            features = features_response.json()
-
-            # Add audio features to result
-            result.update({
-                'spotify_danceability': features.get('danceability'),
-                'spotify_energy': features.get('energy'),
-                'spotify_key': features.get('key'),
-                'spotify_loudness': features.get('loudness'),
-                'spotify_mode': features.get('mode'),
-                'spotify_speechiness': features.get('speechiness'),
-                'spotify_acousticness': features.get('acousticness'),
-                'spotify_instrumentalness': features.get('instrumentalness'),
-                'spotify_liveness': features.get('liveness'),
-                'spotify_valence': features.get('valence'),
-                'spotify_tempo': features.get('tempo'),
-                'spotify_time_signature': features.get('time_signature'),
-            })
-        except Exception as e:
-            logging.debug(f"Could not get audio features for {artist} - {title}: {e}")
-            # Continue without audio features
+            response.raise_for_status()
+            objects = response.json().get(items_key) or []
+        except (requests.RequestException, ValueError) as e:
+            logging.debug(f"Spotify {path} batch of {len(chunk)} failed: {e}")
+            failures += 1
+            continue
 
-        return result
+        # Results come back in request order, with null for unknown IDs
+        for spotify_id, obj in zip(chunk, objects):
+            results[spotify_id] = extract(obj) if obj else None
 
-    except Exception as e:
-        logging.debug(f"Spotify search failed for {artist} - {title}: {e}")
-        return None
+    if failures and not results:
+        raise SourceUnavailable(f"All Spotify {path} batches failed")
+    return results
+
+
+def get_spotify_audio_features_batch(ids: List[str]) -> Dict[str, Optional[Dict]]:
+    """Audio features for many Spotify IDs, 100 per request."""
+    return _spotify_batch('audio-features', ids, SPOTIFY_FEATURES_BATCH,
+                          'audio_features', spotify_feature_fields)
+
+
+def get_spotify_tracks_batch(ids: List[str]) -> Dict[str, Optional[Dict]]:
+    """Full track objects for many Spotify IDs, 50 per request."""
+    return _spotify_batch('tracks', ids, SPOTIFY_TRACKS_BATCH,
+                          'tracks', spotify_track_fields)
 
 
 def search_lastfm(title: str, artist: str) -> Optional[Dict]:
     """Search for a track on Last.fm and return its data."""
     if not LASTFM_API_KEY:
-        return None
+        raise SourceUnavailable("No Last.fm API key")
 
     try:
-        response = requests.get(
-            'http://ws.audioscrobbler.com/2.0/',
+        response = http_client.get(
+            f'{LASTFM_API_URL}/',
+            limiter=lastfm_limiter,
             params={
                 'method': 'track.getInfo',
                 'api_key': LASTFM_API_KEY,
@@ -185,7 +378,10 @@ def search_lastfm(title: str, artist: str) -> Optional[Dict]:
         data = response.json()
 
         if 'error' in data:
-            return None
+            # Error 6 is "track not found"; anything else is a failed lookup
+            if data['error'] == 6:
+                return None
+            raise SourceUnavailable(f"Last.fm error {data['error']}: {data.get('message')}")
 
         track = data.get('track', {})
 
@@ -193,8 +389,6 @@ def search_lastfm(title: str, artist: str) -> Optional[Dict]:
         tags = track.get('toptags', {}).get('tag', [])
         tag_names = [tag['name'] for tag in tags[:5]] if isinstance(tags, list) else []
 
-        time.sleep(LASTFM_DELAY)
-
         return {
             'lastfm_playcount': track.get('playcount'),
             'lastfm_listeners': track.get('listeners'),
@@ -202,13 +396,21 @@ def search_lastfm(title: str, artist: str) -> Optional[Dict]:
             'lastfm_url': track.get('url'),
         }
 
+    except SourceUnavailable:
+        raise
     except Exception as e:
-        logging.debug(f"Last.fm search failed for {artist} - {title}: {e}")
-        return None
+        # Network errors, malformed or non-JSON bodies and unexpected shapes
+        # are failed lookups, not misses: they mustn't be cached as None
+        raise SourceUnavailable(f"Last.fm search failed for {artist} - {title}: {e}")
 
 
 def search_musicbrainz(title: str, artist: str) -> Optional[Dict]:
-    """Search for a track on MusicBrainz and return its data."""
+    """
+    Search for a track on MusicBrainz and return its data.
+
+    The top recordings are scored against the query like Spotify's
+    results; the best is kept if it scores at least MIN_CONFIDENCE.
+    """
     headers = {
         'User-Agent': 'NTSToSpotify/1.0 (https://github.com/yourusername/nts_to_spotify)',
         'Accept': 'application/json'
@@ -217,13 +419,14 @@ def search_musicbrainz(title: str, artist: str) -> Optional[Dict]:
     try:
         # Search for recording
         query = f'recording:"{title}" AND artist:"{artist}"'
-        response = requests.get(
-            'https://musicbrainz.org/ws/2/recording/',
+        response = http_client.get(
+            f'{MUSICBRAINZ_API_URL}/recording/',
+            limiter=musicbrainz_limiter,
             headers=headers,
             params={
                 'query': query,
                 'fmt': 'json',
-                'limit': 1
+                'limit': MUSICBRAINZ_SEARCH_CANDIDATES
             }
         )
         response.raise_for_status()
@@ -231,10 +434,16 @@ def search_musicbrainz(title: str, artist: str) -> Optional[Dict]:
         data = response.json()
         recordings = data.get('recordings', [])
 
-        if not recordings:
+        candidates = []
+        for recording in recordings:
+            if recording:
+                credits = [credit.get('name') or '' for credit in recording.get('artist-credit') or []]
+                candidates.append((recording.get('title') or '', credits, recording))
+        ranked = rank(Query(title, artist), candidates)
+        if not ranked or ranked[0][0] < MIN_CONFIDENCE:
             return None
 
-        recording = recordings[0]
+        confidence, recording = ranked[0]
 
         # Get genres/tags
         tags = recording.get('tags', [])
@@ -244,10 +453,9 @@ def search_musicbrainz(title: str, artist: str) -> Optional[Dict]:
         releases = recording.get('releases', [])
         first_release = releases[0] if releases else {}
 
-        time.sleep(MUSICBRAINZ_DELAY)
-
         return {
             'musicbrainz_id': recording.get('id'),
+            'musicbrainz_confidence': confidence,
             'musicbrainz_title': recording.get('title'),
             'musicbrainz_length': recording.get('length'),
             'musicbrainz_tags': '; '.join(tag_names) if tag_names else None,
@@ -255,116 +463,518 @@ def search_musicbrainz(title: str, artist: str) -> Optional[Dict]:
             'musicbrainz_date': first_release.get('date'),
         }
 
+    except SourceUnavailable:
+        raise
     except Exception as e:
-        logging.debug(f"MusicBrainz search failed for {artist} - {title}: {e}")
-        return None
-
-
-def get_acousticbrainz_features(mbid: str) -> Optional[Dict]:
-    """Get audio features from AcousticBrainz using a MusicBrainz ID."""
-    if not mbid:
-        return None
-
-    try:
-        # Get low-level features (rhythm, tonal)
-        low_level_url = f'https://acousticbrainz.org/api/v1/{mbid}/low-level'
-        low_response = requests.get(low_level_url)
-
-        if low_response.status_code != 200:
-            return None
-
-        low_data = low_response.json()
-
-        time.sleep(ACOUSTICBRAINZ_DELAY)
-
-        # Get high-level features (danceability, mood, genre)
-        high_level_url = f'https://acousticbrainz.org/api/v1/{mbid}/high-level'
-        high_response = requests.get(high_level_url)
-
-        high_data = high_response.json() if high_response.status_code == 200 else {}
-
-        # Extract useful features
-        result = {}
-
-        # Rhythm features
-        if 'rhythm' in low_data:
-            rhythm = low_data['rhythm']
-            result['ab_bpm'] = rhythm.get('bpm')
-            result['ab_beats_count'] = rhythm.get('beats_count')
-
-        # Tonal features
-        if 'tonal' in low_data:
-            tonal = low_data['tonal']
-            result['ab_key'] = tonal.get('key_key')
-            result['ab_scale'] = tonal.get('key_scale')
-            result['ab_key_strength'] = tonal.get('key_strength')
-
-        # Low-level audio
-        if 'lowlevel' in low_data:
-            lowlevel = low_data['lowlevel']
-            result['ab_loudness'] = lowlevel.get('average_loudness')
-
-        # High-level features
-        if 'highlevel' in high_data:
-            highlevel = high_data['highlevel']
+        # Network errors, malformed or non-JSON bodies and unexpected shapes
+        # are failed lookups, not misses: they mustn't be cached as None
+        raise SourceUnavailable(f"MusicBrainz search failed for {artist} - {title}: {e}")
+
+
+def _is_acousticbrainz_id_key(key: str) -> bool:
+    """MBIDs and submission offsets ("0", "1", ...) key the bulk responses."""
+    return key.isdigit() or (len(key) == 36 and key.count('-') == 4)
+
+
+def _prune_acousticbrainz_object(pairs: List[Tuple[str, object]]) -> Dict:
+    """
+    json object_pairs_hook that keeps only the fields we extract.
+
+    Low-level documents are several MB each (frame-level descriptors,
+    covariance matrices...). Pruning while decoding means each of those
+    sub-objects is dropped as soon as it's parsed instead of being held
+    for the whole batch.
+    """
+    return {k: v for k, v in pairs if k in ACOUSTICBRAINZ_FIELDS or _is_acousticbrainz_id_key(k)}
+
+
+def acousticbrainz_low_fields(low_data: Dict) -> Dict:
+    """Extract rhythm, tonal and loudness columns from a low-level document."""
+    result = {}
+
+    # Rhythm features
+    if 'rhythm' in low_data:
+        rhythm = low_data['rhythm']
+        result['ab_bpm'] = rhythm.get('bpm')
+        result['ab_beats_count'] = rhythm.get('beats_count')
+
+    # Tonal features
+    if 'tonal' in low_data:
+        tonal = low_data['tonal']
+        result['ab_key'] = tonal.get('key_key')
+        result['ab_scale'] = tonal.get('key_scale')
+        result['ab_key_strength'] = tonal.get('key_strength')
+
+    # Low-level audio
+    if 'lowlevel' in low_data:
+        lowlevel = low_data['lowlevel']
+        result['ab_loudness'] = lowlevel.get('average_loudness')
+
+    return result
+
+
+def acousticbrainz_high_fields(high_data: Dict) -> Dict:
+    """Extract danceability, mood and voice columns from a high-level document."""
+    result = {}
+
+    if 'highlevel' in high_data:
+        highlevel = high_data['highlevel']
+
+        # Danceability
+        if 'danceability' in highlevel:
+            result['ab_danceability'] = highlevel['danceability'].get('all', {}).get('danceable')
+
+        # Mood
+        if 'mood_aggressive' in highlevel:
+            result['ab_mood_aggressive'] = highlevel['mood_aggressive'].get('all', {}).get('aggressive')
+        if 'mood_happy' in highlevel:
+            result['ab_mood_happy'] = highlevel['mood_happy'].get('all', {}).get('happy')
+        if 'mood_relaxed' in highlevel:
+            result['ab_mood_relaxed'] = highlevel['mood_relaxed'].get('all', {}).get('relaxed')
+
+        # Voice/Instrumental
+        if 'voice_instrumental' in highlevel:
+            result['ab_voice_instrumental'] = highlevel['voice_instrumental'].get('all', {}).get('instrumental')
+
+    return result
+
+
+def _fetch_acousticbrainz_bulk(level: str, mbids: List[str]) -> Dict[str, Dict]:
+    """
+    Fetch one bulk endpoint ('low-level' or 'high-level') for up to 25 MBIDs.
+
+    Returns {mbid: first submission's document}. Recordings AcousticBrainz
+    doesn't know are simply absent from the response.
+    """
+    response = http_client.get(
+        f'{ACOUSTICBRAINZ_API_URL}/{level}',
+        limiter=acousticbrainz_limiter,
+        params={'recording_ids': ';'.join(mbids)}
+    )
+    response.raise_for_status()
+
+    data = json.loads(response.text, object_pairs_hook=_prune_acousticbrainz_object)
+    return {
+        mbid: submissions.get('0', {})
+        for mbid, submissions in data.items()
+        if mbid in mbids and isinstance(submissions, dict)
+    }
 
-            # Danceability
-            if 'danceability' in highlevel:
-                result['ab_danceability'] = highlevel['danceability'].get('all', {}).get('danceable')
 
-            # Mood
-            if 'mood_aggressive' in highlevel:
-                result['ab_mood_aggressive'] = highlevel['mood_aggressive'].get('all', {}).get('aggressive')
-            if 'mood_happy' in highlevel:
-                result['ab_mood_happy'] = highlevel['mood_happy'].get('all', {}).get('happy')
-            if 'mood_relaxed' in highlevel:
-                result['ab_mood_relaxed'] = highlevel['mood_relaxed'].get('all', {}).get('relaxed')
+def get_acousticbrainz_features_batch(mbids: List[str]) -> Dict[str, Optional[Dict]]:
+    """
+    Get audio features from AcousticBrainz for many MusicBrainz IDs.
 
-            # Voice/Instrumental
-            if 'voice_instrumental' in highlevel:
-                result['ab_voice_instrumental'] = highlevel['voice_instrumental'].get('all', {}).get('instrumental')
+    Uses the bulk low-level/high-level endpoints, 25 recordings per call.
+    High-level data is only requested for recordings that have low-level
+    data. Returns {mbid: fields or None}; MBIDs in a chunk whose request
+    failed are left out so they aren't cached as misses.
+    """
+    results: Dict[str, Optional[Dict]] = {}
+    failures = 0
 
-        return result if result else None
+    for i in range(0, len(mbids), ACOUSTICBRAINZ_BATCH):
+        chunk = mbids[i:i + ACOUSTICBRAINZ_BATCH]
+        try:
+            low_docs = _fetch_acousticbrainz_bulk('low-level', chunk)
+            found = [mbid for mbid in chunk if low_docs.get(mbid)]
+            high_docs = _fetch_acousticbrainz_bulk('high-level', found) if found else {}
+        except (requests.RequestException, ValueError) as e:
+            logging.debug(f"AcousticBrainz batch of {len(chunk)} failed: {e}")
+            failures += 1
+            continue
+
+        for mbid in chunk:
+            result = {}
+            if low_docs.get(mbid):
+                result.update(acousticbrainz_low_fields(low_docs[mbid]))
+                result.update(acousticbrainz_high_fields(high_docs.get(mbid, {})))
+            results[mbid] = result or None
+
+    if failures and not results:
+        raise SourceUnavailable("All AcousticBrainz batches failed")
+    return results
+
+
+def cached_lookup(source: str, key: str, lookup, *args) -> Optional[Dict]:
+    """
+    Run `lookup(*args)` through the persistent cache.
+
+    Confirmed misses (None) are cached too; failed lookups are not, so they
+    are retried on the next run.
+    """
+    if enrichment_cache:
+        found, value = enrichment_cache.get(source, key)
+        if found:
+            return value
 
-    except Exception as e:
-        logging.debug(f"AcousticBrainz lookup failed for MBID {mbid}: {e}")
+    try:
+        value = lookup(*args)
+    except SourceUnavailable as e:
+        logging.debug(str(e))
         return None
 
+    if enrichment_cache:
+        enrichment_cache.set(source, key, value)
+    return value
+
+
+def cached_batch_lookup(source: str, ids: List[str], batch_lookup) -> Dict[str, Optional[Dict]]:
+    """
+    Batch version of cached_lookup() for multi-ID endpoints.
+
+    Only IDs missing from the cache are fetched. Returns {id: value} for every
+    ID that is cached or was fetched; IDs whose batch failed are left out.
+    """
+    results: Dict[str, Optional[Dict]] = {}
+    missing = []
+    for item_id in dict.fromkeys(ids):
+        if enrichment_cache:
+            found, value = enrichment_cache.get(source, item_id)
+            if found:
+                results[item_id] = value
+                continue
+        missing.append(item_id)
+
+    if missing:
+        try:
+            fetched = batch_lookup(missing)
+        except SourceUnavailable as e:
+            logging.debug(str(e))
+            fetched = {}
+        for item_id, value in fetched.items():
+            if enrichment_cache:
+                enrichment_cache.set(source, item_id, value)
+            results[item_id] = value
+
+    return results
+
+
+def enrich_spotify_batch(items: List[Tuple[str, Dict]]) -> Dict[str, Dict]:
+    """
+    Complete Spotify data for a batch of resolved tracks.
+
+    Args:
+        items: (track_key, spotify fields) pairs; fields must contain
+            'spotify_id' and may already hold the basic track info
+
+    Returns:
+        {track_key: extra fields} with audio features, plus basic track
+        info for any item that only had an ID
+    """
+    ids = [fields['spotify_id'] for _, fields in items]
+    features = cached_batch_lookup('spotify_features', ids, get_spotify_audio_features_batch)
+
+    # Only fetch full track objects when we don't already have them
+    bare_ids = [fields['spotify_id'] for _, fields in items if 'spotify_popularity' not in fields]
+    tracks = cached_batch_lookup('spotify_tracks', bare_ids, get_spotify_tracks_batch) if bare_ids else {}
+
+    results = {}
+    for key, fields in items:
+        spotify_id = fields['spotify_id']
+        extra = {}
+        if tracks.get(spotify_id):
+            extra.update(tracks[spotify_id])
+        if features.get(spotify_id):
+            extra.update(features[spotify_id])
+        results[key] = extra
+    return results
+
 
 def enrich_track(title: str, artist: str) -> Dict:
     """Enrich a single track with data from all sources."""
     enriched = {}
+    key = track_key(artist, title)
 
     # Spotify
-    spotify_data = search_spotify(title, artist)
+    spotify_data = cached_lookup('spotify', key, search_spotify, title, artist)
     if spotify_data:
         enriched.update(spotify_data)
+        enriched.update(enrich_spotify_batch([(key, spotify_data)])[key])
 
     # Last.fm
-    lastfm_data = search_lastfm(title, artist)
+    lastfm_data = cached_lookup('lastfm', key, search_lastfm, title, artist)
     if lastfm_data:
         enriched.update(lastfm_data)
 
     # MusicBrainz
-    musicbrainz_data = search_musicbrainz(title, artist)
+    musicbrainz_data = cached_lookup('musicbrainz', key, search_musicbrainz, title, artist)
     if musicbrainz_data:
         enriched.update(musicbrainz_data)
 
         # AcousticBrainz (requires MusicBrainz ID)
         mbid = musicbrainz_data.get('musicbrainz_id')
         if mbid:
-            acousticbrainz_data = get_acousticbrainz_features(mbid)
+            acousticbrainz_data = cached_batch_lookup(
+                'acousticbrainz', [mbid], get_acousticbrainz_features_batch
+            ).get(mbid)
             if acousticbrainz_data:
                 enriched.update(acousticbrainz_data)
 
     return enriched
 
 
+def build_stages(queue_size: Optional[int] = None) -> List[Stage]:
+    """
+    Build the enrichment stages for the available sources.
+
+    Spotify, Last.fm and MusicBrainz each consume the full track list at
+    their own rate. Resolved Spotify IDs are gathered into batches for the
+    multi-ID endpoints, and AcousticBrainz picks up MusicBrainz IDs in bulk
+    chunks as they arrive. Each stage takes (track_key, (title, artist)).
+
+    Args:
+        queue_size: Bound on each stage's queue (None for unbounded)
+    """
+    def lookup_spotify(key, track):
+        title, artist = track
+        return cached_lookup('spotify', key, search_spotify, title, artist)
+
+    def lookup_lastfm(key, track):
+        title, artist = track
+        return cached_lookup('lastfm', key, search_lastfm, title, artist)
+
+    def lookup_musicbrainz(key, track):
+        title, artist = track
+        return cached_lookup('musicbrainz', key, search_musicbrainz, title, artist)
+
+    def lookup_acousticbrainz(items):
+        mbids = [mbid for _, mbid in items]
+        features = cached_batch_lookup('acousticbrainz', mbids, get_acousticbrainz_features_batch)
+        return {key: features.get(mbid) for key, mbid in items}
+
+    acousticbrainz = Stage('acousticbrainz', lookup_acousticbrainz,
+                           workers=SOURCE_WORKERS['acousticbrainz'],
+                           batch_size=ACOUSTICBRAINZ_BATCH,
+                           batch_wait=ACOUSTICBRAINZ_BATCH_WAIT,
+                           maxsize=queue_size)
+    spotify_batch = Stage('spotify_batch', enrich_spotify_batch,
+                          workers=SOURCE_WORKERS['spotify_batch'],
+                          batch_size=SPOTIFY_FEATURES_BATCH,
+                          maxsize=queue_size)
+    stages = [
+        Stage('spotify', lookup_spotify, workers=SOURCE_WORKERS['spotify'],
+              feeds=spotify_batch, follow=lambda result: result if result.get('spotify_id') else None,
+              maxsize=queue_size),
+        spotify_batch,
+        Stage('lastfm', lookup_lastfm, workers=SOURCE_WORKERS['lastfm'], maxsize=queue_size),
+        Stage('musicbrainz', lookup_musicbrainz, workers=SOURCE_WORKERS['musicbrainz'],
+              feeds=acousticbrainz, follow=lambda result: result.get('musicbrainz_id'),
+              maxsize=queue_size),
+        acousticbrainz,
+    ]
+
+    # Skip sources that can't be queried at all
+    if not (SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET):
+        stages = [s for s in stages if not s.name.startswith('spotify')]
+    if not LASTFM_API_KEY:
+        stages = [s for s in stages if s.name != 'lastfm']
+    return stages
+
+
+def rate_limiters() -> Dict[str, AdaptiveTokenBucket]:
+    """Each source's rate limiter."""
+    return {
+        'spotify': spotify_limiter,
+        'lastfm': lastfm_limiter,
+        'musicbrainz': musicbrainz_limiter,
+        'acousticbrainz': acousticbrainz_limiter,
+    }
+
+
+def rate_stats() -> Dict[str, Dict]:
+    """Current adaptive rate and 429/503 counts per source."""
+    return {source: limiter.stats() for source, limiter in rate_limiters().items()
+            if hasattr(limiter, 'stats')}
+
+
+def format_rate_stats() -> str:
+    """Human-readable per-source rate table."""
+    lines = [f"  {'source':<16} {'req/s':>7} {'peak':>7} {'max':>7} {'429/503':>8} {'backoffs':>9}"]
+    for source, s in rate_stats().items():
+        rate, peak, max_rate = ('-' if v is None else v for v in (s['rate'], s['peak_rate'], s['max_rate']))
+        lines.append(f"  {source:<16} {rate:>7} {peak:>7} {max_rate:>7} "
+                     f"{s['throttled']:>8} {s['backoffs']:>9}")
+    return "\n".join(lines)
+
+
+def stage_progress_reporter() -> Callable[[List[Stage]], None]:
+    """Progress callback printing each stage's completed/submitted counts and current rate."""
+    progress_lock = threading.Lock()
+    limiters = rate_limiters()
+
+    def report(stages):
+        with progress_lock:
+            parts = []
+            for s in stages:
+                part = f"{s.name} {s.completed}/{s.submitted}"
+                limiter = limiters.get(s.name)
+                if limiter is not None and limiter.rate:
+                    part += f" @{limiter.rate:.1f}/s"
+                parts.append(part)
+            print("  " + "  ".join(parts), end='\r')
+
+    return report
+
+
+def enrich_all(unique_tracks: Dict[str, Tuple[str, str]], show_progress: bool = True) -> Dict[str, Dict]:
+    """
+    Enrich many tracks with every source running in parallel (see build_stages()).
+
+    Args:
+        unique_tracks: Mapping of track_key -> (title, artist)
+        show_progress: Print per-source progress while running
+
+    Returns:
+        Mapping of track_key -> merged enrichment dict
+    """
+    pipeline = Pipeline(build_stages(), progress=stage_progress_reporter() if show_progress else None)
+    return pipeline.run(unique_tracks)
+
+
+class EnrichmentMemo:
+    """
+    The enrichments of the most recently seen tracks, shared by the chunks
+    of a run so a track repeated in a later chunk isn't enriched again.
+
+    Bounded, so memory doesn't grow with the input: a repeat that has been
+    evicted goes back through the pipeline, where the lookup cache answers
+    it without touching the network. Not thread-safe.
+    """
+
+    def __init__(self, size: int = ENRICHMENT_MEMO_SIZE):
+        self.size = max(1, size)
+        self._items: 'OrderedDict[str, Dict]' = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict]:
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key: str, enrichment: Dict):
+        self._items[key] = enrichment
+        self._items.move_to_end(key)
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def dedupe_tracks(tracks: List[Dict]) -> Tuple[Dict[str, Tuple[str, str]], List[str]]:
+    """
+    Collapse rows to unique normalized (artist, title) keys.
+
+    Args:
+        tracks: CSV rows with TITLE and ARTIST columns
+
+    Returns:
+        (unique, row_keys): `unique` maps each key to the (title, artist) of
+        its first occurrence, in first-seen order; `row_keys` gives the key
+        for every input row, so results can be fanned back out.
+    """
+    unique: Dict[str, Tuple[str, str]] = {}
+    row_keys = []
+    for track in tracks:
+        title = track.get('TITLE', '')
+        artist = track.get('ARTIST', '')
+        key = track_key(artist, title)
+        if key not in unique:
+            unique[key] = (title, artist)
+        row_keys.append(key)
+    return unique, row_keys
+
+
+def enrich_rows(rows: List[Dict], success_count: Dict[str, int],
+                memo: Optional[EnrichmentMemo] = None) -> Tuple[List[Dict], int]:
+    """
+    Enrich one chunk of CSV rows.
+
+    Rows are deduplicated within the chunk, and tracks still in `memo`
+    (recent chunks of the same run) are copied from it rather than enriched
+    again.
+
+    Args:
+        rows: CSV rows with TITLE and ARTIST columns
+        success_count: Per-source match counters, updated in place
+        memo: Recent enrichments shared by every chunk of a run; this
+            chunk's new tracks are added to it
+
+    Returns:
+        (enriched rows in input order, number of tracks sent for enrichment)
+    """
+    # Collapse repeated tracks so each one is only enriched once
+    unique_tracks, row_keys = dedupe_tracks(rows)
+    enrichments: Dict[str, Dict] = {}
+    new_tracks = {}
+    for key, track in unique_tracks.items():
+        known = memo.get(key) if memo is not None else None
+        if known is not None:
+            enrichments[key] = known
+        else:
+            new_tracks[key] = track
+
+    # Enrich each new track, all sources in parallel
+    if new_tracks:
+        with metrics.timer('enrich'):
+            fresh = enrich_all(new_tracks)
+        if catalogue:
+            with metrics.timer('catalogue'):
+                catalogue.record_enrichments(
+                    (title, artist, fresh[key]) for key, (title, artist) in new_tracks.items()
+                )
+        enrichments.update(fresh)
+        if memo is not None:
+            for key, enrichment in fresh.items():
+                memo.put(key, enrichment)
+
+    # Fan results back out to every original row, keeping row order
+    enriched_rows = []
+    for track, key in zip(rows, row_keys):
+        enrichment = enrichments[key]
+
+        # Track successes
+        if any(k.startswith('spotify_') for k in enrichment.keys()):
+            success_count['spotify'] += 1
+        if any(k.startswith('lastfm_') for k in enrichment.keys()):
+            success_count['lastfm'] += 1
+        if any(k.startswith('musicbrainz_') for k in enrichment.keys()):
+            success_count['musicbrainz'] += 1
+        if any(k.startswith('ab_') for k in enrichment.keys()):
+            success_count['acousticbrainz'] += 1
+
+        # Combine original and enriched data
+        enriched_rows.append({**track, **enrichment})
+
+    return enriched_rows, len(new_tracks)
+
+
+def load_checkpoint(path: str) -> Optional[Dict]:
+    """Read a run checkpoint, or None if there isn't a usable one."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        logging.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def save_checkpoint(path: str, state: Dict):
+    """Atomically replace the run checkpoint."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
 def get_enrichment_columns() -> List[str]:
     """Return all possible enrichment column names in order."""
     return [
         # Spotify
-        'spotify_id', 'spotify_popularity', 'spotify_duration_ms',
+        'spotify_id', 'spotify_confidence', 'spotify_popularity', 'spotify_duration_ms',
         'spotify_explicit', 'spotify_preview_url', 'spotify_album',
         'spotify_release_date', 'spotify_danceability', 'spotify_energy',
         'spotify_key', 'spotify_loudness', 'spotify_mode', 'spotify_speechiness',
@@ -373,7 +983,7 @@ def get_enrichment_columns() -> List[str]:
         # Last.fm
         'lastfm_playcount', 'lastfm_listeners', 'lastfm_tags', 'lastfm_url',
         # MusicBrainz
-        'musicbrainz_id', 'musicbrainz_title', 'musicbrainz_length',
+        'musicbrainz_id', 'musicbrainz_confidence', 'musicbrainz_title', 'musicbrainz_length',
         'musicbrainz_tags', 'musicbrainz_country', 'musicbrainz_date',
         # AcousticBrainz
         'ab_bpm', 'ab_beats_count', 'ab_key', 'ab_scale', 'ab_key_strength',
@@ -382,30 +992,91 @@ def get_enrichment_columns() -> List[str]:
     ]
 
 
+def write_run_report(args, tracks: int, unique_tracks: int, success_count: Dict[str, int]):
+    """Write the --report/--prometheus files, if asked for."""
+    if not (args.report or args.prometheus):
+        return
+    memo = normalize.cache_info()
+    caches = {'clean_string': metrics.cache_stats(memo.hits, memo.misses)}
+    if enrichment_cache:
+        caches['lookup'] = enrichment_cache.stats()
+    if spotify_index:
+        caches['spotify_index'] = spotify_index.stats()
+    report = metrics.report('enrich_tracks', input=args.input_csv, tracks=tracks,
+                            unique_tracks=unique_tracks, matched=success_count,
+                            http=http_client.stats(), caches=caches, rate_limits=rate_stats())
+    try:
+        metrics.write_report(report, args.report, args.prometheus)
+    except OSError as e:
+        logging.error(f"Couldn't write the run report: {e}")
+        return
+    for path in (args.report, args.prometheus):
+        if path:
+            print(f"Run report: {path}")
+
+
 def main():
     """Main execution function."""
 
-    # Parse arguments
-    if len(sys.argv) < 2:
-        print("Usage: python enrich_tracks.py <input_csv> [output_csv]")
-        print("\nExample:")
-        print("  python enrich_tracks.py rachel-grace-almeida_complete.csv")
-        sys.exit(1)
+    global enrichment_cache, spotify_index, catalogue
 
-    input_file = sys.argv[1]
+    # Parse arguments
+    parser = argparse.ArgumentParser(
+        description="Enrich a track CSV with Spotify, Last.fm, MusicBrainz and AcousticBrainz data.",
+        epilog="Example: python enrich_tracks.py rachel-grace-almeida_complete.csv"
+    )
+    parser.add_argument('input_csv', help="CSV, Parquet or Arrow file with TITLE and ARTIST columns")
+    parser.add_argument('output_csv', nargs='?',
+                        help="Output file (default: <input>_enriched.csv, or .parquet/.arrow)")
+    parser.add_argument('--format', choices=FORMATS,
+                        help="Output format; parquet and arrow need pyarrow "
+                             "(default: from the output file's extension, else csv)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"Directory for the lookup cache (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--no-cache', action='store_true', help="Don't read or write the lookup cache")
+    parser.add_argument('--no-catalogue', action='store_true',
+                        help="Don't store results in the cross-show catalogue in the cache directory")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows enriched and written per checkpoint (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue an interrupted run from its checkpoint")
+    parser.add_argument('--report', metavar='FILE',
+                        help="Write a JSON run report: stage timings, per-host HTTP stats, "
+                             "cache hit ratios, rate limits")
+    parser.add_argument('--prometheus', metavar='FILE',
+                        help="Write the same metrics in Prometheus text format")
+    parser.add_argument('--profile', nargs='?', const='enrich_tracks-profile', metavar='PREFIX',
+                        help="Sample every thread's stack and write PREFIX.wall.folded, PREFIX.cpu.folded "
+                             "(flamegraph input) and PREFIX.txt (default prefix: enrich_tracks-profile)")
+    parser.add_argument('--profile-rate', type=float, default=profiler.DEFAULT_RATE, metavar='HZ',
+                        help=f"Profiler samples per second (default: {profiler.DEFAULT_RATE:g})")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiler.start(args.profile, args.profile_rate)
+
+    input_file = args.input_csv
 
     # Generate output filename
-    if len(sys.argv) > 2:
-        output_file = sys.argv[2]
+    output_format = args.format or (detect_format(args.output_csv) if args.output_csv else DEFAULT_FORMAT)
+    if args.output_csv:
+        output_file = args.output_csv
     else:
         base = input_file.rsplit('.', 1)[0]
-        output_file = f"{base}_enriched.csv"
+        output_file = f"{base}_enriched{FORMAT_EXTENSIONS[output_format]}"
+
+    try:
+        require_pyarrow(output_format)
+    except RuntimeError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
 
     print(f"\n{'='*60}")
     print(f"Track Data Enrichment")
     print(f"{'='*60}")
     print(f"Input: {input_file}")
-    print(f"Output: {output_file}")
+    print(f"Output: {output_file} ({output_format})")
+    print(f"Cache: {'disabled' if args.no_cache else args.cache_dir}")
     print(f"{'='*60}\n")
 
     # Check which APIs are available
@@ -428,12 +1099,9 @@ def main():
         print(f"  {api}")
     print()
 
-    # Read input CSV
+    # Open the input; rows are read lazily, one chunk at a time
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            tracks = list(reader)
-            original_columns = reader.fieldnames
+        input_reader = RowReader(input_file)
     except FileNotFoundError:
         print(f"❌ Error: Input file '{input_file}' not found")
         sys.exit(1)
@@ -441,73 +1109,153 @@ def main():
         print(f"❌ Error reading input file: {e}")
         sys.exit(1)
 
-    if not tracks:
-        print("❌ Error: Input CSV is empty")
-        sys.exit(1)
-
-    # Check for required columns
-    if 'TITLE' not in original_columns or 'ARTIST' not in original_columns:
-        print("❌ Error: CSV must have TITLE and ARTIST columns")
-        sys.exit(1)
-
-    print(f"Processing {len(tracks)} tracks...\n")
-
-    # Enrich each track
-    enriched_tracks = []
-    success_count = {'spotify': 0, 'lastfm': 0, 'musicbrainz': 0, 'acousticbrainz': 0}
-
-    for i, track in enumerate(tracks, 1):
-        title = track.get('TITLE', '')
-        artist = track.get('ARTIST', '')
+    checkpoint_file = f"{output_file}.checkpoint"
+    checkpoint = None
+    if args.resume:
+        checkpoint = load_checkpoint(checkpoint_file)
+        if checkpoint is None:
+            print("No checkpoint found, starting from the beginning\n")
+        elif checkpoint['input'] != os.path.abspath(input_file):
+            print(f"❌ Error: {checkpoint_file} belongs to {checkpoint['input']}")
+            sys.exit(1)
+        elif checkpoint.get('format', 'csv') != output_format:
+            print(f"❌ Error: {checkpoint_file} was written as {checkpoint.get('format', 'csv')}, "
+                  f"not {output_format}")
+            sys.exit(1)
+
+    with input_reader:
+        reader = iter(input_reader)
+        original_columns = input_reader.columns
+
+        if not original_columns:
+            print("❌ Error: Input file is empty")
+            sys.exit(1)
+
+        # Check for required columns
+        if 'TITLE' not in original_columns or 'ARTIST' not in original_columns:
+            print("❌ Error: Input must have TITLE and ARTIST columns")
+            sys.exit(1)
+
+        # Skip rows a previous run already wrote
+        rows_done = checkpoint['rows_done'] if checkpoint else 0
+        for _ in islice(reader, rows_done):
+            pass
+
+        with metrics.timer('read'):
+            chunk = list(islice(reader, args.chunk_size))
+        if not chunk and not checkpoint:
+            print("❌ Error: Input file is empty")
+            sys.exit(1)
+
+        if not args.no_cache:
+            enrichment_cache = EnrichmentCache(args.cache_dir)
+            spotify_index = SpotifyIndex(args.cache_dir)
+        if not args.no_catalogue:
+            catalogue = Catalogue(args.cache_dir)
+
+        success_count = checkpoint['success_count'] if checkpoint else {
+            'spotify': 0, 'lastfm': 0, 'musicbrainz': 0, 'acousticbrainz': 0
+        }
+        unique_total = checkpoint['unique_enriched'] if checkpoint else 0
+        # Recent tracks' enrichments, so repeats in later chunks aren't
+        # enriched again (a resumed run starts it afresh)
+        memo = EnrichmentMemo()
 
-        print(f"[{i}/{len(tracks)}] {artist} - {title}...", end='\r')
+        # Prepare output columns
+        enrichment_columns = get_enrichment_columns()
+        output_columns = list(original_columns) + enrichment_columns
 
-        enrichment = enrich_track(title, artist)
+        if checkpoint:
+            print(f"Resuming after {rows_done} rows...\n")
+        else:
+            print(f"Processing tracks in chunks of {args.chunk_size}...\n")
 
-        # Track successes
-        if any(k.startswith('spotify_') for k in enrichment.keys()):
-            success_count['spotify'] += 1
-        if any(k.startswith('lastfm_') for k in enrichment.keys()):
-            success_count['lastfm'] += 1
-        if any(k.startswith('musicbrainz_') for k in enrichment.keys()):
-            success_count['musicbrainz'] += 1
-        if any(k.startswith('ab_') for k in enrichment.keys()):
-            success_count['acousticbrainz'] += 1
+        try:
+            # Older checkpoints recorded the CSV size as output_bytes
+            resume_position = None
+            if checkpoint:
+                resume_position = checkpoint.get('output_position', checkpoint.get('output_bytes'))
+            writer = ChunkWriter(output_file, output_columns, output_format, resume_position)
+        except Exception as e:
+            print(f"❌ Error writing output file: {e}")
+            sys.exit(1)
 
-        # Combine original and enriched data
-        enriched_track = {**track, **enrichment}
-        enriched_tracks.append(enriched_track)
+        try:
+            while chunk:
+                print(f"Rows {rows_done + 1}-{rows_done + len(chunk)}:")
+                enriched_rows, unique_count = enrich_rows(chunk, success_count, memo)
+                with metrics.timer('write'):
+                    writer.write(enriched_rows)
+
+                    rows_done += len(chunk)
+                    unique_total += unique_count
+                    save_checkpoint(checkpoint_file, {
+                        'input': os.path.abspath(input_file),
+                        'format': output_format,
+                        'rows_done': rows_done,
+                        'output_position': writer.position,
+                        'unique_enriched': unique_total,
+                        'success_count': success_count,
+                    })
+                print()
+
+                with metrics.timer('read'):
+                    chunk = list(islice(reader, args.chunk_size))
+
+            with metrics.timer('write'):
+                writer.finish()
+
+        except KeyboardInterrupt:
+            writer.close()
+            print(f"\n\n⚠️  Interrupted after {rows_done} rows.")
+            print(f"Run again with --resume to continue from row {rows_done + 1}.")
+            sys.exit(130)
+        except Exception as e:
+            writer.close()
+            print(f"❌ Error writing output file: {e}")
+            sys.exit(1)
+        finally:
+            if enrichment_cache:
+                enrichment_cache.close()
+            if spotify_index:
+                spotify_index.close()
+            if catalogue:
+                catalogue.close()
+
+    # Finished cleanly; the checkpoint is no longer needed
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+    total = rows_done
+    dedup_ratio = 1 - unique_total / total if total else 0.0
 
     print(f"\n✓ Enrichment complete\n")
-
-    # Prepare output columns
-    enrichment_columns = get_enrichment_columns()
-    output_columns = list(original_columns) + enrichment_columns
-
-    # Write output CSV
-    try:
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=output_columns)
-            writer.writeheader()
-            writer.writerows(enriched_tracks)
-
-        print(f"{'='*60}")
-        print(f"✓ Success!")
-        print(f"{'='*60}")
-        print(f"Total tracks: {len(tracks)}")
-        print(f"Output file: {output_file}")
-        print(f"\nMatch rates:")
-        print(f"  Spotify: {success_count['spotify']}/{len(tracks)} ({success_count['spotify']/len(tracks)*100:.1f}%)")
-        print(f"  Last.fm: {success_count['lastfm']}/{len(tracks)} ({success_count['lastfm']/len(tracks)*100:.1f}%)")
-        print(f"  MusicBrainz: {success_count['musicbrainz']}/{len(tracks)} ({success_count['musicbrainz']/len(tracks)*100:.1f}%)")
-        print(f"  AcousticBrainz: {success_count['acousticbrainz']}/{len(tracks)} ({success_count['acousticbrainz']/len(tracks)*100:.1f}%)")
-        print(f"\nLog file: enrich_tracks.log")
-        print(f"{'='*60}\n")
-
-    except Exception as e:
-        print(f"❌ Error writing output file: {e}")
-        sys.exit(1)
-
+    print(f"{'='*60}")
+    print(f"✓ Success!")
+    print(f"{'='*60}")
+    print(f"Total tracks: {total}")
+    print(f"Unique tracks enriched: {unique_total} (dedup ratio {dedup_ratio*100:.1f}%)")
+    print(f"Output file: {output_file}")
+    print(f"\nMatch rates:")
+    print(f"  Spotify: {success_count['spotify']}/{total} ({success_count['spotify']/total*100:.1f}%)")
+    print(f"  Last.fm: {success_count['lastfm']}/{total} ({success_count['lastfm']/total*100:.1f}%)")
+    print(f"  MusicBrainz: {success_count['musicbrainz']}/{total} ({success_count['musicbrainz']/total*100:.1f}%)")
+    print(f"  AcousticBrainz: {success_count['acousticbrainz']}/{total} ({success_count['acousticbrainz']/total*100:.1f}%)")
+    if enrichment_cache:
+        print(f"\nCache: {enrichment_cache.summary()}")
+    if spotify_index:
+        print(f"Spotify index: {spotify_index.summary()}")
+    if catalogue:
+        print(f"Catalogue: {catalogue.summary()}")
+    print(f"\nRate limits (adaptive):")
+    print(format_rate_stats())
+    print(f"\nStages:")
+    print(metrics.format_stages())
+    print(f"\nHTTP:")
+    print(http_client.format_stats())
+    print(f"\nLog file: enrich_tracks.log")
+    print(f"{'='*60}\n")
+    write_run_report(args, total, unique_total, success_count)
 
 if __name__ == "__main__":
     main()
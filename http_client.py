@@ -0,0 +1,311 @@
+"""
+Shared HTTP Client
+
+One pooled `requests.Session` used by every script that talks to NTS,
+Spotify, Last.fm, MusicBrainz or AcousticBrainz, so connections are kept
+alive and reused instead of paying a new TCP+TLS handshake per request.
+
+Features:
+- Per-host connection pools with keep-alive
+- gzip/deflate response compression
+- Retries with jittered exponential backoff on 429/5xx, honouring Retry-After
+- Configurable connect/read timeouts
+- Per-host stats: requests, retries, connection reuse, bytes received,
+  latency percentiles and histogram, time spent waiting on the limiter and
+  in backoff
+- Optional rate limiter per request, fed back every response (see
+  rate_limit.AdaptiveTokenBucket)
+
+Usage:
+    import http_client
+
+    response = http_client.get(url, params={...})
+    response = http_client.get(url, limiter=spotify_limiter)
+    print(http_client.format_stats())
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import Histogram
+from rate_limit import THROTTLE_STATUSES
+
+# Timeouts (seconds)
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+# Retry policy
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+# Connection pooling
+DEFAULT_POOL_HOSTS = 16  # Number of distinct hosts to keep pools for
+DEFAULT_POOL_SIZE = 16   # Connections kept alive per host
+
+# Latency samples kept per host for percentiles
+LATENCY_SAMPLES = 10000
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def percentile(sorted_values, pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class HostStats:
+    """Counters for a single host."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.bytes = 0
+        self.rate_wait = 0.0
+        self.backoff = 0.0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.histogram = Histogram()
+
+    def summary(self) -> Dict:
+        latencies = sorted(self.latencies)
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'p50_ms': _ms(percentile(latencies, 50)),
+            'p90_ms': _ms(percentile(latencies, 90)),
+            'p99_ms': _ms(percentile(latencies, 99)),
+            'bytes': self.bytes,
+            'rate_wait_seconds': round(self.rate_wait, 3),
+            'backoff_seconds': round(self.backoff, 3),
+            'latency': self.histogram.summary(),
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+class HttpClient:
+    """Thread-safe pooled HTTP client with retries and per-host stats."""
+
+    def __init__(self,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX,
+                 pool_hosts: int = DEFAULT_POOL_HOSTS,
+                 pool_size: int = DEFAULT_POOL_SIZE):
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+        # Retries are handled here (not by urllib3) so they show up in stats
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._stats: Dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+
+    def _host_stats(self, host: str) -> HostStats:
+        with self._lock:
+            if host not in self._stats:
+                self._stats[host] = HostStats()
+            return self._stats[host]
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Full jitter: uniform in [0, base * 2^attempt]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method: str, url: str, limiter=None, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying on 429/5xx and connection errors.
+
+        429 is retried for any method (the server did not process it);
+        5xx and connection errors only for idempotent methods. The final
+        response is returned as-is, so callers still use raise_for_status().
+
+        If a `limiter` is given, a token is taken from it before every
+        attempt. Limiters with a record_response() method (adaptive ones)
+        are told each response's status and Retry-After, and they do the
+        waiting after a 429/503 instead of the backoff here, as long as they
+        will actually hold the next attempt back (see
+        AdaptiveTokenBucket.record_response).
+        """
+        method = method.upper()
+        record_response = getattr(limiter, 'record_response', None)
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlparse(url).hostname or ''
+        stats = self._host_stats(host)
+        may_retry_errors = method in IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            if limiter is not None:
+                waited = limiter.acquire()
+                if waited:
+                    with self._lock:
+                        stats.rate_wait += waited
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                with self._lock:
+                    stats.requests += 1
+                    stats.errors += 1
+                if not may_retry_errors or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, None)
+                logging.debug(f"{method} {url} failed ({e}); retrying in {delay:.2f}s")
+            else:
+                elapsed = time.monotonic() - start
+                # Bytes read off the wire (compressed), so gzip savings show
+                received = response.raw.tell() if hasattr(response.raw, 'tell') else len(response.content)
+                with self._lock:
+                    stats.requests += 1
+                    stats.bytes += received
+                    stats.latencies.append(elapsed)
+                    stats.histogram.observe(elapsed)
+
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                limiter_holds = False
+                if record_response:
+                    limiter_holds = bool(record_response(response.status_code, retry_after))
+
+                retryable = response.status_code == 429 or (
+                    response.status_code in RETRY_STATUSES and may_retry_errors
+                )
+                if not retryable or attempt >= self.max_retries:
+                    return response
+
+                if limiter_holds and response.status_code in THROTTLE_STATUSES:
+                    delay = 0.0  # The limiter holds the next attempt back
+                else:
+                    delay = self._backoff(attempt, retry_after)
+                logging.debug(f"{method} {url} returned {response.status_code}; retrying in {delay:.2f}s")
+                response.close()
+
+            with self._lock:
+                stats.retries += 1
+                stats.backoff += delay
+            attempt += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def _connections_opened(self) -> Dict[str, int]:
+        """New connections opened per host, read from urllib3's pools."""
+        opened: Dict[str, int] = {}
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    opened[pool.host] = opened.get(pool.host, 0) + pool.num_connections
+        return opened
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-host stats, including the connection reuse ratio."""
+        opened = self._connections_opened()
+        with self._lock:
+            result = {host: s.summary() for host, s in self._stats.items()}
+        for host, summary in result.items():
+            connections = opened.get(host)
+            summary['connections'] = connections
+            if connections is not None and summary['requests']:
+                summary['reuse_ratio'] = round(1 - connections / summary['requests'], 3)
+            else:
+                summary['reuse_ratio'] = None
+        return result
+
+    def format_stats(self) -> str:
+        """Human-readable per-host stats table."""
+        lines = [f"  {'host':<28} {'reqs':>6} {'retry':>6} {'reuse':>6} {'p50ms':>8} {'p99ms':>8} {'recv MB':>8}"]
+        for host, s in sorted(self.stats().items()):
+            reuse = f"{s['reuse_ratio']:.0%}" if s['reuse_ratio'] is not None else '-'
+            p50 = s['p50_ms'] if s['p50_ms'] is not None else '-'
+            p99 = s['p99_ms'] if s['p99_ms'] is not None else '-'
+            lines.append(f"  {host:<28} {s['requests']:>6} {s['retries']:>6} {reuse:>6} {p50:>8} {p99:>8} "
+                         f"{s['bytes'] / 1e6:>8.2f}")
+        return "\n".join(lines)
+
+
+# Process-wide default client
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Return the shared client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def configure(**kwargs) -> HttpClient:
+    """Replace the shared client with one built from `kwargs`."""
+    global _client
+    with _client_lock:
+        _client = HttpClient(**kwargs)
+        return _client
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    return get_client().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_client().get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return get_client().post(url, **kwargs)
+
+
+def stats() -> Dict[str, Dict]:
+    return get_client().stats()
+
+
+def format_stats() -> str:
+    return get_client().format_stats()
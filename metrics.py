@@ -0,0 +1,325 @@
+"""
+Run Metrics
+
+Per-stage timers and counters for one run of a script, written out at the
+end as a JSON run report and, optionally, a Prometheus text-format file
+(e.g. for node_exporter's textfile collector).
+
+- Stages are timed with `timer()` where the work happens (discover, fetch,
+  parse, clean, enrich.<source>, write, ...), so the same numbers come out
+  of every script that uses those functions. Each stage keeps its call
+  count, total seconds, slowest call, a latency histogram, and its span:
+  when it first started and last finished, relative to the run start
+- Stage seconds add up across worker threads, so a stage run by 8 workers
+  can total more than the run's wall time; compare `span_seconds` with the
+  run's `wall_seconds` to see which stage the run was waiting on. Stages
+  can nest (discovery includes its own page fetches)
+- Counters are plain named totals (`count()`)
+- Everything else the report holds (per-host HTTP stats, cache hit ratios,
+  rate limits) is collected by the script from the objects that already
+  keep it, and passed to `report()` as sections
+
+The overhead is a couple of perf_counter() calls and a dict update under a
+lock per timed call, and the timed calls are whole fetches, parses and
+batches, never single strings.
+
+Usage:
+    with metrics.timer('fetch'):
+        response = http_client.get(url)
+    metrics.count('episodes_failed')
+
+    report = metrics.report('nts_show_to_csv', http=http_client.stats())
+    metrics.write_report(report, json_path='run.json', prometheus_path='run.prom')
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+# Histogram bucket upper bounds (seconds), shared by stage and HTTP latencies
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Prefix of every Prometheus metric name
+PROMETHEUS_PREFIX = 'nts'
+
+# Report sections written to Prometheus: section -> (metric name prefix,
+# label naming each entry)
+PROMETHEUS_SECTIONS = {
+    'stages': ('stage', 'stage'),
+    'http': ('http', 'host'),
+    'caches': ('cache', 'cache'),
+    'rate_limits': ('rate_limit', 'source'),
+}
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of durations in seconds.
+
+    Not locked: callers serialise observe() (Metrics and HttpClient already
+    hold a lock when they call it).
+    """
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float] = BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # The last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def summary(self) -> Dict:
+        """Cumulative count per bucket bound ("le"), as Prometheus reports them."""
+        buckets = {}
+        total = 0
+        for bound, n in zip([str(b) for b in self.bounds] + ['+Inf'], self.counts):
+            total += n
+            buckets[bound] = total
+        return {'buckets': buckets, 'sum': round(self.sum, 6), 'count': self.count}
+
+
+class StageStats:
+    """Timings of one stage."""
+
+    __slots__ = ('histogram', 'max', 'first_start', 'last_end')
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.max = 0.0
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+
+    def summary(self, run_start: float) -> Dict:
+        h = self.histogram
+        return {
+            'count': h.count,
+            'seconds': round(h.sum, 3),
+            'mean_ms': round(h.sum / h.count * 1000, 2) if h.count else None,
+            'max_ms': round(self.max * 1000, 2),
+            'started_at': round(self.first_start - run_start, 3),
+            'ended_at': round(self.last_end - run_start, 3),
+            'span_seconds': round(self.last_end - self.first_start, 3),
+            'histogram': h.summary(),
+        }
+
+
+class _Timer:
+    """Context manager timing one call of a stage."""
+
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics: 'Metrics', stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.metrics.observe(self.stage, end - self.start, self.start)
+        return False
+
+
+class Metrics:
+    """Thread-safe stage timings and counters for one run."""
+
+    def __init__(self):
+        self.started = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._stages: Dict[str, StageStats] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def timer(self, stage: str) -> _Timer:
+        return _Timer(self, stage)
+
+    def observe(self, stage: str, seconds: float, start: Optional[float] = None):
+        """Record one call of `stage` that took `seconds` (and began at perf_counter() `start`)."""
+        if start is None:
+            start = time.perf_counter() - seconds
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats()
+            stats.histogram.observe(seconds)
+            if seconds > stats.max:
+                stats.max = seconds
+            if stats.first_start is None or start < stats.first_start:
+                stats.first_start = start
+            end = start + seconds
+            if stats.last_end is None or end > stats.last_end:
+                stats.last_end = end
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def wall_seconds(self) -> float:
+        return time.perf_counter() - self._start
+
+    def stages(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: s.summary(self._start) for name, s in self._stages.items()}
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+# Process-wide metrics for the current run
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+def reset() -> Metrics:
+    """Start a new run, e.g. between benchmark cases."""
+    global _metrics
+    _metrics = Metrics()
+    return _metrics
+
+
+def timer(stage: str) -> _Timer:
+    """Time a block as one call of `stage`: `with metrics.timer('parse'): ...`"""
+    return _metrics.timer(stage)
+
+
+def observe(stage: str, seconds: float):
+    """Record a call of `stage` timed elsewhere (e.g. a rate limiter's wait)."""
+    _metrics.observe(stage, seconds)
+
+
+def count(name: str, n: int = 1):
+    _metrics.count(name, n)
+
+
+def cache_stats(hits: int, misses: int, **extra) -> Dict:
+    """A cache's report section: hits, misses, hit ratio and any extra counters."""
+    lookups = hits + misses
+    return {'hits': hits, 'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None, **extra}
+
+
+def report(script: str, **sections) -> Dict:
+    """
+    Build the run report.
+
+    Args:
+        script: Script name, reported as `script` (and a Prometheus label)
+        **sections: Extra sections, e.g. http=http_client.stats(),
+            caches={...}, rate_limits={...}, run={'episodes': 120}
+    """
+    m = _metrics
+    return {
+        'script': script,
+        'started': m.started.isoformat(timespec='seconds'),
+        'wall_seconds': round(m.wall_seconds(), 3),
+        'stages': m.stages(),
+        'counters': m.counters(),
+        **sections,
+    }
+
+
+def _label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    return '{' + ','.join(f'{k}="{_label_value(v)}"' for k, v in labels.items()) + '}'
+
+
+def _metric_name(*parts: str) -> str:
+    name = '_'.join((PROMETHEUS_PREFIX,) + parts)
+    return ''.join(c if c.isalnum() or c == '_' else '_' for c in name)
+
+
+def prometheus_text(run_report: Dict) -> str:
+    """
+    Render a run report in the Prometheus text exposition format.
+
+    Histograms become `nts_<prefix>_seconds` (a field named `histogram`) or
+    `nts_<prefix>_<field>_seconds`, every other numeric field of a section
+    in PROMETHEUS_SECTIONS a gauge named `nts_<prefix>_<field>`, e.g.
+    nts_stage_seconds{stage="fetch"}, nts_http_latency_seconds{host=...}
+    and nts_cache_hit_ratio{cache="page"}. Counters become `nts_<name>_total`.
+    Every series carries a `script` label.
+    """
+    base = {'script': run_report.get('script', '')}
+    families: Dict[str, Dict] = {}
+
+    def sample(name: str, kind: str, labels: Dict, value, suffix: str = ''):
+        family = families.setdefault(name, {'type': kind, 'samples': []})
+        family['samples'].append(f"{name}{suffix}{_labels({**base, **labels})} {value}")
+
+    def histogram(name: str, labels: Dict, h: Dict):
+        for le, n in h['buckets'].items():
+            sample(name, 'histogram', {**labels, 'le': le}, n, '_bucket')
+        sample(name, 'histogram', labels, h['sum'], '_sum')
+        sample(name, 'histogram', labels, h['count'], '_count')
+
+    sample(_metric_name('run_wall_seconds'), 'gauge', {}, run_report.get('wall_seconds', 0))
+    for name, value in sorted(run_report.get('counters', {}).items()):
+        sample(_metric_name(name, 'total'), 'counter', {}, value)
+
+    for section, (prefix, label) in PROMETHEUS_SECTIONS.items():
+        for entry, fields in sorted((run_report.get(section) or {}).items()):
+            if not isinstance(fields, dict):
+                continue
+            labels = {label: entry}
+            histograms = {field: value for field, value in fields.items()
+                          if isinstance(value, dict) and 'buckets' in value}
+            for field, h in histograms.items():
+                parts = (prefix, 'seconds') if field == 'histogram' else (prefix, field, 'seconds')
+                histogram(_metric_name(*parts), labels, h)
+            for field, value in fields.items():
+                # A histogram's own _sum and _count already carry these
+                if histograms and field in ('count', 'seconds'):
+                    continue
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    sample(_metric_name(prefix, field), 'gauge', labels, value)
+
+    lines: List[str] = []
+    for name, family in families.items():
+        lines.append(f"# TYPE {name} {family['type']}")
+        lines.extend(family['samples'])
+    return '\n'.join(lines) + '\n'
+
+
+def _write_atomic(path: str, text: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_report(run_report: Dict, json_path: Optional[str] = None,
+                 prometheus_path: Optional[str] = None):
+    """Write the report as JSON and/or Prometheus text, each replaced atomically."""
+    if json_path:
+        _write_atomic(json_path, json.dumps(run_report, indent=2) + '\n')
+    if prometheus_path:
+        _write_atomic(prometheus_path, prometheus_text(run_report))
+
+
+def format_stages(stages: Optional[Dict[str, Dict]] = None) -> str:
+    """Human-readable per-stage timing table."""
+    stages = _metrics.stages() if stages is None else stages
+    lines = [f"  {'stage':<24} {'calls':>7} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'span s':>8}"]
+    for name, s in sorted(stages.items(), key=lambda item: item[1]['started_at']):
+        mean = s['mean_ms'] if s['mean_ms'] is not None else '-'
+        lines.append(f"  {name:<24} {s['count']:>7} {s['seconds']:>9} {mean:>9} {s['max_ms']:>9} "
+                     f"{s['span_seconds']:>8}")
+    return "\n".join(lines)
@@ -0,0 +1,112 @@
+"""
+String Normalization
+
+Shared cleaning rules for track and artist names, used both when writing
+tracklists and when building lookup/cache keys for enrichment.
+
+- Rules use plain string methods rather than regexes (no backtracking,
+  and several times faster on short names)
+- Results are memoized in a bounded LRU (artist names repeat constantly)
+- `clean_strings()` cleans a whole column, normalizing each distinct value once
+- Rules are versioned: `clean_string(s, version=1)` always gives the same
+  output, so anything that persists normalized strings (e.g. cache keys)
+  can pin a version and stay stable when the default rules change
+
+Usage:
+    from normalize import clean_string, clean_strings
+
+    clean_string("Beyoncé feat. Jay-Z")   # 'beyonce'
+    clean_strings(df['ARTIST'])           # list of cleaned values
+"""
+
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+
+from unidecode import unidecode
+
+# Current default rule set
+RULES_VERSION = 1
+
+# Distinct strings remembered by the memo
+CACHE_SIZE = 65536
+
+
+def _clean_v1(s: str) -> str:
+    """
+    Version 1 rules.
+
+    - Converts Unicode to ASCII
+    - Converts to lowercase
+    - Removes extra spaces
+    - Removes "ft" and "feat" annotations
+    """
+    # unidecode leaves ASCII untouched, so skip it for the common case
+    if not s.isascii():
+        s = unidecode(s)
+    # Remove any extra spaces (split() and \s agree on what whitespace is)
+    s = ' '.join(s.lower().split())
+    # Remove "ft" and anything that comes after it; after the join the only
+    # whitespace is single spaces, so this is r'\sft.*'
+    index = s.find(" ft")
+    if index != -1:
+        s = s[:index]
+    index = s.find("feat")
+    if index != -1:
+        s = s[:index]
+    return s.strip()
+
+
+RULES: Dict[int, Callable[[str], str]] = {
+    1: _clean_v1,
+}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _clean_cached(s: str, version: int) -> str:
+    return RULES[version](s)
+
+
+def clean_string(s: Optional[str], version: int = RULES_VERSION) -> str:
+    """
+    Clean and normalize a track/artist string.
+
+    Args:
+        s: Raw string (None is treated as empty)
+        version: Rule set to apply (see RULES)
+
+    Returns:
+        Normalized string
+    """
+    if not s:
+        return ''
+    if version not in RULES:
+        raise ValueError(f"Unknown normalization rules version {version}")
+    return _clean_cached(s, version)
+
+
+def clean_strings(values: Iterable[Optional[str]], version: int = RULES_VERSION) -> List[str]:
+    """
+    Clean a whole column of strings.
+
+    Each distinct value is normalized once, so columns full of repeated
+    artist names cost roughly one clean per unique value.
+    """
+    if version not in RULES:
+        raise ValueError(f"Unknown normalization rules version {version}")
+    rule = RULES[version]
+    cleaned: Dict[str, str] = {}
+    result = []
+    for value in values:
+        if not value or not isinstance(value, str):  # Also covers pandas NaN
+            result.append('')
+            continue
+        out = cleaned.get(value)
+        if out is None:
+            out = cleaned[value] = rule(value)
+        result.append(out)
+    return result
+
+
+def cache_info():
+    """Hit/miss statistics for the clean_string memo."""
+    return _clean_cached.cache_info()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+NTS Batch Runner - Many Shows in One Run
+
+Runs discovery, scraping and (optionally) enrichment for a list of shows
+under one global scheduler:
+
+- Every show shares one per-host rate budget, so adding shows adds
+  throughput up to the limit instead of multiplying the request rate
+- Episodes from all shows go through one worker pool. Scraping starts as
+  soon as the first show is discovered, and each show's output is written
+  as soon as its last episode finishes
+- With --enrich, each show is enriched chunk by chunk (as enrich_tracks.py
+  does), sharing one memo of recently enriched tracks and the lookup cache,
+  so a track played on several shows is looked up once
+
+Shows can be given as slugs or NTS URLs, on the command line or in a file
+with one per line (e.g. scripts/episodes.txt).
+
+Usage:
+    python nts_batch.py <show> [<show> ...] [--file FILE] [--output-dir DIR]
+                        [--workers N] [--rate R] [--incremental] [--enrich] [--no-catalogue]
+
+Example:
+    python nts_batch.py rachel-grace-almeida miss-modular --workers 8
+    python nts_batch.py --file scripts/episodes.txt --incremental --format parquet
+"""
+
+import argparse
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import http_client
+import enrich_tracks
+import nts_show_to_csv
+from catalogue import Catalogue
+from enrich_cache import EnrichmentCache, DEFAULT_CACHE_DIR
+from nts_show_to_csv import (
+    DEFAULT_DISCOVERY_WORKERS, DEFAULT_NTS_RATE, DEFAULT_TRACKLIST_SOURCE, TRACKLIST_SOURCES,
+    discover_episodes, extract_tracks_from_episode, merge_tracks, save_tracks, with_pending_episodes,
+)
+from page_cache import PageCache
+from rate_limit import HostRateLimiter
+from show_state import ShowState, DEFAULT_STATE_DIR
+from spotify_index import SpotifyIndex
+from table_output import (FORMATS, DEFAULT_FORMAT, FORMAT_EXTENSIONS, ChunkWriter, RowReader,
+                          require_pyarrow)
+from tracklist_parser import BACKENDS, DEFAULT_BACKEND
+
+DEFAULT_BATCH_WORKERS = 8
+
+# Cross-show catalogue finished shows are written to (set up in main)
+catalogue: Optional[Catalogue] = None
+
+
+def parse_show(value: str) -> Optional[str]:
+    """Turn a show slug or any NTS show/episode URL into the show slug."""
+    value = value.strip()
+    if not value or value.startswith('#'):
+        return None
+    if '://' not in value:
+        return value.strip('/')
+    segments = [segment for segment in urlsplit(value).path.split('/') if segment]
+    if len(segments) >= 2 and segments[0] == 'shows':
+        return segments[1]
+    logging.warning(f"Not an NTS show URL, skipping: {value}")
+    return None
+
+
+def read_shows(names: List[str], show_file: Optional[str]) -> List[str]:
+    """Collect show slugs from arguments and an optional file, without duplicates."""
+    values = list(names)
+    if show_file:
+        with open(show_file, 'r', encoding='utf-8') as f:
+            values.extend(f)
+    shows = (parse_show(value) for value in values)
+    return list(dict.fromkeys(show for show in shows if show))
+
+
+class ShowJob:
+    """Progress and results for one show in the batch."""
+
+    def __init__(self, name: str, output_file: str, state: Optional[ShowState]):
+        self.name = name
+        self.output_file = output_file
+        self.state = state
+        self.incremental = bool(state and state.episodes and os.path.exists(output_file))
+
+        self.episode_urls: List[str] = []
+        self.results: List[Optional[List[Dict[str, str]]]] = []
+        self.remaining = 0
+        self.error: Optional[str] = None
+        self.started = time.monotonic()
+        self.elapsed = 0.0  # Seconds from the start of the batch until written
+        self.tracks = 0
+        self.failed = 0
+
+    def summary(self) -> str:
+        if self.error:
+            return f"❌ {self.name}: {self.error}"
+        if not self.episode_urls and self.incremental:
+            return f"✓ {self.name}: up to date"
+        failed = f", {self.failed} failed" if self.failed else ""
+        return (f"✓ {self.name}: {len(self.episode_urls)} episodes, "
+                f"{self.tracks} tracks{failed} (done at {self.elapsed:.1f}s)")
+
+
+def finish_show(job: ShowJob, fmt: str):
+    """Write a finished show's output and state."""
+    job.elapsed = time.monotonic() - job.started
+    if job.error or not job.episode_urls:
+        return
+
+    all_tracks = []
+    for episode_url, tracks in zip(job.episode_urls, job.results):
+        alias = episode_url.rsplit('/', 1)[-1]
+        if tracks is None:
+            job.failed += 1
+            if job.state:
+                job.state.fail(alias)  # Kept as pending, so the next sync retries it
+            continue
+        all_tracks.extend(tracks)
+        if job.state:
+            job.state.record(alias, tracks)
+    job.tracks = len(all_tracks)
+
+    try:
+        if job.incremental:
+            merge_tracks(all_tracks, job.output_file, fmt)
+        else:
+            save_tracks(all_tracks, job.output_file, fmt)
+        if job.state:
+            job.state.save()
+    except Exception as e:
+        logging.error(f"Error writing {job.output_file}: {e}")
+        job.error = f"couldn't write output ({e})"
+        return
+
+    if catalogue:
+        try:
+            catalogue.record_episodes(job.name, [
+                (episode_url, tracks) for episode_url, tracks in zip(job.episode_urls, job.results)
+                if tracks is not None
+            ])
+        except Exception as e:
+            logging.error(f"Error adding {job.name} to the catalogue: {e}")
+
+
+def run_batch(jobs: List[ShowJob], workers: int, rate: Optional[float],
+              parser: str, source: str, fmt: str):
+    """
+    Discover and scrape every show through one shared worker pool.
+
+    Discovery runs a few shows at a time; each show's episodes are queued
+    on the scrape pool as soon as it's discovered, in show order. Finished
+    shows are written from this thread as they complete.
+    """
+    limiter = HostRateLimiter(rate)
+    finished: 'queue.Queue[ShowJob]' = queue.Queue()
+    lock = threading.Lock()
+    total_episodes = 0
+    done_episodes = 0
+    written = 0
+
+    def write_finished(block: bool):
+        nonlocal written
+        while written < len(jobs):
+            try:
+                job = finished.get(block=block)
+            except queue.Empty:
+                return
+            finish_show(job, fmt)
+            written += 1
+            print(f"  {job.summary()}")
+
+    def discover(job: ShowJob) -> ShowJob:
+        known = job.state.known_aliases() if job.incremental else None
+        job.episode_urls = discover_episodes(job.name, known, limiter=limiter)
+        if job.incremental:
+            job.episode_urls = with_pending_episodes(job.name, job.episode_urls, job.state)
+        if not job.episode_urls and not job.incremental:
+            job.error = "no episodes found"
+        return job
+
+    def scrape(job: ShowJob, index: int):
+        nonlocal done_episodes
+        url = job.episode_urls[index]
+        try:
+            tracks = extract_tracks_from_episode(url, limiter, raise_errors=True,
+                                                 parser=parser, source=source)
+        except Exception:
+            tracks = None
+        with lock:
+            job.results[index] = tracks
+            job.remaining -= 1
+            done_episodes += 1
+            last = job.remaining == 0
+            print(f"  Episodes {done_episodes}/{total_episodes}...", end='\r')
+        if last:
+            finished.put(job)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as scrape_pool, \
+            ThreadPoolExecutor(max_workers=DEFAULT_DISCOVERY_WORKERS) as discovery_pool:
+        # map() hands shows back in order, so episodes queue show by show
+        for job in discovery_pool.map(discover, jobs):
+            if not job.episode_urls:
+                finished.put(job)
+                continue
+            with lock:
+                job.results = [None] * len(job.episode_urls)
+                job.remaining = len(job.episode_urls)
+                total_episodes += len(job.episode_urls)
+            for index in range(len(job.episode_urls)):
+                scrape_pool.submit(scrape, job, index)
+
+            # Write any shows that finished while discovery continued
+            write_finished(block=False)
+
+        write_finished(block=True)
+
+
+def enrich_shows(jobs: List[ShowJob], fmt: str, cache_dir: Optional[str]):
+    """
+    Enrich each show's full output and write <show>_enriched files.
+
+    Shows are read and written chunk by chunk, each with its own columns.
+    One memo of recently enriched tracks is shared by every show, and the
+    lookup cache answers older repeats, so a track played on several shows
+    is looked up once.
+    """
+    shows = [job for job in jobs if not job.error and os.path.exists(job.output_file)]
+    if not shows:
+        return
+
+    if cache_dir:
+        enrich_tracks.enrichment_cache = EnrichmentCache(cache_dir)
+        enrich_tracks.spotify_index = SpotifyIndex(cache_dir)
+    enrich_tracks.catalogue = catalogue
+    success_count = {'spotify': 0, 'lastfm': 0, 'musicbrainz': 0, 'acousticbrainz': 0}
+    memo = enrich_tracks.EnrichmentMemo()
+    total_rows = 0
+    total_enriched = 0
+    try:
+        for job in shows:
+            base = job.output_file.rsplit('.', 1)[0]
+            output_file = f"{base}_enriched{FORMAT_EXTENSIONS[fmt]}"
+            try:
+                with RowReader(job.output_file) as reader:
+                    columns = list(reader.columns or []) + enrich_tracks.get_enrichment_columns()
+                    writer = ChunkWriter(output_file, columns, fmt)
+                    rows = iter(reader)
+                    try:
+                        while True:
+                            chunk = list(islice(rows, enrich_tracks.DEFAULT_CHUNK_SIZE))
+                            if not chunk:
+                                break
+                            enriched, enriched_count = enrich_tracks.enrich_rows(chunk, success_count, memo)
+                            total_enriched += enriched_count
+                            writer.write(enriched)
+                            total_rows += len(chunk)
+                    except BaseException:
+                        writer.close()
+                        raise
+                    writer.finish()
+            except Exception as e:
+                logging.error(f"Error enriching {job.output_file}: {e}")
+                print(f"  ❌ {job.name}: couldn't enrich ({e})")
+                continue
+            print(f"  ✓ {job.name}: {output_file}")
+    finally:
+        if enrich_tracks.enrichment_cache:
+            enrich_tracks.enrichment_cache.close()
+        if enrich_tracks.spotify_index:
+            enrich_tracks.spotify_index.close()
+    print(f"\n  Enriched {total_rows} rows ({total_enriched} enriched, across {len(shows)} shows)")
+
+
+def main():
+    """Main execution function."""
+
+    global catalogue
+
+    parser = argparse.ArgumentParser(
+        description="Scrape (and optionally enrich) many NTS shows under one shared rate budget.",
+        epilog="Example: python nts_batch.py --file scripts/episodes.txt --workers 8"
+    )
+    parser.add_argument('shows', nargs='*', help="Show slugs or NTS show/episode URLs")
+    parser.add_argument('--file', help="File with one show slug or URL per line")
+    parser.add_argument('--output-dir', default='.', help="Where per-show outputs go (default: .)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_BATCH_WORKERS,
+                        help=f"Concurrent episode fetches across all shows (default: {DEFAULT_BATCH_WORKERS})")
+    parser.add_argument('--rate', type=float, default=DEFAULT_NTS_RATE,
+                        help=f"Max requests/sec per host, shared by all shows, 0 for no limit "
+                             f"(default: {DEFAULT_NTS_RATE})")
+    parser.add_argument('--source', choices=TRACKLIST_SOURCES, default=DEFAULT_TRACKLIST_SOURCE,
+                        help=f"Tracklist source (default: {DEFAULT_TRACKLIST_SOURCE})")
+    parser.add_argument('--parser', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help=f"Tracklist parser backend (default: {DEFAULT_BACKEND})")
+    parser.add_argument('--format', choices=FORMATS, default=DEFAULT_FORMAT,
+                        help=f"Output format (default: {DEFAULT_FORMAT})")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only scrape episodes not seen on a previous run")
+    parser.add_argument('--state-dir', default=DEFAULT_STATE_DIR,
+                        help=f"Where --incremental keeps per-show state (default: {DEFAULT_STATE_DIR})")
+    parser.add_argument('--enrich', action='store_true',
+                        help="Also enrich every show's tracks and write <show>_complete_enriched files")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"Page cache, and lookup cache for --enrich (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--no-cache', action='store_true', help="Don't use the page or lookup caches")
+    parser.add_argument('--no-catalogue', action='store_true',
+                        help="Don't add the shows to the cross-show catalogue in the cache directory")
+    args = parser.parse_args()
+
+    try:
+        shows = read_shows(args.shows, args.file)
+        require_pyarrow(args.format)
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    if not shows:
+        parser.error("no shows given (pass slugs or --file)")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = [
+        ShowJob(show,
+                os.path.join(args.output_dir, f"{show}_complete{FORMAT_EXTENSIONS[args.format]}"),
+                ShowState(show, args.state_dir) if args.incremental else None)
+        for show in shows
+    ]
+
+    print(f"\n{'='*60}")
+    print(f"NTS Batch Runner")
+    print(f"{'='*60}")
+    print(f"Shows: {len(jobs)}")
+    print(f"Output: {args.output_dir} ({args.format})")
+    print(f"Workers: {args.workers}, rate: {args.rate or 'unlimited'}/s per host (shared)")
+    print(f"{'='*60}\n")
+
+    start = time.monotonic()
+    print("Scraping shows...")
+    if not args.no_cache:
+        nts_show_to_csv.page_cache = PageCache(args.cache_dir)
+    if not args.no_catalogue:
+        catalogue = Catalogue(args.cache_dir)
+    try:
+        try:
+            run_batch(jobs, args.workers, args.rate or None, args.parser, args.source, args.format)
+        finally:
+            if nts_show_to_csv.page_cache:
+                nts_show_to_csv.page_cache.close()
+        scrape_elapsed = time.monotonic() - start
+
+        if args.enrich:
+            print("\nEnriching tracks...")
+            enrich_shows(jobs, args.format, None if args.no_cache else args.cache_dir)
+    finally:
+        if catalogue:
+            catalogue.close()
+
+    episodes = sum(len(job.episode_urls) for job in jobs)
+    failed_shows = [job for job in jobs if job.error]
+
+    print(f"\n{'='*60}")
+    print(f"Summary")
+    print(f"{'='*60}")
+    print(f"  {'show':<32} {'episodes':>9} {'failed':>7} {'tracks':>8} {'done at':>8}")
+    for job in jobs:
+        status = '!' if job.error else ' '
+        print(f"{status} {job.name:<32} {len(job.episode_urls):>9} {job.failed:>7} "
+              f"{job.tracks:>8} {job.elapsed:>8.1f}")
+    print(f"\nShows: {len(jobs) - len(failed_shows)}/{len(jobs)} succeeded")
+    print(f"Episodes: {episodes} ({sum(job.failed for job in jobs)} failed)")
+    print(f"Tracks: {sum(job.tracks for job in jobs)}")
+    if scrape_elapsed > 0:
+        print(f"Throughput: {episodes / scrape_elapsed:.2f} episodes/sec")
+    if nts_show_to_csv.page_cache:
+        print(f"Page cache: {nts_show_to_csv.page_cache.summary()}")
+    if catalogue:
+        print(f"Catalogue: {catalogue.summary()}")
+    if args.enrich:
+        print(f"\nRate limits (adaptive):")
+        print(enrich_tracks.format_rate_stats())
+    print(f"\nHTTP:")
+    print(http_client.format_stats())
+    print(f"{'='*60}\n")
+
+    if failed_shows:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
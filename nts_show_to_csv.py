@@ -3,25 +3,68 @@
 NTS Show to CSV - Complete Tracklist Extractor
 
 This script takes an NTS Radio show name and produces a comprehensive CSV
-containing all tracks from all episodes of that show.
+containing all tracks from all episodes of that show (or, with --format,
+a typed Parquet/Arrow file; see table_output.py).
+
+Tracklists come from the NTS episode tracklist API by default; episodes
+whose JSON has no tracklist fall back to parsing the HTML page.
+
+With --incremental, only episodes that weren't seen on a previous run are
+scraped (see show_state.py) and their tracks are merged into the existing CSV.
+Episodes that failed to download on an earlier sync are retried.
+
+Downloaded pages are kept in a local page cache (see page_cache.py) and
+revalidated with conditional requests, so unchanged episodes come back as
+304s and skip parsing. --from-cache rebuilds the output from that cache
+without touching the network, e.g. after changing the cleaning rules.
+
+Scraped episodes are also added to the cross-show catalogue (see
+catalogue.py) unless --no-catalogue is given.
+
+Each stage (discover, fetch, parse, clean, write) is timed; the summary
+shows where the time went, and --report/--prometheus write it out with the
+per-host HTTP stats and cache hit ratios (see metrics.py). --profile samples
+every thread's stack through the run for a finer breakdown (see profiler.py).
 
 Usage:
-    python nts_show_to_csv.py <show_name> [output_csv]
+    python nts_show_to_csv.py <show_name> [output_csv] [--workers N] [--rate R]
+                              [--source api|html] [--format csv|parquet|arrow] [--incremental]
+                              [--cache-dir DIR] [--no-cache] [--from-cache] [--no-catalogue]
+                              [--report FILE] [--prometheus FILE] [--profile [PREFIX]] [--profile-rate HZ]
 
 Example:
     python nts_show_to_csv.py rachel-grace-almeida
     python nts_show_to_csv.py miss-modular miss_modular_complete.csv
+    python nts_show_to_csv.py miss-modular --workers 8 --rate 5
+    python nts_show_to_csv.py miss-modular --incremental
+    python nts_show_to_csv.py miss-modular --format parquet
+    python nts_show_to_csv.py miss-modular --from-cache
 """
 
 import requests
-import json
-import csv
-import re
+import argparse
+import itertools
+import os
 import sys
+import time
 import logging
-from bs4 import BeautifulSoup
-from unidecode import unidecode
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import http_client
+import metrics
+import normalize
+import profiler
+from catalogue import Catalogue
+from enrich_cache import DEFAULT_CACHE_DIR
+from normalize import clean_string
+from page_cache import PageCache, PageNotCached
+from rate_limit import HostRateLimiter
+from show_state import ShowState, DEFAULT_STATE_DIR
+from table_output import (FORMATS, DEFAULT_FORMAT, FORMAT_EXTENSIONS, require_pyarrow,
+                          write_rows, prepend_rows)
+from tracklist_parser import parse_tracklist, BACKENDS, DEFAULT_BACKEND
 
 # Set up logging
 logging.basicConfig(
@@ -33,78 +76,182 @@ logging.basicConfig(
     ]
 )
 
-def clean_string(s: str) -> str:
+# Base URL for NTS (override to point at a local stand-in for benchmarking)
+NTS_BASE_URL = os.getenv('NTS_BASE_URL', 'https://www.nts.live').rstrip('/')
+
+# Concurrency defaults for episode scraping
+DEFAULT_WORKERS = 1
+DEFAULT_NTS_RATE = 5.0  # Max requests/sec to a single host
+
+# Episode discovery
+DISCOVERY_PAGE_SIZE = 50  # Pages may come back smaller if the API caps it
+DEFAULT_DISCOVERY_WORKERS = 4
+
+TRACK_COLUMNS = ["TITLE", "ARTIST", "EPISODE_URL"]
+
+# Where tracklists come from: the JSON API (with HTML fallback) or HTML only
+TRACKLIST_SOURCES = ('api', 'html')
+DEFAULT_TRACKLIST_SOURCE = 'api'
+
+API_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
+}
+
+# Local copy of downloaded pages (set up in main)
+page_cache: Optional[PageCache] = None
+
+
+def fetch_page(url: str, headers: Optional[Dict[str, str]] = None):
+    """GET an NTS page, through the page cache when there is one."""
+    with metrics.timer('fetch'):
+        if page_cache:
+            return page_cache.get(url, headers)
+        return http_client.get(url, headers=headers)
+
+
+def _wait_turn(limiter: Optional[HostRateLimiter], url: str):
+    """Take a rate limiter token for `url`, timing the wait."""
+    if limiter:
+        metrics.observe('rate_wait', limiter.acquire(url))
+
+
+def _parse_page(response, kind: str, parse) -> Optional[List[Tuple[str, str]]]:
+    """Run `parse(response)`, reusing the memoized result for an unchanged page."""
+    digest = getattr(response, 'digest', None)
+    if page_cache:
+        found, pairs = page_cache.get_parsed(digest, kind)
+        if found:
+            return pairs
+    with metrics.timer('parse'):
+        pairs = parse(response)
+    if page_cache:
+        page_cache.set_parsed(digest, kind, pairs)
+    return pairs
+
+
+def fetch_episode_page(show_name: str, offset: int, limit: int,
+                       limiter: Optional[HostRateLimiter] = None) -> Dict:
+    """
+    Fetch one page of a show's episode listing from the NTS API.
+
+    Raises requests.RequestException / ValueError on failure.
+    """
+    url = f"{NTS_BASE_URL}/api/v2/shows/{show_name}/episodes?limit={limit}&offset={offset}"
+    _wait_turn(limiter, url)
+    response = fetch_page(url, API_HEADERS)
+    response.raise_for_status()
+    return response.json()
+
+
+def _page_aliases(data: Dict) -> List[str]:
+    return [r.get("episode_alias") for r in data.get("results", []) if r.get("episode_alias")]
+
+
+def _total_count(data: Dict) -> Optional[int]:
+    """Total number of episodes, from the listing's resultset metadata."""
+    count = data.get("metadata", {}).get("resultset", {}).get("count")
+    return count if isinstance(count, int) else None
+
+
+def iter_episode_pages(show_name: str, limit: int, limiter: HostRateLimiter,
+                       offset: int = 0) -> Iterator[List[str]]:
     """
-    Clean and normalize track/artist strings.
+    Yield each page of episode aliases in order, newest first, one request
+    at a time, until an empty page or a fetch error.
 
-    - Converts Unicode to ASCII
-    - Converts to lowercase
-    - Removes extra spaces
-    - Removes "ft" and "feat" annotations
+    If a page comes back shorter than `limit` the API is capping the page
+    size, so later offsets advance by that length instead.
     """
-    s = unidecode(s)
-    s = s.lower()
-    # Remove any extra spaces
-    s = re.sub(r'\s+', ' ', s).strip()
-    # Remove "ft" and anything that comes after it
-    s = re.sub(r'\sft.*', '', s, flags=re.IGNORECASE)
-    index = s.find("feat")
-    if index != -1:
-        s = s[:index]
-    return s.strip()
-
-
-def discover_episodes(show_name: str) -> List[str]:
+    while True:
+        try:
+            page = _page_aliases(fetch_episode_page(show_name, offset, limit, limiter))
+        except (requests.RequestException, ValueError) as e:
+            logging.error(f"Error fetching episodes at offset {offset}: {e}")
+            return
+        logging.info(f"Found {len(page)} episodes (offset: {offset})")
+        if not page:
+            return
+        yield page
+        limit = min(limit, len(page))
+        offset += limit
+
+
+def discover_episodes(show_name: str, known: Optional[Set[str]] = None,
+                      workers: int = DEFAULT_DISCOVERY_WORKERS,
+                      page_size: int = DISCOVERY_PAGE_SIZE,
+                      rate: Optional[float] = DEFAULT_NTS_RATE,
+                      limiter: Optional[HostRateLimiter] = None) -> List[str]:
     """
     Discover all episode URLs for a given NTS show using the NTS API.
 
+    The first page tells us the total episode count, so the remaining
+    pages are fetched concurrently instead of one after another. Falls back
+    to sequential paging if the API doesn't report a count.
+
     Args:
         show_name: The show slug (e.g., 'rachel-grace-almeida')
+        known: Episode aliases already scraped. The API lists episodes
+            newest first, so paging stops at the first known alias (pages
+            are then fetched one at a time, as usually only one is needed).
+        workers: Concurrent page fetches
+        page_size: Episodes requested per page
+        rate: Max requests/sec to the API host (None for no limit)
+        limiter: Shared per-host limiter to use instead of one built from
+            `rate`, e.g. when several shows run against one budget
 
     Returns:
-        List of full episode URLs
+        List of full episode URLs, newest first, without duplicates
     """
     logging.info(f"Discovering episodes for show: {show_name}")
 
-    offset = 0
-    limit = 12
+    limiter = limiter or HostRateLimiter(rate)
     episodes = []
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-    }
-
-    while True:
-        url = f"https://www.nts.live/api/v2/shows/{show_name}/episodes?limit={limit}&offset={offset}"
-
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-
-            data = response.json()
-            results = data.get("results", [])
-
-            if not results:
+    try:
+        first = fetch_episode_page(show_name, 0, page_size, limiter)
+    except (requests.RequestException, ValueError) as e:
+        logging.error(f"Error fetching episodes at offset 0: {e}")
+        return []
+
+    first_aliases = _page_aliases(first)
+    # The API may cap the page size below what we asked for
+    limit = len(first_aliases) if 0 < len(first_aliases) < page_size else page_size
+    total = _total_count(first)
+    logging.info(f"Found {len(first_aliases)} episodes (offset: 0)")
+
+    if known is not None or total is None:
+        pages = itertools.chain(
+            [first_aliases], iter_episode_pages(show_name, limit, limiter, offset=limit)
+        ) if first_aliases else []
+        for page in pages:
+            new = list(itertools.takewhile(lambda alias: not (known and alias in known), page))
+            episodes.extend(new)
+            if len(new) < len(page):
+                logging.info(f"Reached already-scraped episodes after {len(episodes)} new ones")
                 break
+    else:
+        offsets = list(range(limit, total, limit))
+        logging.info(f"{total} episodes listed; fetching {len(offsets)} more pages")
 
-            for result in results:
-                episode_alias = result.get("episode_alias")
-                if episode_alias:
-                    episodes.append(episode_alias)
+        def fetch(offset):
+            try:
+                return _page_aliases(fetch_episode_page(show_name, offset, limit, limiter))
+            except (requests.RequestException, ValueError) as e:
+                logging.error(f"Error fetching episodes at offset {offset}: {e}")
+                return []
 
-            logging.info(f"Found {len(results)} episodes (offset: {offset})")
-            offset += limit
+        episodes.extend(first_aliases)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            # map() yields in offset order, so newest-first order is kept
+            for page in executor.map(fetch, offsets):
+                episodes.extend(page)
 
-        except requests.RequestException as e:
-            logging.error(f"Error fetching episodes at offset {offset}: {e}")
-            break
-        except json.JSONDecodeError as e:
-            logging.error(f"Error parsing JSON response: {e}")
-            break
+    # Pages can overlap if episodes are published mid-discovery
+    episodes = list(dict.fromkeys(episodes))
 
     # Convert episode aliases to full URLs
     episode_urls = [
-        f"https://www.nts.live/shows/{show_name}/episodes/{alias}"
+        f"{NTS_BASE_URL}/shows/{show_name}/episodes/{alias}"
         for alias in episodes
     ]
 
@@ -112,12 +259,104 @@ def discover_episodes(show_name: str) -> List[str]:
     return episode_urls
 
 
-def extract_tracks_from_episode(episode_url: str) -> List[Dict[str, str]]:
+def with_pending_episodes(show_name: str, episode_urls: List[str], state: ShowState) -> List[str]:
+    """
+    Add the episodes an earlier sync failed to download.
+
+    Incremental discovery stops at the first known episode, so a failed
+    episode older than that is never listed again; it's retried from the
+    state's pending list instead, after the newly discovered ones.
+    """
+    if not state.pending:
+        return episode_urls
+    logging.info(f"Retrying {len(state.pending)} episodes that failed on an earlier sync")
+    pending = [f"{NTS_BASE_URL}/shows/{show_name}/episodes/{alias}" for alias in state.pending]
+    return list(dict.fromkeys(episode_urls + pending))
+
+
+def tracklist_api_url(episode_url: str) -> Optional[str]:
+    """
+    Map an episode page URL to its JSON tracklist endpoint.
+
+    Returns None if the URL isn't shaped like /shows/<show>/episodes/<alias>.
+    """
+    parts = urlsplit(episode_url)
+    segments = [segment for segment in parts.path.split('/') if segment]
+    if len(segments) != 4 or segments[0] != 'shows' or segments[2] != 'episodes':
+        return None
+    show, alias = segments[1], segments[3]
+    return f"{parts.scheme}://{parts.netloc}/api/v2/shows/{show}/episodes/{alias}/tracklist"
+
+
+def fetch_api_tracklist(episode_url: str,
+                        limiter: Optional[HostRateLimiter] = None) -> Optional[List[Tuple[str, str]]]:
+    """
+    Fetch an episode's tracklist from the NTS JSON API.
+
+    Returns raw (artist, title) pairs, or None if the API has no tracklist
+    for the episode (unknown URL shape, 404, or an empty/missing list).
+    Other HTTP and network errors are raised.
+    """
+    api_url = tracklist_api_url(episode_url)
+    if not api_url:
+        return None
+
+    _wait_turn(limiter, api_url)
+    try:
+        response = fetch_page(api_url, API_HEADERS)
+    except PageNotCached:
+        return None  # Offline and never fetched: try the HTML page
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+    def parse(response):
+        try:
+            results = response.json().get('results')
+        except ValueError:
+            logging.warning(f"Tracklist API returned invalid JSON for {episode_url}")
+            return None
+        if not results:
+            return None
+        return [
+            ((item.get('artist') or '').strip(), (item.get('title') or '').strip())
+            for item in results
+        ]
+
+    return _parse_page(response, 'api', parse)
+
+
+def fetch_html_tracklist(episode_url: str, limiter: Optional[HostRateLimiter] = None,
+                         parser: str = DEFAULT_BACKEND) -> Optional[List[Tuple[str, str]]]:
     """
-    Extract track listings from a single NTS episode page.
+    Download an episode page and parse its tracklist.
+
+    Returns raw (artist, title) pairs, or None if the page has no episode
+    container. HTTP and network errors are raised.
+    """
+    _wait_turn(limiter, episode_url)
+    response = fetch_page(episode_url)
+    response.raise_for_status()
+    return _parse_page(response, 'html', lambda page: parse_tracklist(page.content, parser))
+
+
+def extract_tracks_from_episode(episode_url: str,
+                                limiter: Optional[HostRateLimiter] = None,
+                                raise_errors: bool = False,
+                                parser: str = DEFAULT_BACKEND,
+                                source: str = DEFAULT_TRACKLIST_SOURCE) -> List[Dict[str, str]]:
+    """
+    Extract track listings from a single NTS episode.
 
     Args:
         episode_url: Full URL to the episode page
+        limiter: Optional per-host rate limiter shared between workers
+        raise_errors: Re-raise fetch errors instead of returning no tracks,
+            so callers can tell a failed fetch from an empty tracklist
+        parser: Tracklist parser backend (see tracklist_parser.py)
+        source: 'api' to use the JSON tracklist endpoint, falling back to
+            the HTML page when it has no tracklist; 'html' to always
+            parse the page
 
     Returns:
         List of dicts with 'title' and 'artist' keys
@@ -125,26 +364,24 @@ def extract_tracks_from_episode(episode_url: str) -> List[Dict[str, str]]:
     tracks = []
 
     try:
-        response = requests.get(episode_url)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        episode_container = soup.find(id="episode-container")
-
-        if not episode_container:
+        pairs = None
+        if source == 'api':
+            pairs = fetch_api_tracklist(episode_url, limiter)
+            if pairs is None:
+                logging.info(f"No API tracklist for {episode_url}, falling back to HTML")
+                metrics.count('html_fallbacks')
+        if pairs is None:
+            pairs = fetch_html_tracklist(episode_url, limiter, parser)
+
+        if pairs is None:
             logging.warning(f"No episode container found for {episode_url}")
             return tracks
 
-        track_elements = episode_container.find_all(class_="track")
-
-        for track_element in track_elements:
-            try:
-                artist_elem = track_element.find(class_="track__artist")
-                title_elem = track_element.find(class_="track__title")
-
-                if artist_elem and title_elem:
-                    artist = clean_string(artist_elem.text.strip())
-                    title = clean_string(title_elem.text.strip())
+        with metrics.timer('clean'):
+            for raw_artist, raw_title in pairs:
+                try:
+                    artist = clean_string(raw_artist)
+                    title = clean_string(raw_title)
 
                     if artist and title:  # Only add if both exist
                         tracks.append({
@@ -152,68 +389,248 @@ def extract_tracks_from_episode(episode_url: str) -> List[Dict[str, str]]:
                             'artist': artist,
                             'episode_url': episode_url
                         })
-            except Exception as e:
-                logging.warning(f"Error parsing track element: {e}")
-                continue
+                except Exception as e:
+                    logging.warning(f"Error parsing track element: {e}")
+                    continue
 
         logging.info(f"Extracted {len(tracks)} tracks from {episode_url}")
 
     except requests.RequestException as e:
         logging.error(f"Error fetching episode {episode_url}: {e}")
+        if raise_errors:
+            raise
     except Exception as e:
         logging.error(f"Unexpected error processing {episode_url}: {e}")
+        if raise_errors:
+            raise
 
     return tracks
 
 
-def save_to_csv(tracks: List[Dict[str, str]], output_file: str):
+def scrape_episodes(episode_urls: List[str], workers: int = DEFAULT_WORKERS,
+                    rate: Optional[float] = DEFAULT_NTS_RATE,
+                    show_progress: bool = True,
+                    parser: str = DEFAULT_BACKEND,
+                    source: str = DEFAULT_TRACKLIST_SOURCE) -> List[Optional[List[Dict[str, str]]]]:
+    """
+    Extract tracks from many episodes using a bounded worker pool.
+
+    Output order always matches the order of `episode_urls`, whatever the
+    worker count, so CSVs are reproducible between runs.
+
+    Args:
+        episode_urls: Episode page URLs to scrape
+        workers: Number of concurrent fetches
+        rate: Max requests/sec per host (None for no limit)
+        show_progress: Print a progress line while scraping
+        parser: Tracklist parser backend (see tracklist_parser.py)
+        source: Tracklist source, 'api' or 'html'
+
+    Returns:
+        One entry per episode, in order: its list of track dicts, or None
+        if the episode couldn't be fetched
+    """
+    limiter = HostRateLimiter(rate)
+
+    def scrape(url):
+        try:
+            return extract_tracks_from_episode(url, limiter, raise_errors=True,
+                                               parser=parser, source=source)
+        except Exception:
+            return None
+
+    per_episode = []
+    total = len(episode_urls)
+    start = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for i, tracks in enumerate(executor.map(scrape, episode_urls), 1):
+            per_episode.append(tracks)
+            if show_progress:
+                print(f"  Processing episode {i}/{total}...", end='\r')
+
+    elapsed = time.monotonic() - start
+    rate_achieved = total / elapsed if elapsed > 0 else 0.0
+    logging.info(
+        f"Scraped {total} episodes in {elapsed:.1f}s "
+        f"({rate_achieved:.2f} episodes/sec, {workers} workers)"
+    )
+    return per_episode
+
+
+def extract_all_tracks(episode_urls: List[str], workers: int = DEFAULT_WORKERS,
+                       rate: Optional[float] = DEFAULT_NTS_RATE,
+                       show_progress: bool = True,
+                       parser: str = DEFAULT_BACKEND,
+                       source: str = DEFAULT_TRACKLIST_SOURCE) -> List[Dict[str, str]]:
+    """
+    Extract tracks from many episodes and flatten them into one list.
+
+    See scrape_episodes() for the arguments.
+
+    Returns:
+        Flat list of track dicts, in episode order
     """
-    Save tracks to a CSV file.
+    all_tracks = []
+    for tracks in scrape_episodes(episode_urls, workers, rate, show_progress, parser, source):
+        all_tracks.extend(tracks or [])
+    return all_tracks
+
+
+def _track_rows(tracks: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    return [
+        {'TITLE': track['title'], 'ARTIST': track['artist'], 'EPISODE_URL': track['episode_url']}
+        for track in tracks
+    ]
+
+
+def save_tracks(tracks: List[Dict[str, str]], output_file: str, fmt: str = DEFAULT_FORMAT):
+    """
+    Save tracks to a CSV, Parquet or Arrow file.
 
     Args:
         tracks: List of track dicts
-        output_file: Path to output CSV file
+        output_file: Path to output file
+        fmt: Output format (see table_output.py)
     """
     logging.info(f"Saving {len(tracks)} tracks to {output_file}")
+    write_rows(output_file, _track_rows(tracks), TRACK_COLUMNS, fmt)
+    logging.info(f"Successfully saved to {output_file}")
 
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["TITLE", "ARTIST", "EPISODE_URL"])
 
-        for track in tracks:
-            writer.writerow([
-                track['title'],
-                track['artist'],
-                track['episode_url']
-            ])
+def merge_tracks(tracks: List[Dict[str, str]], output_file: str, fmt: str = DEFAULT_FORMAT):
+    """
+    Merge newly scraped tracks into an existing output file.
 
-    logging.info(f"Successfully saved to {output_file}")
+    New tracks go first, keeping the file newest-first like a full run.
+    Existing rows are carried across rather than re-scraped, and the file
+    is replaced atomically.
+
+    Args:
+        tracks: List of new track dicts
+        output_file: Path to the existing output file
+        fmt: Output format (see table_output.py)
+    """
+    logging.info(f"Merging {len(tracks)} new tracks into {output_file}")
+    prepend_rows(output_file, _track_rows(tracks), TRACK_COLUMNS, fmt)
+    logging.info(f"Successfully merged into {output_file}")
+
+
+def write_run_report(args, episodes: int, tracks: int):
+    """Write the --report/--prometheus files, if asked for."""
+    if not (args.report or args.prometheus):
+        return
+    memo = normalize.cache_info()
+    caches = {'clean_string': metrics.cache_stats(memo.hits, memo.misses)}
+    if page_cache:
+        caches['page'] = page_cache.stats()
+    report = metrics.report('nts_show_to_csv', show=args.show_name, episodes=episodes, tracks=tracks,
+                            http=http_client.stats(), caches=caches)
+    try:
+        metrics.write_report(report, args.report, args.prometheus)
+    except OSError as e:
+        logging.error(f"Couldn't write the run report: {e}")
+        return
+    for path in (args.report, args.prometheus):
+        if path:
+            print(f"Run report: {path}")
 
 
 def main():
     """Main execution function."""
 
+    global page_cache
+
     # Parse command line arguments
-    if len(sys.argv) < 2:
-        print("Usage: python nts_show_to_csv.py <show_name> [output_csv]")
-        print("\nExample:")
-        print("  python nts_show_to_csv.py rachel-grace-almeida")
-        print("  python nts_show_to_csv.py miss-modular miss_modular_complete.csv")
+    parser = argparse.ArgumentParser(
+        description="Extract every track from every episode of an NTS show.",
+        epilog="Example: python nts_show_to_csv.py rachel-grace-almeida --workers 8"
+    )
+    parser.add_argument('show_name', help="Show slug, e.g. 'rachel-grace-almeida'")
+    parser.add_argument('output_csv', nargs='?',
+                        help="Output file (default: <show_name>_complete.csv, or .parquet/.arrow)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent episode fetches (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--rate', type=float, default=DEFAULT_NTS_RATE,
+                        help=f"Max requests/sec per host, 0 for no limit (default: {DEFAULT_NTS_RATE})")
+    parser.add_argument('--source', choices=TRACKLIST_SOURCES, default=DEFAULT_TRACKLIST_SOURCE,
+                        help="Read tracklists from the JSON API (falling back to HTML) "
+                             f"or always from HTML (default: {DEFAULT_TRACKLIST_SOURCE})")
+    parser.add_argument('--parser', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help=f"Tracklist parser backend (default: {DEFAULT_BACKEND})")
+    parser.add_argument('--format', choices=FORMATS, default=DEFAULT_FORMAT,
+                        help=f"Output format; parquet and arrow need pyarrow (default: {DEFAULT_FORMAT})")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only scrape episodes not seen on a previous run and merge them into the output")
+    parser.add_argument('--state-dir', default=DEFAULT_STATE_DIR,
+                        help=f"Where --incremental keeps per-show state (default: {DEFAULT_STATE_DIR})")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"Directory for the page cache (default: {DEFAULT_CACHE_DIR})")
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument('--no-cache', action='store_true', help="Download every page in full")
+    cache_mode.add_argument('--from-cache', action='store_true',
+                            help="Work offline from the page cache, e.g. to apply new cleaning rules")
+    parser.add_argument('--no-catalogue', action='store_true',
+                        help="Don't add the episodes to the cross-show catalogue in the cache directory")
+    parser.add_argument('--report', metavar='FILE',
+                        help="Write a JSON run report: stage timings, per-host HTTP stats, cache hit ratios")
+    parser.add_argument('--prometheus', metavar='FILE',
+                        help="Write the same metrics in Prometheus text format")
+    parser.add_argument('--profile', nargs='?', const='nts_show_to_csv-profile', metavar='PREFIX',
+                        help="Sample every thread's stack and write PREFIX.wall.folded, PREFIX.cpu.folded "
+                             "(flamegraph input) and PREFIX.txt (default prefix: nts_show_to_csv-profile)")
+    parser.add_argument('--profile-rate', type=float, default=profiler.DEFAULT_RATE, metavar='HZ',
+                        help=f"Profiler samples per second (default: {profiler.DEFAULT_RATE:g})")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiler.start(args.profile, args.profile_rate)
+
+    show_name = args.show_name
+    output_file = args.output_csv or f"{show_name}_complete{FORMAT_EXTENSIONS[args.format]}"
+    try:
+        require_pyarrow(args.format)
+    except RuntimeError as e:
+        print(f"❌ Error: {e}")
         sys.exit(1)
 
-    show_name = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else f"{show_name}_complete.csv"
+    if not args.no_cache:
+        page_cache = PageCache(args.cache_dir, offline=args.from_cache)
+    # Nothing to rate limit when every page comes from disk
+    rate = None if args.from_cache else args.rate
+
+    # Incremental sync needs both a previous state and the output it produced
+    state = ShowState(show_name, args.state_dir) if args.incremental else None
+    incremental = bool(state and state.episodes and os.path.exists(output_file))
 
     print(f"\n{'='*60}")
     print(f"NTS Show to CSV - Complete Tracklist Extractor")
     print(f"{'='*60}")
     print(f"Show: {show_name}")
     print(f"Output: {output_file}")
+    print(f"Workers: {args.workers}")
+    print(f"Tracklists: {args.source}")
+    print(f"Pages: {'disabled' if args.no_cache else args.cache_dir}{' (offline)' if args.from_cache else ''}")
+    if args.incremental:
+        mode = (f"incremental ({len(state.episodes)} episodes known, {len(state.pending)} to retry)"
+                if incremental else "full (no previous state)")
+        print(f"Mode: {mode}")
     print(f"{'='*60}\n")
 
     # Step 1: Discover all episodes
     print("Step 1/3: Discovering episodes...")
-    episode_urls = discover_episodes(show_name)
+    with metrics.timer('discover'):
+        episode_urls = discover_episodes(
+            show_name, state.known_aliases() if incremental else None,
+            workers=max(args.workers, DEFAULT_DISCOVERY_WORKERS), rate=rate
+        )
+    if incremental:
+        episode_urls = with_pending_episodes(show_name, episode_urls, state)
+
+    if not episode_urls and incremental:
+        print(f"✓ Up to date, no new episodes for '{show_name}'\n")
+        write_run_report(args, 0, 0)
+        return
 
     if not episode_urls:
         print(f"❌ No episodes found for show '{show_name}'")
@@ -221,31 +638,64 @@ def main():
         print("  - Check that the show name is correct (use the URL slug)")
         print("  - Example: for 'https://www.nts.live/shows/rachel-grace-almeida'")
         print("    use 'rachel-grace-almeida'")
+        if args.from_cache:
+            print("  - With --from-cache, the show must have been scraped before with the page cache on")
         sys.exit(1)
 
     print(f"✓ Found {len(episode_urls)} episodes\n")
 
     # Step 2: Extract tracks from all episodes
     print("Step 2/3: Extracting tracks from episodes...")
-    all_tracks = []
+    scrape_start = time.monotonic()
+    with metrics.timer('scrape'):
+        per_episode = scrape_episodes(episode_urls, workers=args.workers, rate=rate,
+                                      parser=args.parser, source=args.source)
+    scrape_elapsed = time.monotonic() - scrape_start
+    if page_cache:
+        page_cache.close()
 
-    for i, episode_url in enumerate(episode_urls, 1):
-        print(f"  Processing episode {i}/{len(episode_urls)}...", end='\r')
-        tracks = extract_tracks_from_episode(episode_url)
+    all_tracks = []
+    for episode_url, tracks in zip(episode_urls, per_episode):
+        alias = episode_url.rsplit('/', 1)[-1]
+        if tracks is None:
+            metrics.count('episodes_failed')
+            if state:
+                state.fail(alias)  # Kept as pending, so the next sync retries it
+            continue
         all_tracks.extend(tracks)
+        if state:
+            state.record(alias, tracks)
 
     print(f"\n✓ Extracted {len(all_tracks)} total tracks\n")
 
-    if not all_tracks:
+    if not all_tracks and not incremental:
         print("⚠️  No tracks found in any episodes")
         print("\nPossible reasons:")
         print("  - Episodes may not have tracklists")
         print("  - NTS may have changed their page structure")
         sys.exit(1)
 
-    # Step 3: Save to CSV
-    print("Step 3/3: Saving to CSV...")
-    save_to_csv(all_tracks, output_file)
+    # Step 3: Save the output
+    print(f"Step 3/3: Saving to {args.format.upper()}...")
+    with metrics.timer('write'):
+        if incremental:
+            merge_tracks(all_tracks, output_file, args.format)
+        else:
+            save_tracks(all_tracks, output_file, args.format)
+        if state:
+            state.save()
+
+    catalogue = None
+    if not args.no_catalogue:
+        catalogue = Catalogue(args.cache_dir)
+        try:
+            with metrics.timer('catalogue'):
+                catalogue.record_episodes(show_name, [
+                    (episode_url, tracks) for episode_url, tracks in zip(episode_urls, per_episode)
+                    if tracks is not None
+                ])
+        finally:
+            catalogue.close()
 
     print(f"\n{'='*60}")
     print(f"✓ Success!")
@@ -262,7 +712,18 @@ def main():
     print(f"Stats:")
     print(f"  Episodes with tracks: {episodes_with_tracks}/{len(episode_urls)}")
     print(f"  Average tracks per episode: {avg_tracks:.1f}")
+    if scrape_elapsed > 0:
+        print(f"  Throughput: {len(episode_urls) / scrape_elapsed:.2f} episodes/sec")
+    if page_cache:
+        print(f"\nPage cache: {page_cache.summary()}")
+    if catalogue:
+        print(f"Catalogue: {catalogue.summary()}")
+    print(f"\nStages:")
+    print(metrics.format_stages())
+    print(f"\nHTTP:")
+    print(http_client.format_stats())
     print()
+    write_run_report(args, len(episode_urls), len(all_tracks))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+NTS Stream - Discover, Scrape and Enrich in One Pipeline
+
+Runs a show's discovery, scraping and enrichment as one streaming pipeline
+instead of three steps that wait for each other:
+
+    episode pages -> [episodes] -> scrapers -> [tracks] -> enrichment stages -> writer
+
+Episode URLs go to the scrapers as each page is discovered. Tracks go to
+the enrichment stages as each episode is scraped, and enriched rows are
+written as soon as every source is done with them. The queues between the
+stages are bounded, so a slow stage pushes back on the ones before it
+instead of letting work pile up in memory. The first enriched rows land
+within seconds, and the whole run takes about as long as its slowest stage.
+
+Rows are written in the same order as `nts_show_to_csv.py` followed by
+`enrich_tracks.py` would produce. Each distinct track is enriched once per
+run, plus the usual lookup cache across runs.
+
+Usage:
+    python nts_stream.py <show_name> [output] [--workers N] [--rate R]
+                         [--format csv|parquet|arrow] [--queue-size N]
+
+Example:
+    python nts_stream.py rachel-grace-almeida
+    python nts_stream.py miss-modular miss_modular.parquet --workers 8
+"""
+
+import argparse
+import queue
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import http_client
+import enrich_tracks
+import nts_show_to_csv
+from enrich_cache import EnrichmentCache, DEFAULT_CACHE_DIR, track_key
+from enrich_pipeline import Pipeline
+from nts_show_to_csv import (
+    DISCOVERY_PAGE_SIZE, DEFAULT_NTS_RATE, DEFAULT_TRACKLIST_SOURCE,
+    TRACK_COLUMNS, TRACKLIST_SOURCES, extract_tracks_from_episode, iter_episode_pages,
+)
+from rate_limit import HostRateLimiter
+from spotify_index import SpotifyIndex
+from table_output import FORMATS, DEFAULT_FORMAT, FORMAT_EXTENSIONS, ChunkWriter, require_pyarrow
+from tracklist_parser import BACKENDS, DEFAULT_BACKEND
+
+DEFAULT_STREAM_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 64  # Items buffered between any two stages
+
+# Ready rows are written in batches of up to this many, or at least this often
+WRITE_BATCH_ROWS = 200
+WRITE_INTERVAL = 1.0
+
+# Queue sentinel telling a consumer its producer is finished
+_DONE = object()
+
+
+class StreamRun:
+    """One show's streaming discover -> scrape -> enrich -> write run."""
+
+    def __init__(self, show_name: str, output_file: str, fmt: str = DEFAULT_FORMAT,
+                 workers: int = DEFAULT_STREAM_WORKERS, rate: Optional[float] = DEFAULT_NTS_RATE,
+                 parser: str = DEFAULT_BACKEND, source: str = DEFAULT_TRACKLIST_SOURCE,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, show_progress: bool = True):
+        self.show_name = show_name
+        self.output_file = output_file
+        self.fmt = fmt
+        self.workers = max(1, workers)
+        self.parser = parser
+        self.source = source
+        self.show_progress = show_progress
+
+        self.limiter = HostRateLimiter(rate)
+        self.episodes: 'queue.Queue' = queue.Queue(maxsize=queue_size)
+        self.scraped: 'queue.Queue' = queue.Queue(maxsize=queue_size)
+        self.pipeline = Pipeline(enrich_tracks.build_stages(queue_size), on_complete=self._on_enriched)
+
+        # Shared between the feeder, enrichment workers and the writer
+        self._cond = threading.Condition()
+        # Recent tracks' enrichments; older repeats go back through the pipeline,
+        # where the lookup cache answers them, so memory stays flat
+        self._enriched = enrich_tracks.EnrichmentMemo()
+        self._waiting: Dict[str, List[Tuple[int, Dict]]] = {}  # track_key -> rows awaiting it
+        self._ready: Dict[int, Dict] = {}  # row number -> enriched row
+        self._rows_total = 0
+        self._tracks_submitted = 0
+        self._feeding_done = False
+
+        self.start = 0.0
+        self.episodes_found = 0
+        self.episodes_scraped = 0
+        self.episodes_failed = 0
+        self.rows_written = 0
+        self.first_row_at: Optional[float] = None
+        self.stage_done_at: Dict[str, float] = {}
+        self.success_count = {'spotify': 0, 'lastfm': 0, 'musicbrainz': 0, 'acousticbrainz': 0}
+
+    def _elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    # --- Producers -----------------------------------------------------------
+
+    def _discover(self):
+        """Push episode URLs to the scrapers page by page."""
+        seen = set()
+        try:
+            for page in iter_episode_pages(self.show_name, DISCOVERY_PAGE_SIZE, self.limiter):
+                for alias in page:
+                    if alias in seen:  # Pages can overlap if episodes are published mid-run
+                        continue
+                    seen.add(alias)
+                    url = f"{nts_show_to_csv.NTS_BASE_URL}/shows/{self.show_name}/episodes/{alias}"
+                    self.episodes.put((self.episodes_found, url))
+                    self.episodes_found += 1
+        finally:
+            self.stage_done_at['discovery'] = self._elapsed()
+            for _ in range(self.workers):
+                self.episodes.put(_DONE)
+
+    def _scrape(self):
+        """Scrape episodes until discovery is done."""
+        while True:
+            item = self.episodes.get()
+            if item is _DONE:
+                self.scraped.put(_DONE)
+                return
+            index, url = item
+            try:
+                tracks = extract_tracks_from_episode(url, self.limiter, raise_errors=True,
+                                                     parser=self.parser, source=self.source)
+            except Exception:
+                tracks = None
+            self.scraped.put((index, tracks))
+
+    def _feed(self):
+        """
+        Put scraped tracks back in episode order, number the rows, and send
+        each new track to the enrichment pipeline.
+        """
+        pending: Dict[int, Optional[List[Dict[str, str]]]] = {}
+        next_episode = 0
+        scrapers_left = self.workers
+
+        try:
+            while scrapers_left:
+                item = self.scraped.get()
+                if item is _DONE:
+                    scrapers_left -= 1
+                    continue
+                index, tracks = item
+                pending[index] = tracks
+
+                while next_episode in pending:
+                    tracks = pending.pop(next_episode)
+                    next_episode += 1
+                    self.episodes_scraped += 1
+                    if tracks is None:
+                        self.episodes_failed += 1
+                        continue
+                    for track in tracks:
+                        self._add_row(track)
+
+            self.stage_done_at['scraping'] = self._elapsed()
+            self.pipeline.finish()
+            self.stage_done_at['enrichment'] = self._elapsed()
+        finally:
+            with self._cond:
+                self._feeding_done = True
+                self._cond.notify_all()
+
+    def _add_row(self, track: Dict[str, str]):
+        row = {'TITLE': track['title'], 'ARTIST': track['artist'], 'EPISODE_URL': track['episode_url']}
+        key = track_key(track['artist'], track['title'])
+
+        with self._cond:
+            row_number = self._rows_total
+            self._rows_total += 1
+            enrichment = self._enriched.get(key)
+            if enrichment is not None:
+                self._ready[row_number] = {**row, **enrichment}
+                self._cond.notify_all()
+                return
+            new = key not in self._waiting
+            if new:
+                self._tracks_submitted += 1
+            self._waiting.setdefault(key, []).append((row_number, row))
+
+        if new:
+            # Blocks while the enrichment stages are full (backpressure)
+            self.pipeline.submit(key, (row['TITLE'], row['ARTIST']))
+
+    def _on_enriched(self, key: str, result: Dict):
+        """Pipeline callback: every source is done with `key`."""
+        with self._cond:
+            self._enriched.put(key, result)
+            for row_number, row in self._waiting.pop(key, []):
+                self._ready[row_number] = {**row, **result}
+            self._cond.notify_all()
+
+    # --- Writer ----------------------------------------------------------------
+
+    def _take_ready_rows(self) -> Optional[List[Dict]]:
+        """
+        Wait for the next rows in order. Returns an empty list on timeout
+        (so progress can be shown) and None once everything is written.
+        """
+        with self._cond:
+            next_row = self.rows_written
+            if next_row not in self._ready:
+                if self._feeding_done and next_row >= self._rows_total:
+                    return None
+                self._cond.wait(timeout=WRITE_INTERVAL)
+
+            rows = []
+            while next_row + len(rows) in self._ready and len(rows) < WRITE_BATCH_ROWS:
+                rows.append(self._ready.pop(next_row + len(rows)))
+            return rows
+
+    def _count_matches(self, row: Dict):
+        for source, prefix in (('spotify', 'spotify_'), ('lastfm', 'lastfm_'),
+                               ('musicbrainz', 'musicbrainz_'), ('acousticbrainz', 'ab_')):
+            if any(k.startswith(prefix) for k in row):
+                self.success_count[source] += 1
+
+    def _print_progress(self):
+        with self._cond:
+            waiting = self._rows_total - self.rows_written
+        print(f"  {self._elapsed():6.1f}s  episodes {self.episodes_scraped}/{self.episodes_found}  "
+              f"rows written {self.rows_written} ({waiting} in flight)", end='\r')
+
+    def run(self):
+        """Run every stage concurrently and write rows until all are done."""
+        self.start = time.monotonic()
+        writer = ChunkWriter(self.output_file, TRACK_COLUMNS + enrich_tracks.get_enrichment_columns(),
+                             self.fmt)
+
+        self.pipeline.start()
+        threads = [threading.Thread(target=self._discover, name='discover', daemon=True),
+                   threading.Thread(target=self._feed, name='feed', daemon=True)]
+        threads += [threading.Thread(target=self._scrape, name=f"scrape-{i}", daemon=True)
+                    for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                rows = self._take_ready_rows()
+                if rows is None:
+                    break
+                if rows:
+                    writer.write(rows)
+                    for row in rows:
+                        self._count_matches(row)
+                    if self.first_row_at is None:
+                        self.first_row_at = self._elapsed()
+                    self.rows_written += len(rows)
+                if self.show_progress:
+                    self._print_progress()
+            writer.finish()
+        except BaseException:
+            writer.close()
+            raise
+
+        self.stage_done_at['writing'] = self._elapsed()
+        for thread in threads:
+            thread.join()
+
+    @property
+    def unique_tracks(self) -> int:
+        return self._tracks_submitted
+
+
+def main():
+    """Main execution function."""
+
+    parser = argparse.ArgumentParser(
+        description="Discover, scrape and enrich an NTS show as one streaming pipeline.",
+        epilog="Example: python nts_stream.py rachel-grace-almeida --workers 8"
+    )
+    parser.add_argument('show_name', help="Show slug, e.g. 'rachel-grace-almeida'")
+    parser.add_argument('output', nargs='?', help="Output file (default: <show_name>_enriched.csv)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_STREAM_WORKERS,
+                        help=f"Concurrent episode fetches (default: {DEFAULT_STREAM_WORKERS})")
+    parser.add_argument('--rate', type=float, default=DEFAULT_NTS_RATE,
+                        help=f"Max requests/sec per host, 0 for no limit (default: {DEFAULT_NTS_RATE})")
+    parser.add_argument('--source', choices=TRACKLIST_SOURCES, default=DEFAULT_TRACKLIST_SOURCE,
+                        help=f"Tracklist source (default: {DEFAULT_TRACKLIST_SOURCE})")
+    parser.add_argument('--parser', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help=f"Tracklist parser backend (default: {DEFAULT_BACKEND})")
+    parser.add_argument('--format', choices=FORMATS, default=DEFAULT_FORMAT,
+                        help=f"Output format (default: {DEFAULT_FORMAT})")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"Items buffered between stages (default: {DEFAULT_QUEUE_SIZE})")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"Directory for the lookup cache (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--no-cache', action='store_true', help="Don't read or write the lookup cache")
+    args = parser.parse_args()
+
+    output_file = args.output or f"{args.show_name}_enriched{FORMAT_EXTENSIONS[args.format]}"
+    try:
+        require_pyarrow(args.format)
+    except RuntimeError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    print(f"\n{'='*60}")
+    print(f"NTS Stream - Discover, Scrape and Enrich")
+    print(f"{'='*60}")
+    print(f"Show: {args.show_name}")
+    print(f"Output: {output_file} ({args.format})")
+    print(f"Workers: {args.workers}, queue size: {args.queue_size}")
+    print(f"Cache: {'disabled' if args.no_cache else args.cache_dir}")
+    print(f"{'='*60}\n")
+
+    if not args.no_cache:
+        enrich_tracks.enrichment_cache = EnrichmentCache(args.cache_dir)
+        enrich_tracks.spotify_index = SpotifyIndex(args.cache_dir)
+
+    run = StreamRun(args.show_name, output_file, args.format, args.workers, args.rate or None,
+                    args.parser, args.source, args.queue_size)
+    try:
+        run.run()
+    except KeyboardInterrupt:
+        print(f"\n\n⚠️  Interrupted after {run.rows_written} rows (kept in {output_file}).")
+        sys.exit(130)
+    finally:
+        if enrich_tracks.enrichment_cache:
+            enrich_tracks.enrichment_cache.close()
+        if enrich_tracks.spotify_index:
+            enrich_tracks.spotify_index.close()
+
+    if not run.episodes_found:
+        print(f"\n❌ No episodes found for show '{args.show_name}'")
+        sys.exit(1)
+
+    total = run.rows_written
+    print(f"\n\n{'='*60}")
+    print(f"✓ Success!")
+    print(f"{'='*60}")
+    print(f"Episodes: {run.episodes_scraped} ({run.episodes_failed} failed)")
+    print(f"Tracks: {total} ({run.unique_tracks} unique)")
+    print(f"Output file: {output_file}")
+    if run.first_row_at is not None:
+        print(f"\nFirst enriched row after {run.first_row_at:.1f}s")
+    print(f"Stages finished at:")
+    for stage in ('discovery', 'scraping', 'enrichment', 'writing'):
+        if stage in run.stage_done_at:
+            print(f"  {stage:<12} {run.stage_done_at[stage]:7.1f}s")
+    if total:
+        print(f"\nMatch rates:")
+        for source, count in run.success_count.items():
+            print(f"  {source}: {count}/{total} ({count / total * 100:.1f}%)")
+    if enrich_tracks.enrichment_cache:
+        print(f"\nCache: {enrich_tracks.enrichment_cache.summary()}")
+    if enrich_tracks.spotify_index:
+        print(f"Spotify index: {enrich_tracks.spotify_index.summary()}")
+    print(f"\nRate limits (adaptive):")
+    print(enrich_tracks.format_rate_stats())
+    print(f"\nHTTP:")
+    print(http_client.format_stats())
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+NTS Page Cache
+
+Persistent local copy of the NTS pages the scrapers download: episode HTML,
+tracklist JSON and episode listings.
+
+- Bodies are stored zlib-compressed and content-addressed by SHA-256, so
+  identical pages are kept once
+- Each URL remembers its ETag/Last-Modified; re-fetches send
+  If-None-Match/If-Modified-Since, and a 304 is answered from disk
+- Parsed tracklists are memoized by page hash, so an unchanged page isn't
+  parsed again. The memo holds the parser's raw (artist, title) pairs;
+  cleaning happens afterwards, so new cleaning rules still apply
+- Offline mode serves everything from disk and never touches the network,
+  for reprocessing a show (e.g. with new cleaning rules)
+
+Usage:
+    cache = PageCache('.nts_cache')
+    page = cache.get(url)
+    page.raise_for_status()
+    found, pairs = cache.get_parsed(page.digest, 'html')
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+import http_client
+from enrich_cache import DEFAULT_CACHE_DIR
+from metrics import cache_stats
+
+CACHE_FILENAME = 'pages.sqlite3'
+
+# Responses worth keeping: pages, and "no such tracklist" answers so offline
+# runs fall back to the HTML page the same way online ones do
+CACHEABLE_STATUSES = {200, 404}
+
+# Bump when tracklist_parser's output changes, so memoized parses are redone
+PARSE_VERSION = 1
+
+COMPRESSION_LEVEL = 6
+
+
+class PageNotCached(requests.RequestException):
+    """Offline mode was asked for a page that was never downloaded."""
+
+
+class Page:
+    """A page from the network or the cache; the parts of requests.Response the scrapers use."""
+
+    def __init__(self, url: str, status_code: int, content: bytes,
+                 digest: Optional[str], from_cache: bool):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.digest = digest
+        self.from_cache = from_cache
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class PageCache:
+    """Thread-safe SQLite-backed page store with conditional revalidation."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, offline: bool = False):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, CACHE_FILENAME)
+        self.offline = offline
+
+        self.downloaded = 0
+        self.not_modified = 0
+        self.offline_hits = 0
+        self.parse_hits = 0
+        self.bytes_downloaded = 0
+        self.bytes_from_cache = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                digest TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS parsed (
+                digest TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                value TEXT,
+                PRIMARY KEY (digest, kind)
+            );
+        ''')
+        self._conn.commit()
+
+    def _cached_page(self, url: str, status: int, digest: Optional[str]) -> Page:
+        """Rebuild a page from its stored body. Caller holds the lock."""
+        content = b''
+        if digest:
+            row = self._conn.execute('SELECT data FROM blobs WHERE digest = ?', (digest,)).fetchone()
+            if row is None:
+                raise PageNotCached(f"Stored body for {url} is missing")
+            content = zlib.decompress(row[0])
+        self.bytes_from_cache += len(content)
+        return Page(url, status, content, digest, True)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> Page:
+        """
+        Fetch `url`, revalidating any stored copy.
+
+        Other statuses (5xx, 429 after retries) are returned uncached. In
+        offline mode, raises PageNotCached for pages never downloaded.
+        Extra arguments go to http_client.get().
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, digest, etag, last_modified FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+            if self.offline:
+                if row is None:
+                    raise PageNotCached(f"{url} is not in the page cache")
+                self.offline_hits += 1
+                return self._cached_page(url, row[0], row[1])
+
+        request_headers = dict(headers or {})
+        if row and row[0] == 200:
+            if row[2]:
+                request_headers['If-None-Match'] = row[2]
+            if row[3]:
+                request_headers['If-Modified-Since'] = row[3]
+
+        response = http_client.get(url, headers=request_headers, **kwargs)
+
+        with self._lock:
+            if response.status_code == 304 and row:
+                self.not_modified += 1
+                self._conn.execute('UPDATE pages SET fetched_at = ? WHERE url = ?', (time.time(), url))
+                self._conn.commit()
+                return self._cached_page(url, row[0], row[1])
+
+            if response.status_code not in CACHEABLE_STATUSES:
+                return Page(url, response.status_code, response.content, None, False)
+
+            content = response.content
+            self.downloaded += 1
+            self.bytes_downloaded += len(content)
+            digest = None
+            if response.status_code == 200:
+                digest = hashlib.sha256(content).hexdigest()
+                self._conn.execute(
+                    'INSERT OR IGNORE INTO blobs (digest, data, size) VALUES (?, ?, ?)',
+                    (digest, zlib.compress(content, COMPRESSION_LEVEL), len(content))
+                )
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages (url, status, digest, etag, last_modified, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, response.status_code, digest, response.headers.get('ETag'),
+                 response.headers.get('Last-Modified'), time.time())
+            )
+            self._conn.commit()
+        return Page(url, response.status_code, content, digest, False)
+
+    def get_parsed(self, digest: Optional[str], kind: str) -> Tuple[bool, Optional[List[Tuple[str, str]]]]:
+        """
+        Look up the memoized parse of a page body.
+
+        Returns (found, pairs); pairs is None when the page had no tracklist.
+        """
+        if not digest:
+            return False, None
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM parsed WHERE digest = ? AND kind = ?', (digest, f"{kind}:{PARSE_VERSION}")
+            ).fetchone()
+        if row is None:
+            return False, None
+        self.parse_hits += 1
+        pairs = json.loads(row[0]) if row[0] is not None else None
+        return True, [tuple(pair) for pair in pairs] if pairs is not None else None
+
+    def set_parsed(self, digest: Optional[str], kind: str, pairs: Optional[List[Tuple[str, str]]]):
+        """Memoize a page body's parse; None records "no tracklist"."""
+        if not digest:
+            return
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO parsed (digest, kind, value) VALUES (?, ?, ?)',
+                (digest, f"{kind}:{PARSE_VERSION}", json.dumps(pairs) if pairs is not None else None)
+            )
+            self._conn.commit()
+
+    def _prune(self):
+        """Drop bodies and parses no URL points at any more. Caller holds the lock."""
+        removed = self._conn.execute(
+            'DELETE FROM blobs WHERE digest NOT IN (SELECT digest FROM pages WHERE digest IS NOT NULL)'
+        ).rowcount
+        self._conn.execute('DELETE FROM parsed WHERE digest NOT IN (SELECT digest FROM blobs)')
+        if removed:
+            logging.info(f"Pruned {removed} superseded pages from the page cache")
+
+    def close(self):
+        with self._lock:
+            if not self.offline:
+                self._prune()
+            self._conn.commit()
+            self._conn.close()
+
+    def stats(self) -> Dict:
+        """Counts for the run report: pages served from disk (304s or offline) are hits."""
+        return cache_stats(self.not_modified + self.offline_hits, self.downloaded,
+                           parse_hits=self.parse_hits, bytes_downloaded=self.bytes_downloaded,
+                           bytes_from_cache=self.bytes_from_cache)
+
+    def summary(self) -> str:
+        if self.offline:
+            return (f"{self.offline_hits} pages from disk, {self.parse_hits} parses reused "
+                    f"(offline)")
+        return (f"{self.downloaded} downloaded ({self.bytes_downloaded / 1e6:.1f} MB), "
+                f"{self.not_modified} unchanged (304, {self.bytes_from_cache / 1e6:.1f} MB from disk), "
+                f"{self.parse_hits} parses reused")
@@ -0,0 +1,294 @@
+"""
+Sampling Profiler
+
+A low-overhead profiler for whole runs, worker threads included, turned on
+with --profile in nts_show_to_csv.py and enrich_tracks.py.
+
+A background thread wakes `rate` times a second, reads every other
+thread's Python stack (sys._current_frames()) and adds the time since
+the previous sample to that stack:
+
+- wall time: every thread, busy or not, so a worker blocked on a socket,
+  a rate limiter's sleep or a queue shows up where it's waiting
+- on-CPU time: how much CPU the thread actually used since the previous
+  sample (from its CPU-time clock), charged to its current stack. Where
+  threads have no such clock (macOS, Windows) only wall time and the
+  process's total CPU time are reported
+
+Worker threads are grouped by name with the trailing number dropped
+("spotify-0", "spotify-1" -> "spotify") and each group is the root of its
+stacks. Code that runs in C (lxml, sqlite3, socket reads) is charged to the
+Python function that called it.
+
+Output, for a prefix such as `nts_show_to_csv-profile`:
+- <prefix>.wall.folded, <prefix>.cpu.folded: collapsed stacks with
+  microsecond weights, for flamegraph.pl, speedscope or inferno
+- <prefix>.txt: time per thread group and the top functions by self time,
+  wall and on-CPU, with their inclusive times
+
+The sampler's own CPU time is reported with the results.
+`benchmarks/bench_profiler.py` measures what it costs a run at several
+rates.
+
+Usage:
+    profiler.start('run-profile', rate=50)   # Writes and prints the results at exit
+
+    p = SamplingProfiler(rate=100)
+    p.start(); ...; p.stop()
+    p.write('run-profile')
+    print(p.format_summary())
+"""
+
+import atexit
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_RATE = 50.0  # Samples per second
+MAX_RATE = 1000.0
+TOP_FUNCTIONS = 25  # Functions listed in the summary file
+TOP_PRINTED = 10    # Functions printed when a run ends
+
+Stack = Tuple[str, ...]
+
+# "spotify-3" -> "spotify", "ThreadPoolExecutor-0_7" -> "ThreadPoolExecutor-0"
+_WORKER_NUMBER = re.compile(r'[-_]\d+$')
+
+
+def thread_group(name: str) -> str:
+    """Name shared by a thread and the other workers of its pool."""
+    return _WORKER_NUMBER.sub('', name).replace(';', ':') or 'thread'
+
+
+def _cpu_clock(ident: int) -> Optional[int]:
+    """A thread's CPU-time clock, or None where threads don't have one."""
+    try:
+        return time.pthread_getcpuclockid(ident)
+    except (AttributeError, OSError):
+        return None
+
+
+def _cpu_seconds(clock: int) -> Optional[float]:
+    # Unlike reading /proc, this doesn't release the GIL, so busy workers
+    # can't hold the sampler up
+    try:
+        return time.clock_gettime(clock)
+    except OSError:
+        return None
+
+
+class _ThreadState:
+    __slots__ = ('group', 'clock', 'cpu', 'frame', 'stack')
+
+    def __init__(self, group: str, clock: Optional[int]):
+        self.group = group
+        self.clock = clock
+        self.cpu = _cpu_seconds(clock) if clock is not None else None
+        # The innermost frame at the last sample and its stack: a thread
+        # still in the same frame (blocked, usually) has the same stack
+        self.frame = None
+        self.stack: Stack = ()
+
+
+class SamplingProfiler:
+    """
+    Samples every thread's stack on a timer.
+
+    Args:
+        rate: Samples per second (at most MAX_RATE)
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE):
+        self.rate = min(max(rate, 0.1), MAX_RATE)
+        self.wall: Dict[Tuple[str, Stack], float] = defaultdict(float)
+        self.cpu: Dict[Tuple[str, Stack], float] = defaultdict(float)
+        self.samples = 0
+        self.cpu_available = hasattr(time, 'pthread_getcpuclockid')
+        self.wall_seconds = 0.0
+        self.process_cpu_seconds = 0.0
+        self.own_cpu_seconds = 0.0  # The sampler thread's
+
+        self._labels: Dict[object, str] = {}
+        self._threads: Dict[int, _ThreadState] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._process_cpu_start = 0.0
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = os.path.basename(code.co_filename)
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ':')
+            self._labels[code] = label
+        return label
+
+    def _stack(self, frame) -> Stack:
+        stack = []
+        known = self._labels
+        while frame is not None:
+            code = frame.f_code
+            label = known.get(code)
+            stack.append(label if label is not None else self._label(code))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _thread_state(self, ident: int) -> _ThreadState:
+        state = self._threads.get(ident)
+        if state is None:
+            thread = next((t for t in threading.enumerate() if t.ident == ident), None)
+            name = thread.name if thread else f"thread-{ident}"
+            clock = _cpu_clock(ident) if self.cpu_available else None
+            state = self._threads[ident] = _ThreadState(thread_group(name), clock)
+        return state
+
+    def _sample(self, elapsed: float):
+        """Charge `elapsed` seconds of wall time, and each thread's CPU time since the last sample."""
+        frames = sys._current_frames()
+        own = threading.get_ident()
+        for ident, frame in frames.items():
+            if ident == own:
+                continue
+            state = self._thread_state(ident)
+            if frame is not state.frame:
+                state.frame = frame
+                state.stack = self._stack(frame)
+            key = (state.group, state.stack)
+            self.wall[key] += elapsed
+            if state.clock is not None:
+                cpu = _cpu_seconds(state.clock)
+                if cpu is not None and state.cpu is not None and cpu > state.cpu:
+                    self.cpu[key] += cpu - state.cpu
+                state.cpu = cpu
+
+        # Forget threads that have finished
+        for ident in [ident for ident in self._threads if ident not in frames]:
+            del self._threads[ident]
+        self.samples += 1
+
+    def _run(self):
+        interval = 1.0 / self.rate
+        last = time.perf_counter()
+        while not self._stop.wait(interval):
+            now = time.perf_counter()
+            self._sample(now - last)
+            last = now
+        self.own_cpu_seconds = time.thread_time()
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._process_cpu_start = time.process_time()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.wall_seconds = time.perf_counter() - self._started
+        self.process_cpu_seconds = time.process_time() - self._process_cpu_start
+        self._threads.clear()
+
+    def folded(self, kind: str = 'wall') -> List[str]:
+        """Collapsed stacks ("group;outer;...;inner <microseconds>"), heaviest first."""
+        weights = self.wall if kind == 'wall' else self.cpu
+        lines = [(round(seconds * 1e6), ';'.join((group,) + stack)) for (group, stack), seconds in weights.items()]
+        return [f"{stack} {us}" for us, stack in sorted(lines, reverse=True) if us > 0]
+
+    def groups(self) -> Dict[str, Tuple[float, float]]:
+        """(wall seconds, CPU seconds) per thread group."""
+        totals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0])
+        for (group, _), seconds in self.wall.items():
+            totals[group][0] += seconds
+        for (group, _), seconds in self.cpu.items():
+            totals[group][1] += seconds
+        return {group: (wall, cpu) for group, (wall, cpu) in totals.items()}
+
+    def top(self, kind: str = 'cpu', n: int = TOP_FUNCTIONS) -> List[Tuple[str, float, float]]:
+        """
+        The `n` functions with the most self time: (function, self seconds,
+        inclusive seconds). A recursive function counts once per stack.
+        """
+        weights = self.wall if kind == 'wall' else self.cpu
+        own: Dict[str, float] = defaultdict(float)
+        total: Dict[str, float] = defaultdict(float)
+        for (_, stack), seconds in weights.items():
+            if not stack:
+                continue
+            own[stack[-1]] += seconds
+            for label in set(stack):
+                total[label] += seconds
+        ranked = sorted(own.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(label, seconds, total[label]) for label, seconds in ranked]
+
+    def _top_table(self, kind: str, n: int) -> List[str]:
+        lines = [f"  {'self s':>9} {'total s':>9}  function"]
+        for label, own, total in self.top(kind, n):
+            lines.append(f"  {own:>9.3f} {total:>9.3f}  {label}")
+        return lines
+
+    def format_summary(self, n: int = TOP_PRINTED) -> str:
+        """Wall vs CPU totals, per-group times and the top `n` functions."""
+        sampled_cpu = sum(self.cpu.values())
+        overhead = self.own_cpu_seconds / self.wall_seconds * 100 if self.wall_seconds else 0.0
+        lines = [
+            f"  {self.samples} samples at {self.rate:g} Hz over {self.wall_seconds:.1f}s wall; "
+            f"process CPU {self.process_cpu_seconds:.1f}s",
+            f"  Profiler's own CPU: {self.own_cpu_seconds:.2f}s ({overhead:.1f}% of wall time)",
+            "",
+            f"  {'threads':<28} {'wall s':>9} {'cpu s':>9} {'on CPU':>7}",
+        ]
+        for group, (wall, cpu) in sorted(self.groups().items(), key=lambda item: item[1][1], reverse=True):
+            on_cpu = f"{cpu / wall:.0%}" if self.cpu_available and wall else '-'
+            cpu_text = f"{cpu:.3f}" if self.cpu_available else '-'
+            lines.append(f"  {group:<28} {wall:>9.3f} {cpu_text:>9} {on_cpu:>7}")
+        if self.cpu_available:
+            lines += ["", f"Hottest functions on CPU ({sampled_cpu:.2f}s sampled):"] + self._top_table('cpu', n)
+        else:
+            lines += ["", "Per-thread CPU time isn't available on this platform; wall time only"]
+        lines += ["", "Where threads spent wall time (running or waiting):"] + self._top_table('wall', n)
+        return "\n".join(lines)
+
+    def write(self, prefix: str) -> List[str]:
+        """Write the folded stacks and the summary; returns the paths written."""
+        paths = []
+        kinds = ('wall', 'cpu') if self.cpu_available else ('wall',)
+        for kind in kinds:
+            path = f"{prefix}.{kind}.folded"
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines(line + '\n' for line in self.folded(kind))
+            paths.append(path)
+        path = f"{prefix}.txt"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.format_summary(TOP_FUNCTIONS) + '\n')
+        paths.append(path)
+        return paths
+
+
+def start(prefix: str, rate: float = DEFAULT_RATE) -> SamplingProfiler:
+    """
+    Profile the rest of the run. At exit (including sys.exit() and Ctrl-C)
+    the results are written under `prefix` and a short summary is printed.
+    """
+    profiler = SamplingProfiler(rate)
+
+    def finish():
+        profiler.stop()
+        try:
+            paths = profiler.write(prefix)
+        except OSError as e:
+            print(f"❌ Couldn't write the profile: {e}")
+            return
+        print(f"\nProfile ({', '.join(paths)}):")
+        print(profiler.format_summary())
+
+    profiler.start()
+    atexit.register(finish)
+    return profiler
@@ -0,0 +1,166 @@
+"""
+Rate Limiting Helpers
+
+Thread-safe token buckets used to keep request rates under each service's
+ceiling when several workers share the same host. AdaptiveTokenBucket
+finds that ceiling itself from the service's 429/503 responses.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """
+    Classic token bucket.
+
+    Tokens refill continuously at `rate` per second up to `burst`. Each
+    `acquire()` takes one token, sleeping until one is available.
+    A rate of None (or <= 0) disables limiting.
+    """
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        self.rate = rate if rate and rate > 0 else None
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Block until a token is available. Returns seconds spent waiting."""
+        if self.rate is None:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+# Status codes that mean "slow down" rather than "this request failed"
+THROTTLE_STATUSES = {429, 503}
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    Token bucket whose rate adapts to the service's feedback (AIMD).
+
+    Every healthy response raises the rate additively, by about `increase`
+    req/s for each second of traffic (default: a twentieth of `max_rate`,
+    so a full ramp takes ~20s), up to `max_rate`. A 429 or 503 halves
+    it (at most once per `cooldown` seconds, so a burst of concurrent
+    rejections counts once), down to `min_rate`, and a Retry-After pauses
+    the bucket for that long. The rate settles just under the highest
+    rate the service tolerates.
+
+    Pass the bucket to http_client as `limiter=`: it acquires a token
+    before every attempt, retries included, and reports each response
+    through record_response().
+
+    As with TokenBucket, a rate of None (or <= 0) disables limiting: the
+    rate then never adapts, though 429/503s are still counted and a
+    Retry-After still pauses the bucket.
+    """
+
+    def __init__(self, rate: Optional[float], min_rate: Optional[float] = None, max_rate: Optional[float] = None,
+                 increase: Optional[float] = None, decrease: float = 0.5, cooldown: float = 1.0,
+                 burst: int = 1):
+        super().__init__(rate, burst)
+        rate = self.rate
+        self.min_rate = min_rate if min_rate is not None or rate is None else rate / 10
+        self.max_rate = max_rate if max_rate is not None or rate is None else rate
+        self.increase = increase if increase is not None or self.max_rate is None else self.max_rate / 20
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.peak_rate = self.rate
+        self.throttled = 0
+        self.backoffs = 0
+        self._paused_until = 0.0
+        self._last_backoff = float('-inf')
+
+    def acquire(self) -> float:
+        """Block until a token is available (and any Retry-After has passed)."""
+        waited = 0.0
+        with self._lock:
+            pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+            waited += pause
+        return waited + super().acquire()
+
+    def record_response(self, status: int, retry_after: Optional[float] = None) -> bool:
+        """
+        Adjust the rate after a response.
+
+        Returns whether the bucket will hold the next acquire() back: it has
+        a finite rate, or is paused for a Retry-After. An unlimited bucket
+        without a Retry-After doesn't, so the caller must back off itself.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if status in THROTTLE_STATUSES:
+                self.throttled += 1
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+                if self.rate is not None and now - self._last_backoff >= self.cooldown:
+                    self._refill(now)
+                    self.rate = max(self.min_rate, self.rate * self.decrease)
+                    self._tokens = min(self._tokens, 0.0)
+                    self._last_backoff = now
+                    self.backoffs += 1
+            elif status < 500 and self.rate is not None:
+                self._refill(now)
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+                self.peak_rate = max(self.peak_rate, self.rate)
+            return self.rate is not None or self._paused_until > now
+
+    def stats(self) -> Dict[str, float]:
+        """Current rate and feedback counters, for reporting."""
+        with self._lock:
+            return {
+                'rate': round(self.rate, 2) if self.rate is not None else None,
+                'peak_rate': round(self.peak_rate, 2) if self.peak_rate is not None else None,
+                'min_rate': self.min_rate,
+                'max_rate': self.max_rate,
+                'throttled': self.throttled,
+                'backoffs': self.backoffs,
+            }
+
+
+class HostRateLimiter:
+    """
+    One token bucket per host.
+
+    Workers call `acquire(url)` before each request; requests to different
+    hosts never wait on each other.
+    """
+
+    def __init__(self, rate_per_host: Optional[float], burst: int = 1):
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> float:
+        """Block until a request to `url`'s host is allowed."""
+        return self.bucket(urlparse(url).netloc).acquire()
@@ -1,22 +1,12 @@
-from unidecode import unidecode
 import csv
-import re
-import requests
-from bs4 import BeautifulSoup
 import logging
 import sys
-
-def clean_string(s):
-    s = unidecode(s)
-    s = s.lower()
-    # Remove any extra spaces
-    s = re.sub(r'\s+', ' ', s).strip()
-    # Remove "ft" and anything that comes after it
-    s = re.sub(r'\sft.*', '', s, flags=re.IGNORECASE)
-    index = s.find("feat")
-    if index != -1:
-        s = s[:index]
-    return s
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from enrich_cache import DEFAULT_CACHE_DIR
+from normalize import clean_string
+from page_cache import PageCache
+from tracklist_parser import parse_tracklist
 
 # Set up logging
 logging.basicConfig(filename='get_tracklist_logs.txt', level=logging.DEBUG, format='%(asctime)s %(levelname)s %(message)s')
@@ -39,33 +29,34 @@ csv_title = csv_title + ".csv"
 print(f"csv title is {csv_title}")
 track_elements = []
 
+# Pages already downloaded are revalidated (304 if unchanged) and not re-parsed
+page_cache = PageCache(DEFAULT_CACHE_DIR)
+
 for url in urls:
     # Send a GET request to the URL and get the HTML response
     print(f"working on url {url}\n")
-    response = requests.get(url)
+    response = page_cache.get(url)
     logging.debug(f"Request status code: {response.status_code}")
     html_content = response.content
 
-    # Parse the HTML content using Beautiful Soup
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Find the element with ID "episode-container"
-    episode_container = soup.find(id="episode-container")
+    # Pull the (artist, title) pairs out of the "episode-container" element
+    found, pairs = page_cache.get_parsed(response.digest, 'html')
+    if not found:
+        pairs = parse_tracklist(html_content)
+        page_cache.set_parsed(response.digest, 'html', pairs)
+    track_elements.extend(pairs or [])
 
-    # Find all the elements with class "track" inside the heading element
-    for elem in episode_container.find_all(class_="track"):
-        track_elements.append(elem)
+page_cache.close()
+print(f"Page cache: {page_cache.summary()}")
 
 
 # Loop through the track elements and log their text
 with open(f"../unread_csvs/{csv_title}", 'w') as f:
     writer = csv.writer(f)
     writer.writerow(["TITLE", "ARTIST"])
-    for track_element in track_elements:
-        artist = track_element.find(class_="track__artist").text.strip()
+    for artist, title in track_elements:
         artist = clean_string(artist)
         logging.debug(f"artist: {artist}")
-        title = track_element.find(class_="track__title").text.strip()
         title = clean_string(title)
         logging.debug(f"title: {title}")
         writer.writerow([title, artist])
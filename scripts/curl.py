@@ -1,5 +1,8 @@
-import requests
 import json
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import http_client
 
 # url = input("enter url:")
 offset = "0"
@@ -8,7 +11,7 @@ show_name = input("show name:")
 url = f"https://www.nts.live/api/v2/shows/{show_name}/episodes?limit={limit}&offset={offset}"
 
 def getResults(url):
-    response = requests.get(url, headers=headers)
+    response = http_client.get(url, headers=headers)
     decoded_content = response.content.decode('utf-8')  # decode byte string into a string using utf-8 encoding
     json_data = json.loads(decoded_content)  # parse JSON string into a Python object
     return json_data["results"]
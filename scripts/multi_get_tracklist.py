@@ -1,24 +1,11 @@
-from unidecode import unidecode
 import csv
-import re
-import requests
-from bs4 import BeautifulSoup
 import logging
-
-def clean_string(s):
-    # Remove any parentheses and their contents
-    s = unidecode(s)
-    s = s.lower()
-    # s = re.sub(r'\([^)]*\)', '', s)
-    # s = re.sub(r'[^a-zA-Z0-9\s]', '', s)
-    # Remove any extra spaces
-    # s = re.sub(r'\s+', ' ', s).strip()
-    # Remove "ft" and anything that comes after it
-    s = re.sub(r'\sft.*', '', s, flags=re.IGNORECASE)
-    index = s.find("feat")
-    if index != -1:
-        s = s[:index]
-    return s
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import http_client
+from normalize import clean_string
+from tracklist_parser import parse_tracklist
 
 # Set up logging
 logging.basicConfig(filename='get_tracklist_logs.txt', level=logging.DEBUG, format='%(asctime)s %(levelname)s %(message)s')
@@ -43,30 +30,21 @@ track_elements = []
 for url in urls:
     # Send a GET request to the URL and get the HTML response
     print(f"working on url {url}\n")
-    response = requests.get(url)
+    response = http_client.get(url)
     logging.debug(f"Request status code: {response.status_code}")
     html_content = response.content
 
-    # Parse the HTML content using Beautiful Soup
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Find the element with ID "episode-container"
-    episode_container = soup.find(id="episode-container")
-
-    # Find all the elements with class "track" inside the heading element
-    for elem in episode_container.find_all(class_="track"):
-        track_elements.append(elem)
+    # Pull the (artist, title) pairs out of the "episode-container" element
+    track_elements.extend(parse_tracklist(html_content) or [])
 
 
 # Loop through the track elements and log their text
 with open(f"../unread_csvs/{csv_title}", 'w') as f:
     writer = csv.writer(f)
     writer.writerow(["TITLE", "ARTIST"])
-    for track_element in track_elements:
-        artist = track_element.find(class_="track__artist").text.strip()
+    for artist, title in track_elements:
         artist = clean_string(artist)
         logging.debug(f"artist: {artist}")
-        title = track_element.find(class_="track__title").text.strip()
         title = clean_string(title)
         logging.debug(f"title: {title}")
         writer.writerow([title, artist])
@@ -1,7 +1,10 @@
 import csv
-import requests
-from bs4 import BeautifulSoup
 import logging
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import http_client
+from tracklist_parser import parse_tracklist
 
 # Set up logging
 logging.basicConfig(filename='get_tracklist_logs.txt', level=logging.DEBUG, format='%(asctime)s %(levelname)s %(message)s')
@@ -12,27 +15,19 @@ csv_title = csv_title + ".csv"
 logging.debug(f"csv title is {csv_title}")
 
 # Send a GET request to the URL and get the HTML response
-response = requests.get(url)
+response = http_client.get(url)
 logging.debug(f"Request status code: {response.status_code}")
 html_content = response.content
 
-# Parse the HTML content using Beautiful Soup
-soup = BeautifulSoup(html_content, 'html.parser')
-
-# Find the element with ID "episode-container"
-episode_container = soup.find(id="episode-container")
-
-# Find all the elements with class "track" inside the heading element
-track_elements = episode_container.find_all(class_="track")
+# Pull the (artist, title) pairs out of the "episode-container" element
+track_elements = parse_tracklist(html_content) or []
 
 # Loop through the track elements and log their text
 with open(f"../unread_csvs/{csv_title}", 'w') as f:
     writer = csv.writer(f)
     writer.writerow(["TITLE", "ARTIST"])
-    for track_element in track_elements:
-        artist = track_element.find(class_="track__artist").text.strip()
+    for artist, title in track_elements:
         logging.debug(f"artist: {artist}")
-        title = track_element.find(class_="track__title").text.strip()
         logging.debug(f"title: {title}")
         writer.writerow([title, artist])
 
@@ -1,8 +1,11 @@
 import csv
 import re
-import requests
 from bs4 import BeautifulSoup
 import logging
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import http_client
 
 # Set up logging
 logging.basicConfig(filename='get_tracklist_logs.txt', level=logging.DEBUG, format='%(asctime)s %(levelname)s %(message)s')
@@ -13,7 +16,7 @@ url = input("enter a url:")
 result_urls = []
 track_elements = []
 # Send a GET request to the URL and get the HTML response
-response = requests.get(url)
+response = http_client.get(url)
 logging.debug(f"Request status code: {response.status_code}")
 html_content = response.content
 
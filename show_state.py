@@ -0,0 +1,82 @@
+"""
+Show Sync State
+
+Remembers which episodes of each show have already been scraped, so
+`nts_show_to_csv.py --incremental` only fetches new ones. One JSON file per
+show, holding each episode alias with when it was scraped, how many tracks
+it had, and a hash of its tracklist.
+
+Episodes that failed to download are kept in a pending list. Incremental
+discovery stops at the first known episode, so an older episode that failed
+would never be listed again; the next sync retries the pending ones
+explicitly.
+
+Replaces the manual urls.txt / read_urls.txt bookkeeping in scripts/.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Set
+
+DEFAULT_STATE_DIR = os.getenv('NTS_STATE_DIR', '.nts_state')
+
+
+def tracklist_hash(tracks: List[Dict[str, str]]) -> str:
+    """Stable hash of an episode's (artist, title) list."""
+    digest = hashlib.sha256()
+    for track in tracks:
+        digest.update(f"{track['artist']}\x1f{track['title']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ShowState:
+    """Per-show record of scraped episodes."""
+
+    def __init__(self, show_name: str, state_dir: str = DEFAULT_STATE_DIR):
+        self.show_name = show_name
+        self.path = os.path.join(state_dir, f"{show_name}.json")
+        self.episodes: Dict[str, Dict] = {}
+        self.pending: List[str] = []  # Aliases that failed, oldest failure first
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.episodes = data.get('episodes', {})
+            self.pending = data.get('pending', [])
+        except FileNotFoundError:
+            self.episodes = {}
+        except ValueError as e:
+            logging.warning(f"Ignoring unreadable state file {self.path}: {e}")
+            self.episodes = {}
+
+    def known_aliases(self) -> Set[str]:
+        return set(self.episodes)
+
+    def record(self, alias: str, tracks: List[Dict[str, str]]):
+        """Mark an episode as scraped (and no longer pending)."""
+        self.episodes[alias] = {
+            'scraped_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'tracks': len(tracks),
+            'hash': tracklist_hash(tracks),
+        }
+        if alias in self.pending:
+            self.pending.remove(alias)
+
+    def fail(self, alias: str):
+        """Mark an episode as failed, so the next sync retries it."""
+        if alias not in self.episodes and alias not in self.pending:
+            self.pending.append(alias)
+
+    def save(self):
+        """Atomically write the state file."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'show': self.show_name, 'episodes': self.episodes, 'pending': self.pending},
+                      f, indent=1)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Spotify Resolution Index
+
+Persistent SQLite index from a normalized (artist, title) pair to the
+Spotify track it resolves to, so each track is searched on Spotify at most
+once, across every show, enrichment run and playlist build.
+
+- Keys are track_key() pairs, the same as the enrichment cache
+- Each entry holds the chosen Spotify ID, a confidence score (0-1, how
+  closely the track's name and artists match the query) and the alternate
+  candidates the search returned
+- Tracks Spotify doesn't have are recorded too, and re-searched after
+  NEGATIVE_TTL in case they've been added since
+- Seeded from enriched outputs (TITLE/ARTIST/spotify_id columns) and from
+  Spotify playlist exports like scripts/spotify_RGA.csv
+
+Usage:
+    python spotify_index.py seed scripts/spotify_RGA.csv shows/*_enriched.parquet
+    python spotify_index.py stats
+    python spotify_index.py lookup "Tazar Yoot" "Genesis 2.24"
+
+    index = SpotifyIndex()
+    found, entry = index.get(track_key(artist, title))
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from enrich_cache import DEFAULT_CACHE_DIR, DAY, track_key
+from metrics import cache_stats
+from table_output import RowReader
+from track_match import MIN_CONFIDENCE, Query, rank, strip_version
+
+INDEX_FILENAME = 'spotify_index.sqlite3'
+
+# How long a "not on Spotify" entry is trusted before searching again
+NEGATIVE_TTL = 30 * DAY
+
+# Search results kept per track as alternates
+MAX_CANDIDATES = 5
+
+# Where an entry came from, strongest first: a later resolution only
+# replaces an existing one from the same or a weaker source
+SOURCES = ('export', 'search', 'enrichment')
+
+# Column names in Spotify playlist exports (Exportify and similar)
+EXPORT_ID_COLUMN = 'Spotify ID'
+EXPORT_TITLE_COLUMN = 'Track Name'
+EXPORT_ARTISTS_COLUMN = 'Artist Name(s)'
+
+
+def rank_candidates(title: str, artist: str, items: List[Dict]) -> List[Dict]:
+    """
+    Score Spotify track objects from a search against the query.
+
+    Returns candidates ({spotify_id, title, artists, score}) best first;
+    equal scores keep Spotify's order.
+    """
+    scored = []
+    for item in items:
+        if not item or not item.get('id'):
+            continue
+        candidate = {
+            'spotify_id': item['id'],
+            'title': item.get('name', ''),
+            'artists': [a.get('name', '') for a in item.get('artists') or []],
+        }
+        scored.append((candidate['title'], candidate['artists'], candidate))
+    ranked = rank(Query(title, artist), scored)[:MAX_CANDIDATES]
+    return [dict(candidate, score=score) for score, candidate in ranked]
+
+
+class SpotifyIndex:
+    """Thread-safe SQLite-backed (artist, title) -> Spotify track index."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, negative_ttl: float = NEGATIVE_TTL):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, INDEX_FILENAME)
+        self.negative_ttl = negative_ttl
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS tracks (
+                key TEXT PRIMARY KEY,
+                spotify_id TEXT,
+                confidence REAL,
+                candidates TEXT,
+                source TEXT NOT NULL,
+                resolved_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS tracks_spotify_id ON tracks (spotify_id)')
+        self._conn.commit()
+
+    def get(self, key: str) -> Tuple[bool, Optional[Dict]]:
+        """
+        Look up a resolution.
+
+        Returns (found, entry). `found` is True for known tracks, including
+        ones known not to be on Spotify, in which case `entry` is None.
+        Otherwise `entry` has spotify_id, confidence (None if unscored),
+        candidates and source.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT spotify_id, confidence, candidates, source, resolved_at FROM tracks WHERE key = ?',
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return False, None
+
+            spotify_id, confidence, candidates, source, resolved_at = row
+            if spotify_id is None:
+                if time.time() - resolved_at > self.negative_ttl:
+                    self.misses += 1
+                    return False, None
+                self.negative_hits += 1
+                return True, None
+
+            self.hits += 1
+            return True, {
+                'spotify_id': spotify_id,
+                'confidence': confidence,
+                'candidates': json.loads(candidates) if candidates else [],
+                'source': source,
+            }
+
+    def _put(self, key: str, spotify_id: Optional[str], confidence: Optional[float],
+             candidates: List[Dict], source: str, commit: bool = True):
+        """Store a resolution unless a stronger source already resolved this key. Caller holds the lock."""
+        row = self._conn.execute('SELECT source, spotify_id FROM tracks WHERE key = ?', (key,)).fetchone()
+        if row is not None and row[1] is not None and SOURCES.index(row[0]) < SOURCES.index(source):
+            return
+        self._conn.execute(
+            'INSERT OR REPLACE INTO tracks (key, spotify_id, confidence, candidates, source, resolved_at) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (key, spotify_id, confidence, json.dumps(candidates) if candidates else None, source, time.time())
+        )
+        if commit:
+            self._conn.commit()
+
+    def record_search(self, key: str, candidates: List[Dict]):
+        """
+        Store the ranked candidates from a search; the best one is the resolution.
+
+        A best candidate under MIN_CONFIDENCE is recorded as a miss, with
+        its score and the candidates kept for inspection.
+        """
+        best = candidates[0] if candidates else None
+        spotify_id = best['spotify_id'] if best and best['score'] >= MIN_CONFIDENCE else None
+        confidence = best['score'] if best else None
+        with self._lock:
+            self._put(key, spotify_id, confidence, candidates, 'search')
+
+    def seed_rows(self, rows, source: str) -> int:
+        """
+        Add (key, spotify_id, confidence) tuples in one transaction.
+
+        Returns the number of rows offered (existing stronger entries are kept).
+        """
+        count = 0
+        with self._lock:
+            for key, spotify_id, confidence in rows:
+                self._put(key, spotify_id, confidence, [], source, commit=False)
+                count += 1
+            self._conn.commit()
+        return count
+
+    def seed_file(self, path: str) -> int:
+        """
+        Seed from an enriched output or a Spotify playlist export.
+
+        Enriched outputs (TITLE, ARTIST, spotify_id) contribute their
+        resolved IDs, unscored. Playlist exports are tracks someone chose
+        on Spotify, so they're trusted fully, keyed by the first artist and
+        by all artists together, with and without any version suffix.
+        """
+        with RowReader(path) as reader:
+            columns = set(reader.columns or [])
+            if {'TITLE', 'ARTIST', 'spotify_id'} <= columns:
+                rows = ((track_key(row['ARTIST'] or '', row['TITLE'] or ''), row['spotify_id'], None)
+                        for row in reader if row.get('spotify_id'))
+                return self.seed_rows(rows, 'enrichment')
+            if {EXPORT_ID_COLUMN, EXPORT_TITLE_COLUMN, EXPORT_ARTISTS_COLUMN} <= columns:
+                return self.seed_rows(self._export_rows(reader), 'export')
+        raise ValueError(f"{path} is neither an enriched output nor a Spotify playlist export")
+
+    @staticmethod
+    def _export_rows(reader):
+        """
+        Index entries for a playlist export's rows, keyed like tracklist
+        lookups (track_key). Spotify names carry version suffixes that NTS
+        tracklists usually don't ("Song - 2011 Remaster"), so titles with one
+        are also keyed without it, unless another track in the export has
+        exactly that title (the original shouldn't resolve to its remix).
+        """
+        exact = set()
+        stripped: Dict[str, str] = {}
+        for row in reader:
+            spotify_id = row.get(EXPORT_ID_COLUMN)
+            if not spotify_id:
+                continue
+            title = row.get(EXPORT_TITLE_COLUMN) or ''
+            artists = [a.strip() for a in (row.get(EXPORT_ARTISTS_COLUMN) or '').split(',') if a.strip()]
+            if not artists:
+                continue
+            base_title = strip_version(title)
+            for name in [artists[0]] + ([', '.join(artists)] if len(artists) > 1 else []):
+                key = track_key(name, title)
+                exact.add(key)
+                yield key, spotify_id, 1.0
+                if base_title and base_title != title:
+                    stripped.setdefault(track_key(name, base_title), spotify_id)
+        for key, spotify_id in stripped.items():
+            if key not in exact:
+                yield key, spotify_id, 1.0
+
+    def counts(self) -> Dict[str, int]:
+        """Entries per source, plus how many are known misses."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT source, spotify_id IS NULL, COUNT(*) FROM tracks GROUP BY 1, 2'
+            ).fetchall()
+        counts = {'not_on_spotify': 0}
+        for source, is_miss, count in rows:
+            if is_miss:
+                counts['not_on_spotify'] += count
+            else:
+                counts[source] = counts.get(source, 0) + count
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def stats(self) -> Dict:
+        """Hit/miss counts, for the run report. Known misses count as hits."""
+        return cache_stats(self.hits + self.negative_hits, self.misses, negative_hits=self.negative_hits)
+
+    def summary(self) -> str:
+        lookups = self.hits + self.negative_hits + self.misses
+        ratio = (self.hits + self.negative_hits) / lookups * 100 if lookups else 0.0
+        return (f"{self.hits} resolved, {self.negative_hits} known misses, "
+                f"{self.misses} searched ({ratio:.1f}% resolved locally)")
+
+
+def main():
+    """Main execution function."""
+
+    parser = argparse.ArgumentParser(description="Manage the local Spotify resolution index.")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"Directory holding the index (default: {DEFAULT_CACHE_DIR})")
+    commands = parser.add_subparsers(dest='command', required=True)
+    seed = commands.add_parser('seed', help="Add resolutions from enriched outputs or playlist exports")
+    seed.add_argument('files', nargs='+')
+    commands.add_parser('stats', help="Show how many tracks are indexed")
+    lookup = commands.add_parser('lookup', help="Show how a track resolves")
+    lookup.add_argument('artist')
+    lookup.add_argument('title')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    index = SpotifyIndex(args.cache_dir)
+    try:
+        if args.command == 'seed':
+            for path in args.files:
+                try:
+                    count = index.seed_file(path)
+                except (OSError, ValueError) as e:
+                    print(f"❌ {path}: {e}")
+                    continue
+                print(f"✓ {path}: {count} resolutions")
+
+        elif args.command == 'lookup':
+            found, entry = index.get(track_key(args.artist, args.title))
+            if not found:
+                print("Not in the index")
+            elif entry is None:
+                print("Known not to be on Spotify")
+            else:
+                confidence = entry['confidence'] if entry['confidence'] is not None else 'unscored'
+                print(f"spotify:track:{entry['spotify_id']} (confidence {confidence}, from {entry['source']})")
+                for candidate in entry['candidates'][1:]:
+                    print(f"  alternate: spotify:track:{candidate['spotify_id']} "
+                          f"{', '.join(candidate['artists'])} - {candidate['title']} ({candidate['score']})")
+
+        if args.command in ('seed', 'stats'):
+            counts = index.counts()
+            total = sum(counts.values())
+            print(f"\nIndex: {index.path}")
+            print(f"  {total} tracks: " + ", ".join(f"{n} {source}" for source, n in sorted(counts.items())))
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Spotify Playlist Sync
+
+Makes a Spotify playlist contain every track in a tracklist CSV:
+
+- Tracks are resolved to Spotify IDs concurrently, through the shared
+  resolution index and lookup cache (enriched files' spotify_id column is
+  used as-is)
+- The playlist's current contents are read first, and only tracks it
+  doesn't already have are added, so re-running after a show's new
+  episodes only adds the new tracks
+- Adds go out 100 URIs per request (Spotify's limit). A failed add is
+  retried after re-reading the playlist, so nothing is added twice
+
+Syncing a 2,000-track archive takes at most 20 adds, plus one read per 100
+tracks already in the playlist.
+
+Usage:
+    python spotify_scripts/playlist_sync.py <tracks.csv> --name "Playlist name"
+    python spotify_scripts/playlist_sync.py <tracks.csv> --playlist <playlist id>
+
+    --private           Create the playlist as private
+    --workers N         Concurrent track lookups (default: 4)
+    --dry-run           Resolve and diff, but don't change the playlist
+
+Needs SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET. The first run asks you to
+authorize in the browser and prints a refresh token; save it as
+SPOTIFY_REFRESH_TOKEN in .env to skip that next time.
+"""
+
+import argparse
+import base64
+import logging
+import os
+import sys
+import time
+import webbrowser
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import http_client  # noqa: E402
+import enrich_tracks  # noqa: E402
+from enrich_cache import EnrichmentCache, DEFAULT_CACHE_DIR, track_key  # noqa: E402
+from spotify_index import SpotifyIndex  # noqa: E402
+from table_output import RowReader  # noqa: E402
+
+REDIRECT_URI = os.getenv('SPOTIFY_REDIRECT_URI', 'http://localhost:8000/callback/')
+SCOPES = 'playlist-read-private playlist-modify-public playlist-modify-private'
+
+# Spotify's limits: URIs per add request, playlist items and playlists per page
+PLAYLIST_ADD_BATCH = 100
+PLAYLIST_ITEMS_PAGE = 100
+PLAYLISTS_PAGE = 50
+
+# Rounds of adds; each retry re-reads the playlist and only sends what's missing
+SYNC_ATTEMPTS = 3
+SYNC_RETRY_DELAY = 2.0
+
+DEFAULT_WORKERS = 4
+
+
+def get_user_token() -> str:
+    """
+    Get a user access token (playlist changes can't use client credentials).
+
+    Uses SPOTIFY_REFRESH_TOKEN if set, otherwise runs the authorization code
+    flow in the browser and prints the refresh token to save.
+    """
+    client_id = enrich_tracks.SPOTIFY_CLIENT_ID
+    client_secret = enrich_tracks.SPOTIFY_CLIENT_SECRET
+    if not client_id or not client_secret:
+        raise ValueError("Spotify credentials not found. Set SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET "
+                         "in .env (see .env.example).")
+
+    refresh_token = os.getenv('SPOTIFY_REFRESH_TOKEN')
+    if refresh_token:
+        data = {'grant_type': 'refresh_token', 'refresh_token': refresh_token}
+    else:
+        auth_url = f"{enrich_tracks.SPOTIFY_ACCOUNTS_URL}/authorize?" + urlencode({
+            'client_id': client_id,
+            'response_type': 'code',
+            'redirect_uri': REDIRECT_URI,
+            'scope': SCOPES,
+        })
+        print('Please authorize this app to access your Spotify account.')
+        print(f'Opening {auth_url}')
+        webbrowser.open_new(auth_url)
+        code = input('Enter the authorization code from the URL: ').strip()
+        data = {'grant_type': 'authorization_code', 'code': code, 'redirect_uri': REDIRECT_URI}
+
+    auth_header = base64.b64encode(f'{client_id}:{client_secret}'.encode('ascii')).decode('ascii')
+    response = http_client.post(f'{enrich_tracks.SPOTIFY_ACCOUNTS_URL}/api/token',
+                                headers={'Authorization': f'Basic {auth_header}'}, data=data)
+    response.raise_for_status()
+    token_data = response.json()
+
+    if not refresh_token and token_data.get('refresh_token'):
+        print(f"\nAdd this to .env to skip authorization next time:\n"
+              f"SPOTIFY_REFRESH_TOKEN={token_data['refresh_token']}\n")
+    return token_data['access_token']
+
+
+class PlaylistClient:
+    """The Spotify Web API calls needed to sync one user's playlists."""
+
+    def __init__(self, token: str):
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.reads = 0
+        self.writes = 0
+
+    def _get(self, url: str, params: Optional[Dict] = None) -> Dict:
+        self.reads += 1
+        # Shares the enrichment limiter, so lookups and writes stay within one budget
+        response = http_client.get(url, limiter=enrich_tracks.spotify_limiter,
+                                   headers=self.headers, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def _pages(self, url: str, params: Dict):
+        """Yield items from a paged endpoint, following 'next' links."""
+        data = self._get(url, params)
+        while True:
+            yield from data.get('items') or []
+            if not data.get('next'):
+                return
+            data = self._get(data['next'])
+
+    def find_playlist(self, name: str) -> Optional[str]:
+        """ID of the user's first playlist called `name`, or None."""
+        for playlist in self._pages(f'{enrich_tracks.SPOTIFY_API_URL}/me/playlists',
+                                    {'limit': PLAYLISTS_PAGE}):
+            if playlist and playlist.get('name') == name:
+                return playlist['id']
+        return None
+
+    def create_playlist(self, name: str, description: str, public: bool) -> str:
+        user_id = self._get(f'{enrich_tracks.SPOTIFY_API_URL}/me')['id']
+        self.writes += 1
+        response = http_client.post(
+            f'{enrich_tracks.SPOTIFY_API_URL}/users/{user_id}/playlists',
+            limiter=enrich_tracks.spotify_limiter,
+            headers=self.headers,
+            json={'name': name, 'description': description, 'public': public},
+        )
+        response.raise_for_status()
+        return response.json()['id']
+
+    def track_uris(self, playlist_id: str) -> List[str]:
+        """URIs of every track currently in the playlist."""
+        items = self._pages(f'{enrich_tracks.SPOTIFY_API_URL}/playlists/{playlist_id}/tracks',
+                            {'limit': PLAYLIST_ITEMS_PAGE, 'fields': 'items(track(uri)),next'})
+        return [item['track']['uri'] for item in items if item and item.get('track')]
+
+    def add_tracks(self, playlist_id: str, uris: List[str]) -> bool:
+        """
+        Append up to PLAYLIST_ADD_BATCH URIs. Returns False if the add failed.
+
+        http_client retries 429s, but not 5xx or connection errors, since a
+        POST may have been applied; sync_playlist() handles those.
+        """
+        self.writes += 1
+        try:
+            response = http_client.post(
+                f'{enrich_tracks.SPOTIFY_API_URL}/playlists/{playlist_id}/tracks',
+                limiter=enrich_tracks.spotify_limiter,
+                headers=self.headers,
+                json={'uris': uris},
+            )
+        except requests.RequestException as e:
+            logging.warning(f"Adding {len(uris)} tracks failed: {e}")
+            return False
+        if not response.ok:
+            logging.warning(f"Adding {len(uris)} tracks failed: HTTP {response.status_code}")
+            return False
+        return True
+
+
+def read_tracklist(path: str) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Unique (title, artist, spotify_id or None) tracks from a tracklist, in order.
+
+    Raises:
+        ValueError: If the file has no TITLE/ARTIST columns
+    """
+    tracks = []
+    seen = set()
+    with RowReader(path) as reader:
+        if not {'TITLE', 'ARTIST'} <= set(reader.columns or []):
+            raise ValueError(f"{path} needs TITLE and ARTIST columns")
+        for row in reader:
+            title, artist = row.get('TITLE') or '', row.get('ARTIST') or ''
+            key = track_key(artist, title)
+            if not (title and artist) or key in seen:
+                continue
+            seen.add(key)
+            tracks.append((title, artist, row.get('spotify_id') or None))
+    return tracks
+
+
+def resolve_tracks(tracks: List[Tuple[str, str, Optional[str]]], workers: int) -> List[Optional[str]]:
+    """Spotify URIs for `tracks` (None where unresolved), looked up concurrently."""
+    def resolve(track):
+        title, artist, spotify_id = track
+        spotify_id = spotify_id or enrich_tracks.resolve_spotify_id(title, artist)
+        return f'spotify:track:{spotify_id}' if spotify_id else None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(resolve, tracks))
+
+
+def sync_playlist(client: PlaylistClient, playlist_id: str, uris: List[str],
+                  dry_run: bool = False) -> Dict[str, int]:
+    """
+    Add the URIs the playlist doesn't have yet, PLAYLIST_ADD_BATCH at a time.
+
+    Returns counts: wanted, present (already in the playlist), missing,
+    added and failed (still missing after SYNC_ATTEMPTS rounds).
+    """
+    wanted = list(dict.fromkeys(uris))
+    present = set(client.track_uris(playlist_id))
+    missing = [uri for uri in wanted if uri not in present]
+    result = {'wanted': len(wanted), 'present': len(wanted) - len(missing), 'missing': len(missing),
+              'added': 0, 'failed': 0}
+    if dry_run:
+        return result
+
+    for attempt in range(SYNC_ATTEMPTS):
+        failed = []
+        for i in range(0, len(missing), PLAYLIST_ADD_BATCH):
+            chunk = missing[i:i + PLAYLIST_ADD_BATCH]
+            if client.add_tracks(playlist_id, chunk):
+                result['added'] += len(chunk)
+            else:
+                failed.extend(chunk)
+
+        if not failed or attempt == SYNC_ATTEMPTS - 1:
+            result['failed'] = len(failed)
+            break
+
+        # A failed add may still have gone through: re-read before retrying
+        time.sleep(SYNC_RETRY_DELAY * (attempt + 1))
+        present = set(client.track_uris(playlist_id))
+        missing = [uri for uri in failed if uri not in present]
+        result['added'] += len(failed) - len(missing)
+        if missing:
+            print(f"  Retrying {len(missing)} tracks...")
+
+    return result
+
+
+def main():
+    """Main execution function."""
+
+    parser = argparse.ArgumentParser(
+        description="Sync a tracklist CSV into a Spotify playlist, adding only missing tracks.",
+        epilog='Example: python spotify_scripts/playlist_sync.py rachel-grace-almeida_complete.csv '
+               '--name "Rachel Grace Almeida (NTS)"'
+    )
+    parser.add_argument('input_csv', help="CSV, Parquet or Arrow file with TITLE and ARTIST columns")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--name', help="Playlist name (created if you don't have one by that name)")
+    target.add_argument('--playlist', help="ID of an existing playlist")
+    parser.add_argument('--description', default='Tracks from NTS Radio',
+                        help="Description for a newly created playlist")
+    parser.add_argument('--private', action='store_true', help="Create the playlist as private")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent track lookups (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"Lookup cache and Spotify index directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--no-cache', action='store_true', help="Don't read or write the lookup cache")
+    parser.add_argument('--dry-run', action='store_true', help="Show what would be added without adding it")
+    args = parser.parse_args()
+
+    try:
+        tracks = read_tracklist(args.input_csv)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    print(f"\n{'='*60}")
+    print(f"Spotify Playlist Sync")
+    print(f"{'='*60}")
+    print(f"Input: {args.input_csv} ({len(tracks)} unique tracks)")
+    print(f"Playlist: {args.playlist or args.name}")
+    print(f"{'='*60}\n")
+
+    try:
+        client = PlaylistClient(get_user_token())
+    except (ValueError, requests.RequestException, KeyError) as e:
+        print(f"❌ Spotify authorization failed: {e}")
+        sys.exit(1)
+
+    if not args.no_cache:
+        enrich_tracks.enrichment_cache = EnrichmentCache(args.cache_dir)
+        enrich_tracks.spotify_index = SpotifyIndex(args.cache_dir)
+
+    try:
+        start = time.time()
+        print(f"Resolving {len(tracks)} tracks with {args.workers} workers...")
+        uris = resolve_tracks(tracks, args.workers)
+        resolved = [uri for uri in uris if uri]
+        print(f"  ✓ {len(resolved)}/{len(tracks)} found on Spotify ({time.time() - start:.1f}s)")
+
+        playlist_id = args.playlist
+        if not playlist_id:
+            playlist_id = client.find_playlist(args.name)
+            if playlist_id:
+                print(f"  ✓ Found playlist '{args.name}' ({playlist_id})")
+            elif args.dry_run:
+                print(f"\nPlaylist '{args.name}' doesn't exist yet; {len(set(resolved))} tracks would be added.")
+                return
+            else:
+                playlist_id = client.create_playlist(args.name, args.description, not args.private)
+                print(f"  ✓ Created playlist '{args.name}' ({playlist_id})")
+
+        print(f"Syncing...")
+        result = sync_playlist(client, playlist_id, resolved, args.dry_run)
+    except requests.RequestException as e:
+        print(f"❌ Spotify request failed: {e}")
+        sys.exit(1)
+    finally:
+        if enrich_tracks.enrichment_cache:
+            enrich_tracks.enrichment_cache.close()
+        if enrich_tracks.spotify_index:
+            enrich_tracks.spotify_index.close()
+
+    print(f"\n{'='*60}")
+    print(f"✓ {'Dry run complete' if args.dry_run else 'Success!'}")
+    print(f"{'='*60}")
+    print(f"Tracks found on Spotify: {len(resolved)}/{len(tracks)}")
+    print(f"Already in playlist: {result['present']}")
+    if args.dry_run:
+        print(f"Would add: {result['missing']}")
+    else:
+        print(f"Added: {result['added']}")
+        if result['failed']:
+            print(f"⚠️  Failed to add: {result['failed']} (run again to retry)")
+    print(f"Spotify API calls: {client.reads} reads, {client.writes} writes")
+    if enrich_tracks.enrichment_cache:
+        print(f"Cache: {enrich_tracks.enrichment_cache.summary()}")
+    if enrich_tracks.spotify_index:
+        print(f"Spotify index: {enrich_tracks.spotify_index.summary()}")
+
+    unresolved = [f"{artist} - {title}" for (title, artist, _), uri in zip(tracks, uris) if not uri]
+    if unresolved:
+        print(f"\nNot found on Spotify ({len(unresolved)}):")
+        for name in unresolved[:10]:
+            print(f"  {name}")
+        if len(unresolved) > 10:
+            print(f"  ... and {len(unresolved) - 10} more")
+
+
+if __name__ == "__main__":
+    main()
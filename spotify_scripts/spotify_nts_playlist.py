@@ -1,8 +1,14 @@
-import requests
 import json
 import base64
 import os
 from dotenv import load_dotenv
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import http_client
+import enrich_tracks
+from enrich_cache import DEFAULT_CACHE_DIR
+from spotify_index import SpotifyIndex
+from playlist_sync import PLAYLIST_ADD_BATCH
 
 # Load environment variables from .env file
 load_dotenv()
@@ -29,7 +35,7 @@ auth_params = {
     'redirect_uri': redirect_uri,
     'scope': 'playlist-modify-public',
 }
-auth_response = requests.get(auth_url, params=auth_params)
+auth_response = http_client.get(auth_url, params=auth_params)
 
 # Step 2: User Authorization
 print('Please authorize this app to access your Spotify account.')
@@ -44,7 +50,7 @@ token_params = {
     'code': auth_code,
     'redirect_uri': redirect_uri,
 }
-token_response = requests.post(token_url, headers={'Authorization': f'Basic {auth_header}'}, data=token_params)
+token_response = http_client.post(token_url, headers={'Authorization': f'Basic {auth_header}'}, data=token_params)
 
 # Get the access token and refresh token from the token response
 token_data = token_response.json()
@@ -52,7 +58,7 @@ access_token = token_data['access_token']
 refresh_token = token_data['refresh_token']
 
 # Authenticate with the Spotify API
-auth_response = requests.post('https://accounts.spotify.com/api/token', data={
+auth_response = http_client.post('https://accounts.spotify.com/api/token', data={
     'grant_type': 'client_credentials',
     'client_id': client_id,
     'client_secret': client_secret,
@@ -66,7 +72,7 @@ access_token = auth_response_data['access_token']
 playlist_name = 'NTS Playlist Test'
 playlist_description = 'A playlist of my favorite songs'
 user_id = '1229504606'
-playlist_response = requests.post(f'https://api.spotify.com/v1/users/{user_id}/playlists', headers={
+playlist_response = http_client.post(f'https://api.spotify.com/v1/users/{user_id}/playlists', headers={
     'Authorization': f'Bearer {access_token}',
     'Content-Type': 'application/json',
 }, json={
@@ -89,27 +95,25 @@ song_list = [
     # Add more songs and artist names as needed
 ]
 
-# Search for tracks based on the song titles and artist names
+# Resolve tracks through the shared index, so songs already matched by an
+# enrichment run or an earlier playlist don't need another search
+enrich_tracks.spotify_index = SpotifyIndex(DEFAULT_CACHE_DIR)
 tracks = []
 for song in song_list:
-    query = f"track:{song['title']} artist:{song['artist']}"
-    search_response = requests.get('https://api.spotify.com/v1/search', headers={
+    spotify_id = enrich_tracks.resolve_spotify_id(song['title'], song['artist'])
+    if spotify_id:
+        tracks.append(f'spotify:track:{spotify_id}')
+print(f"Spotify index: {enrich_tracks.spotify_index.summary()}")
+enrich_tracks.spotify_index.close()
+
+# Add the tracks to the playlist, at most 100 per request (Spotify's limit).
+# For tracklist CSVs, playlist_sync.py does this with diffing and retries.
+for i in range(0, len(tracks), PLAYLIST_ADD_BATCH):
+    add_tracks_response = http_client.post(f'https://api.spotify.com/v1/playlists/{playlist_id}/tracks', headers={
         'Authorization': f'Bearer {access_token}',
-    }, params={
-        'q': query,
-        'type': 'track',
+        'Content-Type': 'application/json',
+    }, json={
+        'uris': tracks[i:i + PLAYLIST_ADD_BATCH],
     })
-    search_results = search_response.json()
-    if 'items' in search_results:
-        tracks.append(search_results['items'][0]['uri'])
-
-# Add the tracks to the playlist
-add_tracks_response = requests.post(f'https://api.spotify.com/v1/playlists/{playlist_id}/tracks', headers={
-    'Authorization': f'Bearer {access_token}',
-    'Content-Type': 'application/json',
-}, json={
-    'uris': tracks,
-})
 
 print(f"{len(tracks)} tracks added to the playlist.")
-
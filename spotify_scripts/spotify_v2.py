@@ -1,9 +1,11 @@
-import requests
 import json
 import base64
 import webbrowser
 import os
 from dotenv import load_dotenv
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import http_client
 
 # Load environment variables from .env file
 load_dotenv()
@@ -30,7 +32,7 @@ auth_params = {
     'redirect_uri': redirect_uri,
     'scope': 'playlist-modify-public',
 }
-auth_response = requests.get(auth_url, params=auth_params)
+auth_response = http_client.get(auth_url, params=auth_params)
 
 # Step 2: User Authorization
 print('Please authorize this app to access your Spotify account.')
@@ -46,7 +48,7 @@ token_params = {
     'code': auth_code,
     'redirect_uri': redirect_uri,
 }
-token_response = requests.post(token_url, headers={'Authorization': f'Basic {auth_header}'}, data=token_params)
+token_response = http_client.post(token_url, headers={'Authorization': f'Basic {auth_header}'}, data=token_params)
 
 # Get the access token and refresh token from the token response
 token_data = token_response.json()
@@ -56,12 +58,12 @@ refresh_token = token_data['refresh_token']
 # Step 4: Use the access token to create a new playlist
 playlist_name = 'My Playlist'
 playlist_description = 'A playlist of my favorite songs'
-user_response = requests.get('https://api.spotify.com/v1/me', headers={
+user_response = http_client.get('https://api.spotify.com/v1/me', headers={
     'Authorization': f'Bearer {access_token}',
 })
 user_data = user_response.json()
 user_id = user_data['id']
-playlist_response = requests.post(f'https://api.spotify.com/v1/users/{user_id}/playlists', headers={
+playlist_response = http_client.post(f'https://api.spotify.com/v1/users/{user_id}/playlists', headers={
     'Authorization': f'Bearer {access_token}',
     'Content-Type': 'application/json',
 }, json={
@@ -0,0 +1,433 @@
+"""
+Table Output
+
+Reads and writes track tables as CSV, Parquet or Arrow IPC. The columnar
+formats store typed columns instead of text:
+
+- floats for audio features, ints for popularity/duration/counts
+- dictionary-encoded strings for columns with few distinct values
+  (artists, albums, tags, keys)
+- zstd compression
+
+pyarrow is only needed for the columnar formats.
+
+Usage:
+    write_rows('show.parquet', rows, ['TITLE', 'ARTIST', 'EPISODE_URL'])
+    prepend_rows('show.parquet', new_rows, columns)   # incremental runs
+
+    with RowReader('show.parquet') as reader:
+        for row in reader: ...
+"""
+
+import csv
+import glob
+import itertools
+import logging
+import os
+import shutil
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency
+    pa = None
+
+FORMATS = ('csv', 'parquet', 'arrow')
+DEFAULT_FORMAT = 'csv'
+FORMAT_EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+COMPRESSION = 'zstd'
+
+# Rows buffered into each Parquet row group when streaming batches to a file
+ROW_GROUP_ROWS = 65536
+
+# Column types; anything not listed is a plain string
+INT_COLUMNS = {
+    'spotify_popularity', 'spotify_duration_ms', 'spotify_key', 'spotify_mode',
+    'spotify_time_signature', 'lastfm_playcount', 'lastfm_listeners',
+    'musicbrainz_length', 'ab_beats_count',
+}
+FLOAT_COLUMNS = {
+    'spotify_danceability', 'spotify_energy', 'spotify_loudness', 'spotify_speechiness',
+    'spotify_acousticness', 'spotify_instrumentalness', 'spotify_liveness',
+    'spotify_valence', 'spotify_tempo', 'spotify_confidence', 'musicbrainz_confidence',
+    'ab_bpm', 'ab_key_strength', 'ab_loudness', 'ab_danceability', 'ab_mood_aggressive',
+    'ab_mood_happy', 'ab_mood_relaxed', 'ab_voice_instrumental',
+}
+BOOL_COLUMNS = {'spotify_explicit'}
+DICTIONARY_COLUMNS = {
+    'ARTIST', 'EPISODE_URL', 'spotify_album', 'lastfm_tags', 'musicbrainz_tags',
+    'musicbrainz_country', 'ab_key', 'ab_scale',
+}
+
+
+def require_pyarrow(fmt: str):
+    """Raise if `fmt` needs pyarrow and it isn't installed."""
+    if fmt != 'csv' and pa is None:
+        raise RuntimeError(f"--format {fmt} needs pyarrow (pip install pyarrow)")
+
+
+def detect_format(path: str) -> str:
+    """Guess a table's format from its file extension (CSV if unknown)."""
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, fmt_ext in FORMAT_EXTENSIONS.items():
+        if ext == fmt_ext:
+            return fmt
+    return 'csv'
+
+
+def _column_kind(name: str) -> str:
+    if name in INT_COLUMNS:
+        return 'int'
+    if name in FLOAT_COLUMNS:
+        return 'float'
+    if name in BOOL_COLUMNS:
+        return 'bool'
+    return 'string'
+
+
+def _coerce(value: Any, kind: str) -> Any:
+    """Convert a CSV string or API value to the column's Python type (None if empty)."""
+    if value is None or value == '':
+        return None
+    try:
+        if kind == 'int':
+            try:
+                return int(value)
+            except ValueError:
+                return int(float(value))
+        if kind == 'float':
+            return float(value)
+        if kind == 'bool':
+            if isinstance(value, str):
+                return value.strip().lower() in ('true', '1', 'yes')
+            return bool(value)
+    except (TypeError, ValueError):
+        logging.debug(f"Dropping unparseable {kind} value {value!r}")
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def schema_for(columns: List[str]) -> 'pa.Schema':
+    """Arrow schema for the given column names."""
+    types = {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'bool': pa.bool_(),
+        'string': pa.string(),
+    }
+    fields = []
+    for name in columns:
+        if name in DICTIONARY_COLUMNS:
+            fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append(pa.field(name, types[_column_kind(name)]))
+    return pa.schema(fields)
+
+
+def rows_to_table(rows: List[Dict], columns: List[str]) -> 'pa.Table':
+    """Build a typed Arrow table from row dicts."""
+    arrays = []
+    for name in columns:
+        kind = _column_kind(name)
+        values = [_coerce(row.get(name), kind) for row in rows]
+        if name in DICTIONARY_COLUMNS:
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=schema_for([name]).field(0).type))
+    return pa.Table.from_arrays(arrays, schema=schema_for(columns))
+
+
+def read_table(path: str, fmt: Optional[str] = None) -> 'pa.Table':
+    """Load a whole Parquet or Arrow file."""
+    fmt = fmt or detect_format(path)
+    require_pyarrow(fmt)
+    if fmt == 'parquet':
+        return pq.read_table(path)
+    if fmt == 'arrow':
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).read_all()
+    raise ValueError(f"read_table() handles parquet and arrow, not {fmt}")
+
+
+def write_table(table: 'pa.Table', path: str, fmt: str):
+    """Atomically write an Arrow table as Parquet or Arrow IPC."""
+    tmp_path = f"{path}.tmp"
+    if fmt == 'parquet':
+        pq.write_table(table, tmp_path, compression=COMPRESSION)
+    elif fmt == 'arrow':
+        options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+    else:
+        raise ValueError(f"write_table() handles parquet and arrow, not {fmt}")
+    os.replace(tmp_path, path)
+
+
+def iter_batches(path: str, fmt: Optional[str] = None, batch_size: int = 1000) -> Iterator['pa.RecordBatch']:
+    """Yield a Parquet or Arrow file's record batches without loading it all."""
+    fmt = fmt or detect_format(path)
+    require_pyarrow(fmt)
+    if fmt == 'parquet':
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+    elif fmt == 'arrow':
+        with pa.memory_map(path) as source:
+            arrow_file = pa.ipc.open_file(source)
+            for i in range(arrow_file.num_record_batches):
+                yield arrow_file.get_batch(i)
+    else:
+        raise ValueError(f"iter_batches() handles parquet and arrow, not {fmt}")
+
+
+def _conform(batch: 'pa.RecordBatch', schema: 'pa.Schema') -> List['pa.RecordBatch']:
+    """A batch with `schema`'s columns, in its order and types."""
+    if batch.schema.equals(schema):
+        return [batch]
+    return pa.Table.from_batches([batch]).select(schema.names).cast(schema).to_batches()
+
+
+class _DictionaryEncoder:
+    """
+    Re-encodes batches' dictionary columns against one dictionary per
+    column. An Arrow IPC file holds a single dictionary per column, so
+    batches that each carry their own can't be written to one file as they
+    are; add() every batch first, then encode() them.
+    """
+
+    def __init__(self, schema: 'pa.Schema'):
+        self.schema = schema
+        self._columns = [i for i, field in enumerate(schema) if pa.types.is_dictionary(field.type)]
+        self._indexes: Dict[int, Dict[str, int]] = {i: {} for i in self._columns}
+        self._dictionaries: Dict[int, 'pa.Array'] = {}
+
+    def add(self, batch: 'pa.RecordBatch'):
+        """Take note of a batch's dictionary values."""
+        for i in self._columns:
+            index = self._indexes[i]
+            for value in batch.column(i).dictionary.to_pylist():
+                index.setdefault(value, len(index))
+
+    def encode(self, batch: 'pa.RecordBatch') -> 'pa.RecordBatch':
+        if not self._columns:
+            return batch
+        arrays = list(batch.columns)
+        for i in self._columns:
+            index = self._indexes[i]
+            if i not in self._dictionaries:
+                self._dictionaries[i] = pa.array(list(index), pa.string())
+            column = arrays[i]
+            mapping = pa.array([index[value] for value in column.dictionary.to_pylist()], pa.int32())
+            arrays[i] = pa.DictionaryArray.from_arrays(mapping.take(column.indices), self._dictionaries[i])
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def write_batches(path: str, batches: Callable[[], Iterable['pa.RecordBatch']], schema: 'pa.Schema', fmt: str):
+    """
+    Atomically write record batches as Parquet or Arrow IPC, one batch at a
+    time, so a table bigger than memory can be written. Batches are cast to
+    `schema`.
+
+    `batches` is called for each pass over them: Arrow takes two, the first
+    collecting every dictionary value.
+    """
+    tmp_path = f"{path}.tmp"
+    if fmt == 'parquet':
+        with pq.ParquetWriter(tmp_path, schema, compression=COMPRESSION) as writer:
+            # Buffer small batches into full-sized row groups
+            pending: List['pa.RecordBatch'] = []
+            pending_rows = 0
+            for batch in batches():
+                for part in _conform(batch, schema):
+                    pending.append(part)
+                    pending_rows += part.num_rows
+                if pending_rows >= ROW_GROUP_ROWS:
+                    writer.write_table(pa.Table.from_batches(pending, schema=schema))
+                    pending, pending_rows = [], 0
+            if pending:
+                writer.write_table(pa.Table.from_batches(pending, schema=schema))
+    elif fmt == 'arrow':
+        encoder = _DictionaryEncoder(schema)
+        for batch in batches():
+            for part in _conform(batch, schema):
+                encoder.add(part)
+        options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, schema, options=options) as writer:
+                for batch in batches():
+                    for part in _conform(batch, schema):
+                        writer.write_batch(encoder.encode(part))
+    else:
+        raise ValueError(f"write_batches() handles parquet and arrow, not {fmt}")
+    os.replace(tmp_path, path)
+
+
+def write_rows(path: str, rows: List[Dict], columns: List[str], fmt: Optional[str] = None):
+    """Write rows to a new table, replacing any existing file."""
+    fmt = fmt or detect_format(path)
+    require_pyarrow(fmt)
+    if fmt == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        return
+    write_table(rows_to_table(rows, columns), path, fmt)
+
+
+def prepend_rows(path: str, rows: List[Dict], columns: List[str], fmt: Optional[str] = None):
+    """
+    Add rows to the front of an existing table (newest first).
+
+    The existing rows are streamed across batch by batch rather than loaded
+    whole, and the file is replaced atomically.
+    """
+    fmt = fmt or detect_format(path)
+    require_pyarrow(fmt)
+    if fmt == 'csv':
+        tmp_path = f"{path}.tmp"
+        with open(path, 'r', newline='', encoding='utf-8') as existing, \
+                open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            reader = csv.reader(existing)
+            next(reader, None)  # Skip the old header
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow([row.get(name, '') for name in columns])
+            writer.writerows(reader)
+        os.replace(tmp_path, path)
+        return
+
+    new = rows_to_table(rows, columns).to_batches()
+    write_batches(path, lambda: itertools.chain(new, iter_batches(path, fmt)), schema_for(columns), fmt)
+
+
+class RowReader:
+    """
+    Iterate over a table's rows as dicts, reading columnar files batch by
+    batch rather than all at once. The file is opened immediately; use as a
+    context manager (or call close()) to release it.
+
+    Attributes:
+        columns: Column names
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None, batch_size: int = 1000):
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        self.batch_size = batch_size
+        self.columns: Optional[List[str]] = None
+        self._file = None
+        self._rows: Iterator[Dict]
+
+        require_pyarrow(self.fmt)
+        if self.fmt == 'csv':
+            self._file = open(self.path, 'r', encoding='utf-8-sig', newline='')
+            reader = csv.DictReader(self._file)
+            self.columns = reader.fieldnames
+            self._rows = reader
+        elif self.fmt == 'parquet':
+            parquet_file = pq.ParquetFile(self.path)
+            self.columns = parquet_file.schema_arrow.names
+            self._rows = self._iter_batches(parquet_file.iter_batches(batch_size=self.batch_size))
+        else:
+            self._file = pa.memory_map(self.path)
+            arrow_file = pa.ipc.open_file(self._file)
+            self.columns = arrow_file.schema.names
+            batches = (arrow_file.get_batch(i) for i in range(arrow_file.num_record_batches))
+            self._rows = self._iter_batches(batches)
+
+    def __enter__(self) -> 'RowReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    @staticmethod
+    def _iter_batches(batches) -> Iterator[Dict]:
+        for batch in batches:
+            yield from batch.to_pylist()
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self._rows
+
+
+class ChunkWriter:
+    """
+    Appends chunks of rows to an output table so an interrupted run can
+    resume from its last checkpoint.
+
+    CSV is appended in place; `position` is the file size, and resuming
+    truncates anything written after it. Parquet and Arrow files can't be
+    appended to safely, so each chunk becomes a part file under
+    `<path>.parts/` (`position` counts parts) and finish() streams them into
+    one file.
+    """
+
+    def __init__(self, path: str, columns: List[str], fmt: str = DEFAULT_FORMAT,
+                 resume_position: Optional[int] = None):
+        require_pyarrow(fmt)
+        self.path = path
+        self.columns = columns
+        self.fmt = fmt
+        self.parts_dir = f"{path}.parts"
+
+        if fmt == 'csv':
+            if resume_position is not None:
+                # Drop anything written after the last checkpoint
+                self._out = open(path, 'r+', newline='', encoding='utf-8')
+                self._out.truncate(resume_position)
+                self._out.seek(0, os.SEEK_END)
+                self._writer = csv.DictWriter(self._out, fieldnames=columns, extrasaction='ignore')
+            else:
+                self._out = open(path, 'w', newline='', encoding='utf-8')
+                self._writer = csv.DictWriter(self._out, fieldnames=columns, extrasaction='ignore')
+                self._writer.writeheader()
+            self.position = self._out.tell()
+        else:
+            if resume_position is None:
+                shutil.rmtree(self.parts_dir, ignore_errors=True)
+                resume_position = 0
+            os.makedirs(self.parts_dir, exist_ok=True)
+            # Drop parts written after the last checkpoint
+            for part in self._part_paths()[resume_position:]:
+                os.remove(part)
+            self.position = resume_position
+
+    def _part_path(self, index: int) -> str:
+        return os.path.join(self.parts_dir, f"part-{index:06d}{FORMAT_EXTENSIONS[self.fmt]}")
+
+    def _part_paths(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.parts_dir, f"part-*{FORMAT_EXTENSIONS[self.fmt]}")))
+
+    def write(self, rows: List[Dict]):
+        """Durably write one chunk of rows."""
+        if self.fmt == 'csv':
+            self._writer.writerows(rows)
+            self._out.flush()
+            os.fsync(self._out.fileno())
+            self.position = self._out.tell()
+        else:
+            write_table(rows_to_table(rows, self.columns), self._part_path(self.position), self.fmt)
+            self.position += 1
+
+    def close(self):
+        """Release the output file without finishing (the run can be resumed)."""
+        if self.fmt == 'csv':
+            self._out.close()
+
+    def finish(self):
+        """Complete the output; for columnar formats, combine the parts into one file."""
+        self.close()
+        if self.fmt == 'csv':
+            return
+        parts = self._part_paths()
+        write_batches(self.path, lambda: (batch for part in parts for batch in iter_batches(part, self.fmt)),
+                      schema_for(self.columns), self.fmt)
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
@@ -0,0 +1,166 @@
+"""
+Track Matching
+
+Scores search candidates against the (artist, title) being looked up, so
+enrichment can ask a service for its top few results in one request and
+keep the best match instead of taking the first hit blindly.
+
+- Strings are cleaned with normalize's rules and compared as sets of
+  words, so word order doesn't matter ("B & A" against "A, B"). Words only
+  one side has still earn partial credit from their character-bigram
+  overlap, which tolerates typos and spelling variants
+- Version suffixes ("- 2011 Remaster", "(Original Mix)") are dropped when
+  that gives a better title score
+- Scores run from 0 to 1. A best match under MIN_CONFIDENCE counts as a miss
+
+Durations aren't compared: NTS tracklists only say how long a track played
+in the mix, which says little about the recording's length.
+
+Pure Python with memoized string features. `benchmarks/bench_match.py`
+measures the comparison rate on one slow core: about 150k per second once
+a string's features are known, but only about 60k when every candidate
+string is new and has to be cleaned and split into words first (its first
+sighting can't be served from a memo). That cold rate falls short of the
+100k per second target; it is what enrichment mostly sees, since each
+search brings new candidate strings. Either way a 5-candidate search is
+scored in well under a millisecond.
+
+Usage:
+    query = Query(title, artist)
+    ranked = rank(query, [(c['name'], artist_names, c) for c in items])
+    if ranked and ranked[0][0] >= MIN_CONFIDENCE:
+        confidence, best = ranked[0]
+"""
+
+import re
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from normalize import RULES, RULES_VERSION
+
+# Weights of each part of the score
+TITLE_WEIGHT = 0.6
+ARTIST_WEIGHT = 0.4
+
+# Below this, the best candidate is treated as "not found". Set so a right
+# title by the wrong artist (about 0.6) doesn't pass.
+MIN_CONFIDENCE = 0.65
+
+# Distinct strings whose features are remembered
+FEATURE_CACHE_SIZE = 65536
+
+_WORD = re.compile(r'\w+')
+# "Title - 2011 Remaster", "Title (Original Mix)", "Title [Edit]"
+_VERSION_SUFFIX = re.compile(r'\s+-\s+.*$|\s*[(\[].*?[)\]]')
+
+Features = FrozenSet[str]
+
+
+def strip_version(title: str) -> str:
+    """A title without its version suffixes ("Song - 2011 Remaster", "Song (Radio Edit)" -> "Song")."""
+    return _VERSION_SUFFIX.sub('', title).strip()
+
+
+def _clean(s: str) -> str:
+    # Candidate strings are mostly seen once, so they skip clean_string()'s
+    # memo rather than push the tracklist's own strings out of it
+    return RULES[RULES_VERSION](s) if s else ''
+
+
+def _words(cleaned: str) -> Features:
+    return frozenset(_WORD.findall(cleaned))
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def _features(s: str) -> Features:
+    """Word set of a raw string."""
+    return _words(_clean(s))
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def _title_features(title: str) -> Tuple[Features, Optional[Features]]:
+    """Words of a title and, if it has a version suffix, of the title without it."""
+    cleaned = _clean(title)
+    base = None
+    if '(' in cleaned or '[' in cleaned or ' - ' in cleaned:
+        base = _words(_VERSION_SUFFIX.sub('', cleaned))
+    return _words(cleaned), base
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def _word_bigrams(word: str) -> FrozenSet[str]:
+    if len(word) < 2:
+        return frozenset((word,))
+    return frozenset([word[i:i + 2] for i in range(len(word) - 1)])
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def _bigrams(words: FrozenSet[str]) -> FrozenSet[str]:
+    """Character bigrams of a set of words (memoized: a query's leftovers repeat across candidates)."""
+    return frozenset().union(*map(_word_bigrams, words))
+
+
+def similarity(a: Features, b: Features) -> float:
+    """
+    0-1 similarity of two strings' features.
+
+    The Dice coefficient of their word sets, where words only one side has
+    count for as much as the bigram overlap of those leftover words.
+    """
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    total = len(a) + len(b)
+    common = len(a & b)
+    score = 2 * common
+    if common < len(a) and common < len(b):
+        only_a, only_b = a - b, b - a
+        bigrams_a, bigrams_b = _bigrams(only_a), _bigrams(only_b)
+        overlap = 2 * len(bigrams_a & bigrams_b) / (len(bigrams_a) + len(bigrams_b))
+        score += overlap * (total - score)
+    return score / total
+
+
+class Query:
+    """The track being looked up, with its features computed once for all candidates."""
+
+    __slots__ = ('title', 'artist', '_title', '_title_base', '_artist')
+
+    def __init__(self, title: str, artist: str):
+        self.title = title
+        self.artist = artist
+        full, base = _title_features(title)
+        self._title = full
+        self._title_base = base or full
+        self._artist = _features(artist)
+
+    def score(self, title: str, artists: Sequence[str]) -> float:
+        """Confidence (0-1) that a candidate titled `title` by `artists` is this track."""
+        full, base = _title_features(title)
+        title_score = similarity(self._title, full)
+        if title_score < 1.0 and base is not None:
+            title_score = max(title_score, similarity(self._title_base, base))
+
+        if len(artists) == 1:
+            artist_score = similarity(self._artist, _features(artists[0]))
+        else:
+            artist_score = max([similarity(self._artist, _features(name)) for name in artists], default=0.0)
+            # NTS often credits every artist in one string ("A & B")
+            if len(artists) > 1 and artist_score < 1.0:
+                artist_score = max(artist_score, similarity(self._artist, _features(' '.join(artists))))
+
+        return round(TITLE_WEIGHT * title_score + ARTIST_WEIGHT * artist_score, 3)
+
+
+def rank(query: Query, candidates: Iterable[Tuple[str, Sequence[str], Any]]) -> List[Tuple[float, Any]]:
+    """
+    Score (title, artists, payload) candidates against `query`.
+
+    Returns (score, payload) pairs, best first; ties keep the service's order.
+    """
+    scored = [(query.score(title, artists), payload)
+              for title, artists, payload in candidates]
+    scored.sort(key=itemgetter(0), reverse=True)
+    return scored
@@ -0,0 +1,253 @@
+"""
+Tracklist Parser
+
+Pulls (artist, title) pairs out of an NTS episode page. The tracklist lives
+in `#episode-container` as `.track` elements, each with a `.track__artist`
+and a `.track__title`.
+
+Backends:
+- 'lxml': lxml with precompiled XPath (fastest; optional dependency)
+- 'stream': stdlib HTMLParser scan that stops as soon as the episode
+  container closes, without building a tree
+- 'bs4': BeautifulSoup html.parser, the original full-tree approach
+- 'auto': lxml if installed, otherwise stream; falls back to bs4 if the
+  fast path can't find the container
+
+Usage:
+    pairs = parse_tracklist(response.content)
+    for artist, title in pairs or []:
+        ...
+"""
+
+import logging
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # Optional dependency
+    lxml = None
+
+BACKENDS = ('auto', 'lxml', 'stream', 'bs4')
+DEFAULT_BACKEND = 'auto'
+
+CONTAINER_ID = 'episode-container'
+
+# Bytes fed to the streaming parser at a time
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Elements that never have an end tag, so they mustn't affect nesting depth
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+
+TrackPairs = List[Tuple[str, str]]
+
+
+def _has_class(class_attr: Optional[str], name: str) -> bool:
+    return bool(class_attr) and name in class_attr.split()
+
+
+def _decode(html) -> str:
+    if isinstance(html, bytes):
+        return html.decode('utf-8', errors='replace')
+    return html
+
+
+# --- BeautifulSoup ----------------------------------------------------------
+
+def parse_bs4(html) -> Optional[TrackPairs]:
+    """Full-tree parse with BeautifulSoup. Returns None if there's no container."""
+    soup = BeautifulSoup(html, 'html.parser')
+    episode_container = soup.find(id=CONTAINER_ID)
+    if not episode_container:
+        return None
+
+    pairs = []
+    for track_element in episode_container.find_all(class_="track"):
+        artist_elem = track_element.find(class_="track__artist")
+        title_elem = track_element.find(class_="track__title")
+        if artist_elem and title_elem:
+            pairs.append((artist_elem.text.strip(), title_elem.text.strip()))
+    return pairs
+
+
+# --- lxml ---------------------------------------------------------------------
+
+def _class_test(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if lxml is not None:
+    _XPATH_CONTAINER = etree.XPath(f"//*[@id='{CONTAINER_ID}']")
+    _XPATH_TRACKS = etree.XPath(f".//*[{_class_test('track')}]")
+    _XPATH_ARTIST = etree.XPath(f"(.//*[{_class_test('track__artist')}])[1]")
+    _XPATH_TITLE = etree.XPath(f"(.//*[{_class_test('track__title')}])[1]")
+    # NTS serves UTF-8; without this lxml guesses latin-1 for bytes input
+    # when the page has no <meta charset>
+    _UTF8_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+
+def parse_lxml(html) -> Optional[TrackPairs]:
+    """Parse with lxml and precompiled XPath. Returns None if there's no container."""
+    if lxml is None:
+        raise RuntimeError("lxml is not installed")
+
+    if isinstance(html, bytes):
+        root = lxml.html.fromstring(html, parser=_UTF8_PARSER)
+    else:
+        root = lxml.html.fromstring(html)
+    containers = _XPATH_CONTAINER(root)
+    if not containers:
+        return None
+
+    pairs = []
+    for track_element in _XPATH_TRACKS(containers[0]):
+        artist_elems = _XPATH_ARTIST(track_element)
+        title_elems = _XPATH_TITLE(track_element)
+        if artist_elems and title_elems:
+            pairs.append((artist_elems[0].text_content().strip(),
+                          title_elems[0].text_content().strip()))
+    return pairs
+
+
+# --- Streaming ----------------------------------------------------------------
+
+class _TracklistScanner(HTMLParser):
+    """
+    Event-driven scan for the tracklist.
+
+    Tracks nesting depth only while inside the episode container, and sets
+    `done` when the container closes so the caller can stop feeding input.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found = False
+        self.done = False
+        self.pairs: TrackPairs = []
+
+        self._depth = 0           # Depth inside the container (0 = outside)
+        self._track_depth = None  # Depth of the current .track element
+        self._field = None        # 'artist' or 'title' while collecting text
+        self._field_depth = None
+        self._current = {}
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        attrs = dict(attrs)
+
+        if not self._depth:
+            if attrs.get('id') == CONTAINER_ID:
+                self.found = True
+                self._depth = 1
+            return
+
+        if tag in VOID_ELEMENTS:
+            return
+        self._depth += 1
+        class_attr = attrs.get('class')
+
+        if self._track_depth is None:
+            if _has_class(class_attr, 'track'):
+                self._track_depth = self._depth
+                self._current = {}
+            return
+
+        if self._field is None:
+            for field in ('artist', 'title'):
+                if field not in self._current and _has_class(class_attr, f'track__{field}'):
+                    self._field = field
+                    self._field_depth = self._depth
+                    self._text = []
+                    break
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags don't change depth
+        if not self._depth and dict(attrs).get('id') == CONTAINER_ID:
+            self.found = True
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if self.done or not self._depth or tag in VOID_ELEMENTS:
+            return
+
+        if self._field is not None and self._depth == self._field_depth:
+            self._current[self._field] = ''.join(self._text).strip()
+            self._field = None
+
+        if self._track_depth is not None and self._depth == self._track_depth:
+            if 'artist' in self._current and 'title' in self._current:
+                self.pairs.append((self._current['artist'], self._current['title']))
+            self._track_depth = None
+
+        self._depth -= 1
+        if self._depth == 0:
+            self.done = True
+
+    def handle_data(self, data):
+        if self._field is not None:
+            self._text.append(data)
+
+
+def parse_stream(html) -> Optional[TrackPairs]:
+    """Streaming scan that stops after the container. Returns None if there's no container."""
+    text = _decode(html)
+    scanner = _TracklistScanner()
+    for start in range(0, len(text), STREAM_CHUNK_SIZE):
+        scanner.feed(text[start:start + STREAM_CHUNK_SIZE])
+        if scanner.done:
+            break
+    else:
+        scanner.close()
+    return scanner.pairs if scanner.found else None
+
+
+# --- Dispatch -------------------------------------------------------------------
+
+_PARSERS = {
+    'lxml': parse_lxml,
+    'stream': parse_stream,
+    'bs4': parse_bs4,
+}
+
+
+def resolve_backend(backend: str) -> str:
+    """Map 'auto' to the fastest available backend."""
+    if backend == 'auto':
+        return 'lxml' if lxml is not None else 'stream'
+    if backend not in _PARSERS:
+        raise ValueError(f"Unknown parser backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    return backend
+
+
+def parse_tracklist(html, backend: str = DEFAULT_BACKEND) -> Optional[TrackPairs]:
+    """
+    Extract raw (artist, title) pairs from an episode page.
+
+    Args:
+        html: Page content (bytes or str)
+        backend: One of BACKENDS
+
+    Returns:
+        List of (artist, title) text pairs, unstripped of annotations, or
+        None if the page has no episode container
+    """
+    name = resolve_backend(backend)
+    if backend != 'auto':
+        return _PARSERS[name](html)
+
+    try:
+        pairs = _PARSERS[name](html)
+    except Exception as e:
+        logging.debug(f"{name} parser failed ({e}); falling back to bs4")
+        pairs = None
+    if pairs is None:
+        pairs = parse_bs4(html)
+    return pairs